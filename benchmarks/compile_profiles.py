@@ -0,0 +1,62 @@
+"""Compare compile time and PDF size of the compile profiles
+
+The same synthetic sample names are typeset with XeTeX's own settings and
+with `--profile-mode draft` and `final`, each without the output cache.
+Requires xelatex and xdvipdfmx. Run from the repository root:
+
+```
+python benchmarks/compile_profiles.py
+python benchmarks/compile_profiles.py -n 20000 -j 4
+```
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from generate_labels import generate_labels, tex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--names", type=int, default=5_000)
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="parallel xelatex processes"
+    )
+    args = parser.parse_args()
+
+    if shutil.which("xelatex") is None or shutil.which(tex.EXEC_DRIVER) is None:
+        sys.exit(f"xelatex and {tex.EXEC_DRIVER} are required")
+
+    stickers = [f"Strain{i}-CTRL-{i % 3 + 1}" for i in range(args.names)]
+    print(f"{len(stickers)} stickers, {-(-len(stickers) // 189)} pages")
+
+    # Build the format up front so that it is not part of the first timing
+    tex.build_format()
+
+    for mode in (None, "draft", "final"):
+        with tempfile.TemporaryDirectory() as dir_temp:
+            path_output = Path(dir_temp, "labels.pdf")
+            time_start = time.perf_counter()
+            generate_labels.typeset(
+                stickers,
+                len(stickers),
+                "2020-01-01",
+                path_output,
+                jobs=args.jobs,
+                use_cache=False,
+                mode=mode,
+            )
+            seconds = time.perf_counter() - time_start
+            size = path_output.stat().st_size if path_output.exists() else 0
+        print(
+            f"{mode or 'default':<8}  compile {seconds:6.2f} s  "
+            f"PDF {size / 1024:>8,.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Time every stage of generating labels on synthetic sample names
+
+Sample names have the lengths found in tests/samples.txt and contain
+special characters and non-ASCII letters. Half of each input is produced by
+combining base names with two groups of suffixes. Every stage is timed on
+its own and the results are written to a JSON file:
+
+```
+python benchmarks/stages.py -o results.json
+python benchmarks/stages.py --compare results.json
+```
+
+Compiling with XeLaTeX is only timed for inputs of up to --compile-max names
+and only if xelatex is installed.
+"""
+
+import argparse
+import io
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+
+from generate_labels import formatting, generate_labels, names
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+"""Default numbers of sample names"""
+
+SUFFIX_GROUPS = [["CTRL", "TREAT"], ["1", "2", "3"]]
+"""Suffixes combined with base names"""
+
+PATH_SAMPLES = Path(__file__).parents[1].joinpath("tests", "samples.txt")
+
+ALPHABET = (
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789" * 8
+    + "-" * 20
+    + " " * 10
+    + "äöüßαβγμ"
+    + "&%$#_{}~^\\<>"
+)
+"""Characters of synthetic sample names, weighted by repetition"""
+
+
+def main(args=None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        metavar="INT",
+        help="numbers of sample names to time (default: 10 to 1,000,000)",
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="FILE", help="write results to a JSON file"
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="print time relative to results of an earlier run",
+    )
+    parser.add_argument(
+        "--compile-max",
+        type=int,
+        default=10_000,
+        metavar="INT",
+        help="largest input to typeset with xelatex (default: 10000)",
+    )
+    args = parser.parse_args(args)
+
+    results = []
+    with tempfile.TemporaryDirectory() as dir_temp:
+        for size in args.sizes:
+            for stage, seconds in time_stages(size, Path(dir_temp), args.compile_max):
+                results.append({"stage": stage, "names": size, "seconds": seconds})
+                print(f"{stage:<10} {size:>9} names {seconds:>10.4f} s")
+
+    report = {
+        "version": _version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }
+
+    if args.output is not None:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    if args.compare is not None:
+        _compare(json.loads(Path(args.compare).read_text()), report)
+
+
+def time_stages(size: int, dir_temp: Path, compile_max: int):
+    """
+    Time each stage on a synthetic input
+
+    Parameters
+    ----------
+    size: int
+        Number of sample names after adding suffixes
+    dir_temp: Path
+        Directory for input and output files
+    compile_max: int
+        Largest number of names to typeset
+
+    Yields
+    ------
+    tuple[str, float]
+        Name of the stage and its duration in seconds
+    """
+
+    # Write half of the names directly and generate the rest with suffixes
+    rng = random.Random(size)
+    lengths = [len(name) for name in names.read_names(PATH_SAMPLES)]
+    size_base = -(-size // 12)
+    names_base = [_random_name(rng, lengths) for _ in range(size_base)]
+    names_input = [_random_name(rng, lengths) for _ in range(size - 6 * size_base)]
+    path_input = dir_temp.joinpath(f"names_{size}.txt")
+    path_input.write_text("".join(f"{name}\n" for name in names_input))
+
+    time_start = time.perf_counter()
+    names_read = list(names.read_names(path_input))
+    yield "read", time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    names_read += names.add_suffixes(names_base, SUFFIX_GROUPS)
+    yield "suffix", time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    for name in names_read:
+        formatting.tex_escape(name)
+    yield "escape", time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    for name in names_read:
+        formatting.str_width(name)
+    yield "width", time.perf_counter() - time_start
+
+    _clear_memo()
+    time_start = time.perf_counter()
+    for name in names_read:
+        formatting.return_sticker(name, "2020-01-01")
+    yield "sticker", time.perf_counter() - time_start
+
+    _clear_memo()
+    pages = range(-(-size // 189))
+    time_start = time.perf_counter()
+    formatting.write_tex_pages(io.StringIO(), iter(names_read), "2020-01-01", pages)
+    yield "emit", time.perf_counter() - time_start
+
+    if size <= compile_max and shutil.which("xelatex") is not None:
+        path_output = dir_temp.joinpath(f"labels_{size}.pdf")
+        time_start = time.perf_counter()
+        generate_labels.typeset(
+            iter(names_read), size, "2020-01-01", path_output, use_cache=False
+        )
+        yield "compile", time.perf_counter() - time_start
+
+
+def _random_name(rng: random.Random, lengths: list[int]) -> str:
+    """Return sample name with a length drawn from `lengths`"""
+    return "".join(rng.choices(ALPHABET, k=rng.choice(lengths))).strip() or "x"
+
+
+def _clear_memo() -> None:
+    """Forget memoised stickers so that every run starts from scratch"""
+    formatting.return_sticker.cache_clear()
+
+
+def _version() -> str:
+    """Return version of the installed package"""
+    try:
+        return metadata.version("generate-labels")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _compare(report_old: dict, report_new: dict) -> None:
+    """Print duration of each stage relative to an earlier report"""
+
+    seconds_old = {
+        (result["stage"], result["names"]): result["seconds"]
+        for result in report_old["results"]
+    }
+    print(f"\nCompared to version {report_old['version']} ({report_old['date']}):")
+    for result in report_new["results"]:
+        key = (result["stage"], result["names"])
+        if seconds_old.get(key):
+            ratio = result["seconds"] / seconds_old[key]
+            print(f"{key[0]:<10} {key[1]:>9} names {ratio:>9.2f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
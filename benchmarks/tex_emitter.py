@@ -0,0 +1,51 @@
+"""Time writing the sticker tables of 100,000 names to a TeX file
+
+Sample names are repeated with suffixes, as produced by --suffix-group,
+unless --unique is given.
+Run from the repository root:
+
+```
+python benchmarks/tex_emitter.py
+```
+"""
+
+import argparse
+import io
+import timeit
+from itertools import cycle, islice
+
+from generate_labels import formatting
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--names", type=int, default=100_000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument(
+        "--unique", help="do not repeat any sample name", action="store_true"
+    )
+    args = parser.parse_args()
+
+    if args.unique:
+        names_list = [f"Strain{i}-A-1" for i in range(args.names)]
+    else:
+        names_base = [
+            f"Strain{i}-{t}-{r}" for i in range(500) for t in "AB" for r in "123"
+        ]
+        names_list = list(islice(cycle(names_base), args.names))
+    pages = range(-(-len(names_list) // 189))
+
+    def write() -> None:
+        # Start every run without memoised stickers
+        formatting.return_sticker.cache_clear()
+        formatting.write_tex_pages(io.StringIO(), iter(names_list), "2020-01-01", pages)
+
+    seconds = min(timeit.repeat(write, number=1, repeat=args.repeat))
+    print(
+        f"{len(names_list)} names, {len(pages)} pages: {seconds:.3f} s "
+        f"({len(names_list) / seconds:,.0f} names/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare TeX files written with and without --tex-macros
+
+Sample names are combined with suffix groups as by --suffix-group, and
+stickers are skipped at the start, printed in copies and left empty at the
+end of the last page. The size of the TeX file is measured for both
+emission modes, and the time XeLaTeX takes to compile it if xelatex is
+installed. Run from the repository root:
+
+```
+python benchmarks/tex_macros.py
+python benchmarks/tex_macros.py -n 200 -c 3 --compile
+```
+"""
+
+import argparse
+import io
+import shutil
+import tempfile
+import time
+from itertools import chain, repeat
+from pathlib import Path
+
+from generate_labels import formatting, generate_labels, names, tex
+
+SUFFIX_GROUPS = [["CTRL", "TREAT1", "TREAT2"], ["1", "2", "3"]]
+"""Suffixes combined with base names"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--names", type=int, default=2_000)
+    parser.add_argument("-s", "--skip", type=int, default=100)
+    parser.add_argument(
+        "-c", "--copies", type=int, default=1, help="stickers per sample name"
+    )
+    parser.add_argument(
+        "--compile", help="also time compiling with xelatex", action="store_true"
+    )
+    args = parser.parse_args()
+
+    names_base = [f"Strain{i}" for i in range(args.names)]
+    stickers = list(
+        chain.from_iterable(
+            repeat(name, args.copies)
+            for name in names.add_suffixes(names_base, SUFFIX_GROUPS)
+        )
+    )
+    names_number = len(stickers) + args.skip
+    pages = range(-(-names_number // 189))
+    print(f"{len(stickers)} stickers, {args.skip} skipped, {len(pages)} pages")
+
+    compile_tex = args.compile and shutil.which("xelatex") is not None
+    if compile_tex:
+        # Build the format up front so that it is not part of the first timing
+        tex.build_format()
+
+    for macros in (False, True):
+        buffer = io.StringIO()
+        formatting.return_sticker.cache_clear()
+        time_start = time.perf_counter()
+        formatting.write_tex_pages(
+            buffer,
+            names.skip_stickers(iter(stickers), args.skip),
+            "2020-01-01",
+            pages,
+            macros,
+        )
+        seconds_write = time.perf_counter() - time_start
+        size = len(buffer.getvalue().encode())
+        line = (
+            f"macros={macros!s:<5}  TeX {size / 1024:>6,.0f} KiB  "
+            f"write {seconds_write:.3f} s"
+        )
+
+        if compile_tex:
+            with tempfile.TemporaryDirectory() as dir_temp:
+                path_output = Path(dir_temp, "labels.pdf")
+                time_start = time.perf_counter()
+                generate_labels.typeset(
+                    names.skip_stickers(iter(stickers), args.skip),
+                    names_number,
+                    "2020-01-01",
+                    path_output,
+                    use_cache=False,
+                    macros=macros,
+                )
+                line += f"  compile {time.perf_counter() - time_start:.2f} s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .api import render_labels
+
+__all__ = ["render_labels"]
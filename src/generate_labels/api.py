@@ -0,0 +1,100 @@
+"""Typeset sticker sheets from Python code
+
+```
+from generate_labels import render_labels
+
+pdf = render_labels(["A1", "A2", "B1"], skip=3, date="none")
+```
+
+Unlike the command line interface, render_labels neither prints to the
+console nor opens the PDF, and leaves no files behind except the caches
+in the user cache directory.
+"""
+
+import shutil
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import BinaryIO
+
+from . import names, output
+from .formatting import parse_date
+from .generate_labels import typeset
+
+
+def render_labels(
+    names_list: Iterable[str],
+    file: BinaryIO | None = None,
+    *,
+    skip: int = 0,
+    date: str | None = "today",
+    suffix_groups: list[list[str]] | None = None,
+    backend: str = "xelatex",
+    jobs: int = 1,
+    use_cache: bool = True,
+) -> bytes | None:
+    """
+    Typeset sample names into a PDF
+
+    Parameters
+    ----------
+    names_list: Iterable[str]
+        Sample names, empty names are left out
+    file: BinaryIO | None
+        File object to write the PDF to (default: return the PDF instead)
+    skip: int
+        Number of stickers to leave empty (default: 0)
+    date: str | None
+        "today" (default), "none" or None to leave the date empty, or a
+        custom date string
+    suffix_groups: list[list[str]] | None
+        Groups of suffixes combined with each sample name (default: None)
+    backend: str
+        "xelatex" (default) or "pdf" to use the built-in PDF writer
+    jobs: int
+        Number of xelatex processes typesetting pages in parallel (default: 1)
+    use_cache: bool
+        Reuse PDFs typeset from identical TeX files (default: True)
+
+    Returns
+    -------
+    bytes | None
+        Contents of the PDF, None if written to `file`
+
+    Raises
+    ------
+    RuntimeError
+        If xelatex is not installed or did not produce a PDF
+    """
+
+    exec_tex = "xelatex"
+    if backend == "xelatex" and shutil.which(exec_tex) is None:
+        raise RuntimeError(f"{exec_tex} was not found")
+
+    stickers = [name.rstrip() for name in names_list if name.rstrip()]
+    names_number = len(stickers)
+    suffix_groups = [group for group in suffix_groups or [] if group]
+    if suffix_groups:
+        stickers = names.add_suffixes(stickers, suffix_groups)
+        names_number = names.count_suffixed(names_number, suffix_groups)
+
+    with tempfile.TemporaryDirectory(dir=output.temp_root()) as dir_temp:
+        path_output = Path(dir_temp, "labels.pdf")
+        typeset(
+            names.skip_stickers(stickers, skip),
+            names_number + skip,
+            None if date is None else parse_date(date),
+            path_output,
+            backend=backend,
+            jobs=jobs,
+            use_cache=use_cache,
+            exec_tex=exec_tex,
+        )
+        if not path_output.exists():
+            raise RuntimeError("Typesetting failed")
+
+        if file is None:
+            return path_output.read_bytes()
+        with open(path_output, "rb") as file_pdf:
+            shutil.copyfileobj(file_pdf, file)
+    return None
@@ -0,0 +1,112 @@
+"""Locate directories for files that are kept between runs"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from platform import system
+
+CACHE_SIZE = 256 * 1024**2
+"""Maximum size in bytes of each cache before old entries are removed"""
+
+
+def cache_dir(*parts: str) -> Path:
+    """
+    Return directory for cached files, creating it if necessary
+
+    The location follows platform conventions and can be overridden with
+    the GENERATE_LABELS_CACHE environment variable.
+
+    Parameters
+    ----------
+    parts: str
+        Names of subdirectories below the cache directory
+
+    Returns
+    -------
+    Path
+        Absolute path to the directory
+    """
+
+    if "GENERATE_LABELS_CACHE" in os.environ:
+        base = Path(os.environ["GENERATE_LABELS_CACHE"])
+    elif system() == "Windows":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+        base = base / "generate-labels" / "Cache"
+    elif system() == "Darwin":
+        base = Path.home() / "Library" / "Caches" / "generate-labels"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+        base = base / "generate-labels"
+
+    path = base.joinpath(*parts).absolute()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cache_get(name: str, key: str, suffix: str = ".pdf") -> Path | None:
+    """
+    Look up cached file
+
+    Parameters
+    ----------
+    name: str
+        Name of the cache
+    key: str
+        Hash identifying the file
+    suffix: str
+        File extension (default: .pdf)
+
+    Returns
+    -------
+    Path | None
+        Path to the cached file or None if it is not cached
+    """
+
+    path = cache_dir(name).joinpath(f"{key}{suffix}")
+    if not path.exists():
+        return None
+    # Mark entry as recently used
+    os.utime(path)
+    return path
+
+
+def cache_put(
+    name: str, key: str, path_source: Path, max_size: int = CACHE_SIZE
+) -> None:
+    """
+    Copy file into cache and remove least recently used entries
+
+    Parameters
+    ----------
+    name: str
+        Name of the cache
+    key: str
+        Hash identifying the file
+    path_source: Path
+        File to cache, its extension is kept
+    max_size: int
+        Maximum size of the cache in bytes (default: 256 MiB)
+    """
+
+    dir_cache = cache_dir(name)
+    path = dir_cache.joinpath(f"{key}{path_source.suffix}")
+
+    # Copy under a temporary name first so readers never see partial files
+    file_temp, path_temp = tempfile.mkstemp(dir=dir_cache, suffix=".tmp")
+    os.close(file_temp)
+    shutil.copyfile(path_source, path_temp)
+    os.replace(path_temp, path)
+
+    # Remove least recently used entries until the cache fits
+    entries = [
+        (entry.stat().st_mtime, entry.stat().st_size, entry)
+        for entry in dir_cache.iterdir()
+        if entry.suffix != ".tmp"
+    ]
+    size = sum(entry_size for _, entry_size, _ in entries)
+    for _, entry_size, entry in sorted(entries):
+        if size <= max_size:
+            break
+        entry.unlink(missing_ok=True)
+        size -= entry_size
@@ -0,0 +1,278 @@
+"""Find out why XeLaTeX failed to typeset the stickers
+
+Errors are read from the log of the failed run and traced back to the
+pages of the TeX file they occurred on. Since errors inside the sticker
+tables are only reported once a whole table has been read, the stickers
+of those pages, or of all pages if no page could be made out, are then
+typeset in small groups by parallel XeLaTeX runs. Groups that fail are
+split further until the offending stickers are isolated.
+"""
+
+import re
+import tempfile
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from . import output, tex
+from .formatting import write_tex_pages
+from .names import Label
+
+MAX_ERRORS = 5
+"""Number of errors read from the log of the failed run"""
+
+_PAGE_MARKER = re.compile(r"% Page (\d+)$")
+
+
+class TexError(NamedTuple):
+    """Error reported in a TeX log"""
+
+    message: str
+    """Error message without the leading exclamation mark"""
+    line: int | None
+    """Line of the TeX file the error occurred in, None if not reported"""
+
+
+class Offender(NamedTuple):
+    """Sticker that can not be typeset"""
+
+    name: str
+    """Sample name"""
+    line: int | None
+    """Line of the input file the name was read from"""
+    page: int
+    """Page number, starting at 1"""
+    row: int
+    """Row on the page, starting at 1"""
+    column: int
+    """Column on the page, starting at 1"""
+    error: str
+    """First error reported when typesetting the sticker on its own"""
+
+
+def parse_log(path_log: Path, max_errors: int = MAX_ERRORS) -> list[TexError]:
+    """
+    Read errors from a TeX log
+
+    Parameters
+    ----------
+    path_log: Path
+        Log file written by TeX
+    max_errors: int
+        Largest number of errors to read (default: MAX_ERRORS)
+
+    Returns
+    -------
+    list[TexError]
+        Errors in the order they occurred
+    """
+
+    errors = []
+    message = None
+    with open(path_log, "r", errors="replace") as file_log:
+        for line in file_log:
+            if line.startswith("! "):
+                if message is not None:
+                    errors.append(TexError(message, None))
+                message = line[2:].strip()
+            elif message is not None and (match := re.match(r"l\.(\d+) ", line)):
+                errors.append(TexError(message, int(match[1])))
+                message = None
+            if len(errors) >= max_errors:
+                break
+    if message is not None and len(errors) < max_errors:
+        errors.append(TexError(message, None))
+    return errors
+
+
+def page_of_line(path_tex: Path, line_number: int) -> int | None:
+    """
+    Return page of the sticker tables a line of the TeX file belongs to
+
+    Parameters
+    ----------
+    path_tex: Path
+        TeX file written by typeset
+    line_number: int
+        Line number, starting at 1
+
+    Returns
+    -------
+    int | None
+        Page number, starting at 1, or None if the line precedes all pages
+    """
+
+    page = None
+    with open(path_tex, "r") as file_tex:
+        for number, line in enumerate(file_tex, start=1):
+            if match := _PAGE_MARKER.match(line):
+                page = int(match[1])
+            if number >= line_number:
+                break
+    return page
+
+
+def find_offenders(
+    stickers: Iterable[tuple[int, str | Label, int | None]],
+    str_date: str | None,
+    exec_tex: str = "xelatex",
+    fmt: str | None = None,
+    jobs: int = 4,
+) -> list[Offender]:
+    """
+    Typeset stickers in parallel groups to isolate those that fail
+
+    Parameters
+    ----------
+    stickers: Iterable[tuple[int, str | Label, int | None]]
+        Position on the sheet (starting at 0), contents and line in the input
+        file of the stickers to check
+    str_date: str | None
+        Date printed on stickers not labelled with their own date
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    fmt: str | None
+        Name of a format built by build_format (default: the standard format)
+    jobs: int
+        Number of TeX processes to run at the same time (default: 4)
+
+    Returns
+    -------
+    list[Offender]
+        Stickers failing on their own, in the order of their positions
+    """
+
+    # Errors of each group tested, indexed by the positions of its stickers
+    results = {}
+
+    def errors(group: Sequence[tuple]) -> list[TexError]:
+        key = tuple(position for position, _, _ in group)
+        if key not in results:
+            results[key] = compile_errors(
+                [sticker for _, sticker, _ in group], str_date, exec_tex, fmt
+            )
+        return results[key]
+
+    groups = bisect_failures(list(stickers), lambda group: bool(errors(group)), jobs)
+
+    offenders = []
+    for group in groups:
+        for position, sticker, line in group:
+            page, position_page = divmod(position, 189)
+            row, column = divmod(position_page, 7)
+            name = sticker.name if type(sticker) is Label else sticker
+            if len(group) == 1:
+                error = errors(group)[0].message
+            else:
+                error = "only fails together with neighbouring stickers"
+            offenders.append(Offender(name, line, page + 1, row + 1, column + 1, error))
+    return offenders
+
+
+def bisect_failures(
+    items: list, fails: Callable[[list], bool], jobs: int = 4
+) -> list[list]:
+    """
+    Find the smallest groups of items that fail a test
+
+    Items are split into `jobs` groups which are tested in parallel. Failing
+    groups are split again until they consist of single items, or until none
+    of their parts fails on its own. If no part of `items` fails, nothing is
+    returned.
+
+    Parameters
+    ----------
+    items: list
+        Items failing the test together
+    fails: Callable[[list], bool]
+        Test returning whether a group of items fails
+    jobs: int
+        Number of groups tested at the same time (default: 4)
+
+    Returns
+    -------
+    list[list]
+        Failing groups in the order of their items
+    """
+
+    if len(items) <= 1:
+        return [items] if items and fails(items) else []
+
+    jobs = max(jobs, 2)
+    failing = []
+    pending = [items]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending:
+            parts = []
+            for group in pending:
+                if len(group) == 1:
+                    failing.append(group)
+                    continue
+                size = -(-len(group) // jobs)
+                parts.append(
+                    (group, [group[i : i + size] for i in range(0, len(group), size)])
+                )
+
+            # Test the parts of all pending groups in one parallel round
+            results = iter(
+                list(
+                    executor.map(fails, [part for _, split in parts for part in split])
+                )
+            )
+            pending = []
+            for group, split in parts:
+                split_failing = [part for part in split if next(results)]
+                if split_failing:
+                    pending += split_failing
+                elif group is not items:
+                    # Only fails as a whole
+                    failing.append(group)
+
+    failing.sort(key=lambda group: items.index(group[0]))
+    return failing
+
+
+def compile_errors(
+    stickers: list[str | Label],
+    str_date: str | None,
+    exec_tex: str = "xelatex",
+    fmt: str | None = None,
+) -> list[TexError]:
+    """
+    Typeset stickers in a temporary directory and return the errors
+
+    Parameters
+    ----------
+    stickers: list[str | Label]
+        Sticker contents
+    str_date: str | None
+        Date printed on stickers not labelled with their own date
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    fmt: str | None
+        Name of a format built by build_format (default: the standard format)
+
+    Returns
+    -------
+    list[TexError]
+        Errors reported in the log, a single error if no PDF was written
+    """
+
+    tex_preamble, tex_end = tex.document_parts(fmt)
+
+    with tempfile.TemporaryDirectory(dir=output.temp_root()) as dir_build:
+        path_tex = Path(dir_build, "stickers.tex")
+        with open(path_tex, "w") as file_tex:
+            file_tex.write(tex_preamble)
+            write_tex_pages(
+                file_tex, iter(stickers), str_date, range(-(-len(stickers) // 189))
+            )
+            file_tex.write(tex_end)
+        tex.run_tex(path_tex, Path(dir_build), exec_tex, fmt)
+
+        path_log = path_tex.with_suffix(".log")
+        errors = parse_log(path_log, 1) if path_log.exists() else []
+        if not errors and not path_tex.with_suffix(".pdf").exists():
+            errors = [TexError("no PDF was written", None)]
+    return errors
@@ -0,0 +1,328 @@
+"""Read OpenType fonts for measuring and embedding sticker text
+
+Only the tables needed to place text on a sticker sheet are parsed: glyph
+mapping (`cmap`), advance widths (`hmtx`) and the global metrics used in a
+PDF font descriptor. Both CFF (.otf) and TrueType (.ttf) outlines are
+supported.
+"""
+
+import hashlib
+import shutil
+import struct
+import subprocess
+from pathlib import Path
+
+FONT_FILE = "cmunsx.otf"
+"""File name of the font set by preamble.tex"""
+
+FONT_FAMILY = "CMU Sans Serif:bold"
+"""Fontconfig pattern matching FONT_FILE"""
+
+
+class Font:
+    """
+    OpenType font read from a file
+
+    Parameters
+    ----------
+    path: Path
+        Path to an .otf or .ttf file
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.data = self.path.read_bytes()
+        self.tables = _read_directory(self.data)
+
+        head = self.table("head")
+        self.units_per_em = struct.unpack_from(">H", head, 18)[0]
+        self.bbox = struct.unpack_from(">4h", head, 36)
+        self.index_to_loc_format = struct.unpack_from(">h", head, 50)[0]
+
+        hhea = self.table("hhea")
+        self.ascent, self.descent = struct.unpack_from(">hh", hhea, 4)
+        number_of_hmetrics = struct.unpack_from(">H", hhea, 34)[0]
+
+        self.number_of_glyphs = struct.unpack_from(">H", self.table("maxp"), 4)[0]
+
+        # Glyphs beyond the last long metric share its advance width
+        hmtx = self.table("hmtx")
+        self.advances = [
+            struct.unpack_from(">H", hmtx, 4 * i)[0] for i in range(number_of_hmetrics)
+        ]
+        self.advances += [self.advances[-1]] * (
+            self.number_of_glyphs - number_of_hmetrics
+        )
+
+        self.cap_height = self.ascent
+        if "OS/2" in self.tables:
+            os2 = self.table("OS/2")
+            if struct.unpack_from(">H", os2, 0)[0] >= 2 and len(os2) >= 90:
+                self.cap_height = struct.unpack_from(">h", os2, 88)[0]
+
+        self.italic_angle = 0.0
+        if "post" in self.tables:
+            self.italic_angle = (
+                struct.unpack_from(">i", self.table("post"), 4)[0] / 65536
+            )
+
+        self.cmap = _read_cmap(self.table("cmap"))
+        self.name = self.path.stem
+        if "name" in self.tables:
+            self.name = _read_postscript_name(self.table("name")) or self.name
+
+    @property
+    def is_cff(self) -> bool:
+        """Whether glyph outlines are stored in a CFF table"""
+        return "CFF " in self.tables
+
+    def table(self, tag: str) -> bytes:
+        """Return raw contents of the table called `tag`"""
+        offset, length = self.tables[tag]
+        return self.data[offset : offset + length]
+
+    def glyph(self, char: str) -> int:
+        """Return glyph ID of `char` (0 if the font does not contain it)"""
+        return self.cmap.get(ord(char), 0)
+
+    def advance(self, glyph: int) -> float:
+        """Return advance width of `glyph` in thousandths of an em"""
+        return self.advances[glyph] * 1000 / self.units_per_em
+
+    def width(self, text: str, size: float = 10) -> float:
+        """Return width of `text` set at `size` in the same unit as `size`"""
+        return sum(self.advance(self.glyph(char)) for char in text) * size / 1000
+
+    def scale(self, value: float) -> float:
+        """Convert font units into thousandths of an em"""
+        return value * 1000 / self.units_per_em
+
+
+def find_font(name: str = FONT_FILE) -> Path | None:
+    """
+    Locate a font file using the TeX distribution or fontconfig
+
+    Parameters
+    ----------
+    name: str
+        File name of the font (default: cmunsx.otf)
+
+    Returns
+    -------
+    Path | None
+        Absolute path to the font or None if it could not be found
+    """
+
+    commands = [["kpsewhich", name], ["fc-match", "--format=%{file}", FONT_FAMILY]]
+    for command in commands:
+        if shutil.which(command[0]) is None:
+            continue
+        result = subprocess.run(command, capture_output=True, text=True)
+        path = Path(result.stdout.strip())
+        # fc-match falls back to any font it knows, so check the file name
+        if result.returncode == 0 and path.name == name and path.is_file():
+            return path
+    return None
+
+
+def font_digest(path_font: Path) -> str:
+    """Return hash of a font file identifying data derived from it"""
+    with open(path_font, "rb") as file_font:
+        return hashlib.file_digest(file_font, "sha256").hexdigest()[:32]
+
+
+def subset_truetype(font: Font, glyphs: set[int]) -> bytes:
+    """
+    Strip the outlines of unused glyphs from a TrueType font
+
+    Glyph IDs stay unchanged, so text can be written using the IDs of the
+    original font.
+
+    Parameters
+    ----------
+    font: Font
+        Font with TrueType outlines
+    glyphs: set[int]
+        IDs of glyphs to keep
+
+    Returns
+    -------
+    bytes
+        Font file containing only the tables needed for embedding in a PDF
+    """
+
+    glyf = font.table("glyf")
+    loca = font.table("loca")
+    if font.index_to_loc_format == 0:
+        offsets = [2 * o for o in struct.unpack(f">{len(loca) // 2}H", loca)]
+    else:
+        offsets = list(struct.unpack(f">{len(loca) // 4}I", loca))
+
+    # Keep glyph 0 (.notdef) and all components of composite glyphs
+    keep = set()
+    pending = [0, *glyphs]
+    while pending:
+        glyph = pending.pop()
+        if glyph in keep or glyph >= font.number_of_glyphs:
+            continue
+        keep.add(glyph)
+        pending += _glyph_components(glyf[offsets[glyph] : offsets[glyph + 1]])
+
+    glyf_new = bytearray()
+    loca_new = [0]
+    for glyph in range(font.number_of_glyphs):
+        if glyph in keep:
+            glyf_new += glyf[offsets[glyph] : offsets[glyph + 1]]
+            glyf_new += b"\0" * (-len(glyf_new) % 4)
+        loca_new.append(len(glyf_new))
+
+    # Always write long offsets
+    head = bytearray(font.table("head"))
+    struct.pack_into(">I", head, 8, 0)
+    struct.pack_into(">h", head, 50, 1)
+
+    tables = {
+        tag: font.table(tag)
+        for tag in ("cvt ", "fpgm", "hhea", "hmtx", "maxp", "prep")
+        if tag in font.tables
+    }
+    tables["glyf"] = bytes(glyf_new)
+    tables["head"] = bytes(head)
+    tables["loca"] = struct.pack(f">{len(loca_new)}I", *loca_new)
+
+    return _write_font(tables)
+
+
+def _read_directory(data: bytes) -> dict[str, tuple[int, int]]:
+    """Return offset and length of each table in a font file"""
+
+    sfnt_version, number_of_tables = struct.unpack_from(">4sH", data, 0)
+    if sfnt_version not in (b"OTTO", b"\0\1\0\0", b"true"):
+        raise ValueError("Not an OpenType or TrueType font")
+
+    tables = {}
+    for i in range(number_of_tables):
+        tag, _, offset, length = struct.unpack_from(">4sIII", data, 12 + 16 * i)
+        tables[tag.decode("latin-1")] = (offset, length)
+    return tables
+
+
+def _read_cmap(cmap: bytes) -> dict[int, int]:
+    """Return mapping of Unicode code points to glyph IDs"""
+
+    # Prefer full Unicode subtables (format 12) over BMP-only ones (format 4)
+    subtables = {}
+    number_of_subtables = struct.unpack_from(">H", cmap, 2)[0]
+    for i in range(number_of_subtables):
+        platform, encoding, offset = struct.unpack_from(">HHI", cmap, 4 + 8 * i)
+        if (platform, encoding) in ((3, 10), (0, 4), (0, 6), (3, 1), (0, 3)):
+            subtable_format = struct.unpack_from(">H", cmap, offset)[0]
+            subtables.setdefault(subtable_format, offset)
+
+    mapping = {}
+    if 12 in subtables:
+        offset = subtables[12]
+        number_of_groups = struct.unpack_from(">I", cmap, offset + 12)[0]
+        for i in range(number_of_groups):
+            start, end, glyph = struct.unpack_from(">III", cmap, offset + 16 + 12 * i)
+            for code in range(start, end + 1):
+                mapping[code] = glyph + code - start
+    elif 4 in subtables:
+        offset = subtables[4]
+        segments = struct.unpack_from(">H", cmap, offset + 6)[0] // 2
+        ends = struct.unpack_from(f">{segments}H", cmap, offset + 14)
+        position_starts = offset + 16 + 2 * segments
+        starts = struct.unpack_from(f">{segments}H", cmap, position_starts)
+        deltas = struct.unpack_from(
+            f">{segments}h", cmap, position_starts + 2 * segments
+        )
+        position_ranges = position_starts + 4 * segments
+        ranges = struct.unpack_from(f">{segments}H", cmap, position_ranges)
+        for i in range(segments):
+            for code in range(starts[i], ends[i] + 1):
+                if code == 0xFFFF:
+                    continue
+                if ranges[i] == 0:
+                    glyph = (code + deltas[i]) & 0xFFFF
+                else:
+                    position = (
+                        position_ranges + 2 * i + ranges[i] + 2 * (code - starts[i])
+                    )
+                    glyph = struct.unpack_from(">H", cmap, position)[0]
+                    if glyph:
+                        glyph = (glyph + deltas[i]) & 0xFFFF
+                if glyph:
+                    mapping[code] = glyph
+    return mapping
+
+
+def _read_postscript_name(name: bytes) -> str | None:
+    """Return PostScript name (name ID 6) from a `name` table"""
+
+    count, storage = struct.unpack_from(">2xHH", name, 0)
+    for i in range(count):
+        platform, _, _, name_id, length, offset = struct.unpack_from(
+            ">6H", name, 6 + 12 * i
+        )
+        if name_id != 6:
+            continue
+        raw = name[storage + offset : storage + offset + length]
+        return raw.decode("utf-16-be" if platform in (0, 3) else "latin-1")
+    return None
+
+
+def _glyph_components(glyph: bytes) -> list[int]:
+    """Return IDs of glyphs a composite TrueType glyph is built from"""
+
+    if len(glyph) < 10 or struct.unpack_from(">h", glyph, 0)[0] >= 0:
+        return []
+
+    components = []
+    position = 10
+    while True:
+        flags, component = struct.unpack_from(">HH", glyph, position)
+        components.append(component)
+        position += 4
+        position += 4 if flags & 0x0001 else 2
+        if flags & 0x0008:
+            position += 2
+        elif flags & 0x0040:
+            position += 4
+        elif flags & 0x0080:
+            position += 8
+        if not flags & 0x0020:
+            return components
+
+
+def _write_font(tables: dict[str, bytes]) -> bytes:
+    """Assemble a TrueType font file from its tables"""
+
+    tags = sorted(tables)
+    search_range = 1
+    entry_selector = 0
+    while search_range * 2 <= len(tags):
+        search_range *= 2
+        entry_selector += 1
+
+    header = struct.pack(
+        ">IHHHH",
+        0x00010000,
+        len(tags),
+        search_range * 16,
+        entry_selector,
+        len(tags) * 16 - search_range * 16,
+    )
+
+    directory = b""
+    body = b""
+    offset = 12 + 16 * len(tags)
+    for tag in tags:
+        table = tables[tag]
+        padded = table + b"\0" * (-len(table) % 4)
+        checksum = sum(struct.unpack(f">{len(padded) // 4}I", padded)) & 0xFFFFFFFF
+        directory += struct.pack(
+            ">4sIII", tag.encode("latin-1"), checksum, offset + len(body), len(table)
+        )
+        body += padded
+
+    return header + directory + body
@@ -0,0 +1,302 @@
+"""Set sample names on stickers as TeX code
+
+Names are escaped for TeX and measured in the sticker font to choose their
+font size and whether the date follows them or is set below. Whole pages
+of stickers are written as the tables of the TeX file. The same decisions
+are used by the native PDF backend, the layout index and the validation
+of names before typesetting.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Iterator
+from datetime import date
+from functools import lru_cache
+from itertools import islice, repeat
+from string import ascii_letters
+
+from . import metrics, profiling
+from .names import Label
+
+STICKER_EMPTY = "\\phantom{empty}\\par\\phantom{sticker}"
+"""TeX code of a sticker left empty"""
+
+DATE_EMPTY = "\\phantom{empty date}"
+"""TeX code of the date of stickers without one"""
+
+_TEX_ESCAPE = {
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\^{}",
+    "\\": r"\textbackslash{}",
+    "<": r"\textless{}",
+    ">": r"\textgreater{}",
+}
+"""TeX code of characters that need to be escaped"""
+
+_TEX_ESCAPE_REGEX = re.compile(
+    "|".join(
+        re.escape(str(key))
+        for key in sorted(_TEX_ESCAPE.keys(), key=lambda item: -len(item))
+    )
+)
+
+# fmt: off
+_WIDTH_DICT = {
+    '0': 55, '1': 55, '2': 55, '3': 55, '4': 55, '5': 55, '6': 55, '7': 55,
+    '8': 55, '9': 55, 'a': 53, 'b': 56, 'c': 49, 'd': 56, 'e': 51, 'f': 39,
+    'g': 55, 'h': 56, 'i': 26, 'j': 36, 'k': 53, 'l': 26, 'm': 87, 'n': 56,
+    'o': 55, 'p': 56, 'q': 56, 'r': 37, 's': 42, 't': 40, 'u': 56, 'v': 50,
+    'w': 74, 'x': 50, 'y': 50, 'z': 48, 'A': 73, 'B': 73, 'C': 70, 'D': 79,
+    'E': 64, 'F': 61, 'G': 73, 'H': 79, 'I': 33, 'J': 52, 'K': 76, 'L': 58,
+    'M': 98, 'N': 79, 'O': 79, 'P': 70, 'Q': 79, 'R': 70, 'S': 61, 'T': 73,
+    'U': 76, 'V': 73, 'W': 104, 'X': 73, 'Y': 73, 'Z': 67, '!': 37, '"': 55,
+    '#': 92, '$': 55, '%': 103, '&': 83, "'": 31, '(': 43, ')': 43, '*': 55,
+    '+': 86, ',': 31, '-': 37, '.': 31, '/': 55, ':': 31, ';': 31, '<': 86,
+    '=': 86, '>': 86, '?': 52, '@': 73, '[': 34, '\\': 55, ']': 34, '^': 67,
+    '_': 86, '`': 55, '{': 55, '|': 31, '}': 55, '~': 67, ' ': 37
+}
+# fmt: on
+"""Widths of ASCII characters in hundredths of an em"""
+
+_AVERAGE_WIDTH = 58.810526315789474
+"""Width of characters missing from _WIDTH_DICT"""
+
+
+def parse_date(input_date: str) -> str | None:
+    """
+    Turn the user's date choice into the date printed on stickers
+
+    Parameters
+    ----------
+    input_date: str
+        "today", "none" or a custom date string
+
+    Returns
+    -------
+    str | None
+        Date to print on stickers or None to leave the date empty
+    """
+
+    match input_date:
+        case "today":
+            return date.today().isoformat()
+        case "none":
+            return None
+        case _:
+            return input_date
+
+
+def write_tex_pages(
+    file_tex,
+    stickers: Iterator[str | Label | None],
+    str_date: str | None,
+    pages: range,
+    macros: bool = False,
+) -> None:
+    """
+    Write sticker tables to TeX file
+
+    Parameters
+    ----------
+    file_tex: file object
+        TeX file opened for writing
+    stickers: Iterator[str | Label | None]
+        Sticker contents, consumed one page at a time
+    str_date: str | None
+        Date to print on stickers not labelled with their own date, escaped
+        like sample names, or None to leave it empty
+    pages: range
+        Numbers of the pages to write, starting at 0
+    macros: bool
+        Define the empty sticker, the date and stickers occurring more than
+        once on a page as macros and refer to them instead of repeating their
+        contents (default: False). Definitions only span the pages written by
+        this call
+    """
+
+    str_date = DATE_EMPTY if str_date is None else tex_escape(str_date)
+    if macros:
+        # Refer to the empty sticker and the date by name from the start
+        file_tex.write(f"\\def\\LE{{{STICKER_EMPTY}}}\n\\def\\LD{{{str_date}}}\n\n")
+        str_date = "\\LD"
+        interned = {STICKER_EMPTY: "\\LE"}
+
+    # Assemble each page in memory and write it at once
+    for page_number in pages:
+        with profiling.phase("layout"):
+            stickers_page = [
+                return_sticker(name.name, tex_escape(name.date))
+                if type(name) is Label
+                else return_sticker(name, str_date)
+                for name in islice(stickers, 189)
+            ]
+            stickers_page += [STICKER_EMPTY] * (189 - len(stickers_page))
+
+            if macros:
+                definitions = []
+                for sticker, number in Counter(stickers_page).items():
+                    if number > 1 and sticker not in interned:
+                        interned[sticker] = _macro_name(len(interned) - 1)
+                        definitions.append(f"\\def{interned[sticker]}{{{sticker}}}\n")
+                stickers_page = [
+                    interned.get(sticker, sticker) for sticker in stickers_page
+                ]
+                file_tex.write("".join(definitions))
+
+        with profiling.phase("tex write"):
+            # Seven stickers per row separated by column markers
+            rows = [
+                "\t" + " & ".join(stickers_page[row : row + 7])
+                for row in range(0, 189, 7)
+            ]
+            # Add whitespace between rows and close table at the end of the page
+            file_tex.write(
+                f"% Page {page_number + 1}\n"
+                "\\begin{tabularhtx}{\\textheight}{\\linewidth}{@{}*{7}{Y}@{}}\n"
+                + " \\\\ \\interrowfill\n".join(rows)
+                + " \\\\ \\interrowspace{-1em}\n"
+                "\\end{tabularhtx}\n\n"
+            )
+
+
+def _macro_name(number: int) -> str:
+    """Return name of the TeX macro of an interned sticker, e.g. \\LSb"""
+
+    letters = ""
+    while True:
+        number, index = divmod(number, len(ascii_letters))
+        letters = ascii_letters[index] + letters
+        if not number:
+            return f"\\LS{letters}"
+
+
+@lru_cache(maxsize=65536)
+def return_sticker(name: str | None, str_date: str) -> str:
+    """
+    Return sticker content
+
+    Parameters
+    ----------
+    name: str | None
+        Sample name to print, None for an empty sticker
+    str_dat: str
+        Date to print on sticker
+
+    Returns
+    -------
+    str
+        Sticker contents written in TeX
+    """
+
+    if name is None:
+        # Return empty sticker
+        sticker = STICKER_EMPTY
+    else:
+        sticker, size, inline_date = sticker_format(name)
+        if size is not None:
+            sticker = f"{{{size} {sticker} }}"
+
+        # If sticker is long, let TeX do the word splitting,
+        # otherwise put date on new line
+        if inline_date:
+            sticker = f"{sticker} {str_date}"
+        else:
+            sticker = f"{sticker} \\par {str_date}"
+    return sticker
+
+
+def sticker_format(name: str) -> tuple[str, str | None, bool]:
+    """
+    Decide how a sample name is set on its sticker
+
+    Parameters
+    ----------
+    name: str
+        Sample name to print
+
+    Returns
+    -------
+    tuple[str, str | None, bool]
+        Sample name escaped for TeX, TeX font size command (None for the
+        default size) and whether the date follows the name in the same
+        paragraph instead of on a new line
+    """
+
+    sticker = tex_escape(name)
+    # Set smaller font size depending on the printed width of the sticker text
+    width_sticker = str_width(name)
+    if width_sticker >= 139:
+        size = "\\tiny"
+    elif width_sticker >= 104:
+        size = "\\ssmall"
+    elif width_sticker >= 88:
+        size = "\\scriptsize"
+    else:
+        size = None
+
+    # Length of the sticker including the font size group
+    length = len(sticker) if size is None else len(sticker) + len(size) + 4
+
+    return sticker, size, length > 30
+
+
+def tex_escape(text: str) -> str:
+    """
+    Escape characters for TeX output
+
+    https://stackoverflow.com/a/25875504
+
+    Parameters
+    ----------
+    text: str
+        Text to process for escapable characters
+
+    Returns
+    -------
+    str
+        Text escaped to appear correctly in TeX
+    """
+
+    return _TEX_ESCAPE_REGEX.sub(_tex_escape_match, text)
+
+
+def _tex_escape_match(match: re.Match) -> str:
+    """Return TeX code for a character matched by _TEX_ESCAPE_REGEX"""
+    return _TEX_ESCAPE[match.group()]
+
+
+def str_width(string: str, size: int = 10) -> float:
+    """
+    Calculate width of string in Computer Modern Unicode Sans Serif Bold
+
+    Widths and kerning are read from the font if it can be found, otherwise
+    approximate widths of ASCII characters are used.
+    https://stackoverflow.com/a/77351575
+
+    Parameters
+    ----------
+    string: str
+        String to be measured
+    size: int
+        Font size in pts of string (default: 10)
+
+    Returns
+    -------
+    float
+        Width of string in pts
+    """
+
+    font_metrics = metrics.load_metrics()
+    if font_metrics is not None:
+        return round(font_metrics.width(string, size))
+
+    width = sum(map(_WIDTH_DICT.get, string, repeat(_AVERAGE_WIDTH))) * (size / 100)
+
+    return round(width)
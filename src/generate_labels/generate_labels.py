@@ -9,22 +9,55 @@ generate-labels -f sample_names.txt
 """
 
 import argparse
+import csv
+import io
 import os
-import re
 import shutil
 import subprocess
 import sys
-from datetime import date
-from importlib import resources
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, count, islice, repeat
 from pathlib import Path
 from platform import system
 
 from colorama import just_fix_windows_console
 
+from . import (
+    cache,
+    diagnose,
+    formatting,
+    glyphs,
+    layout,
+    names,
+    output,
+    patterns,
+    pdf,
+    profiling,
+    tex,
+    validate,
+    watch,
+)
+
+_DUPLICATES_SHOWN = 5
+"""Number of lines of duplicate names listed unless --verbose is given"""
+
 
 def main(args=None) -> None:
     """Generate printable label layout"""
 
+    try:
+        _main(args)
+    finally:
+        # Write the profile also if the run is aborted, e.g. with --strict
+        profiling.stop()
+
+
+def _main(args: list[str] | None) -> None:
+    """Run generate-labels with command-line arguments"""
+
     class color:
         """Objects used to format console output.
 
@@ -42,22 +75,59 @@ def main(args=None) -> None:
         UNDERLINE = "\033[4m"
         END = "\033[0m"
 
+    ### Parse command line arguments ######################################
+
+    # Run HTTP server instead if requested
+    if args is None:
+        args = sys.argv[1:]
+    if args[:1] == ["serve"]:
+        from . import server
+
+        server.main(args[1:])
+        return
+
+    args = parse_args(args)
+
+    # Measure time and memory of each phase if requested
+    if args.profile is not None or args.cprofile is not None:
+        path_report = None if args.profile == "-" else args.profile
+        profiling.start(path_report, args.cprofile)
+
     ### Set up and check environment ######################################
 
-    # Make sure TeX is installed
+    # Make sure TeX is installed unless the native PDF backend is used
     EXEC_TEX = "xelatex"
-    if shutil.which(EXEC_TEX) is None:
-        sys.exit(f"{EXEC_TEX} was not found. Please install TeX")
+    needs_tex = args.backend == "xelatex" and args.dry_run is None
+    if needs_tex and shutil.which(EXEC_TEX) is None:
+        sys.exit(f"{EXEC_TEX} was not found. Please install TeX or use --backend pdf")
 
     # Fix ANSI text formatting on Windows
     just_fix_windows_console()
 
-    ### Parse command line arguments ######################################
+    # Tell which options the final compile profile overrides, see typeset
+    if args.profile_mode == "final" and needs_tex:
+        ignored = []
+        if args.jobs > 1 and (args.batch is None or args.combine):
+            ignored.append("--jobs")
+        if args.incremental:
+            ignored.append("--incremental")
+        if args.watch:
+            ignored.append("the page updates of --watch")
+        if ignored:
+            print(
+                f"{color.BOLD + color.YELLOW}"
+                "--profile-mode final typesets the whole sheet in a single run, "
+                f"ignoring {' and '.join(ignored)}"
+                f"{color.END}"
+            )
 
-    args = parse_args(args)
+    # Process multiple input files without any interaction
+    if args.batch is not None:
+        _run_batch(args, color, EXEC_TEX)
+        return
 
     # Print warning about command-line arguments if none are set
-    if args.input_file is None and not args.interactive:
+    if args.input_file is None and args.pattern is None and not args.interactive:
         print(
             f"{color.BOLD + color.YELLOW}"
             "As of version 2.4.0 generate-labels supports command-line "
@@ -75,7 +145,7 @@ def main(args=None) -> None:
     retry = "no"
 
     # Keep asking for file names until file exists or user aborts script
-    while True:
+    while args.pattern is None:
         # Check if input file has been set through cmd line args
         if args.input_file is None or retry == "yes":
             # Get input file name from user and store its name in variable
@@ -88,15 +158,18 @@ def main(args=None) -> None:
         else:
             input_file = args.input_file
 
-        # Resolve input path
-        path_input = Path(input_file).absolute().resolve()
+        with profiling.phase("paths"):
+            # Resolve input path
+            path_input = Path(input_file).absolute().resolve()
+
+            # Check if user input includes ".txt" suffix and add it if absent
+            if path_input.suffix not in names.INPUT_SUFFIXES:
+                path_input = path_input.with_suffix(".txt")
 
-        # Check if user input includes ".txt" suffix and add it if absent
-        if path_input.suffix != ".txt":
-            path_input = path_input.with_suffix(".txt")
+            input_exists = path_input.exists()
 
         # If file does not exist, print error message and exit script
-        if not path_input.exists():
+        if not input_exists:
             print(
                 f"\n{color.BOLD + color.RED}File not found:\n"
                 f"{path_input}\n"
@@ -126,21 +199,40 @@ def main(args=None) -> None:
         else:
             break
 
-    # Read lines from file, filter out empty ones and convert to list
-    with open(path_input, "r") as file:
-        names_list = list(filter(None, (line.rstrip() for line in file)))
+    if args.pattern is not None:
+        # Generate names from the pattern instead of reading them from a file
+        path_input = patterns.NamePattern(args.pattern)
+        columns = None
+    else:
+        # Read name, date and copy count columns from CSV and TSV files
+        columns = names.table_columns(
+            path_input, args.name_column, args.date_column, args.copies_column
+        )
 
-    names_number = len(names_list)
+    # Count non-empty lines, the names themselves are read again when needed
+    with profiling.phase("read"):
+        try:
+            names_number, names_preview = names.scan_names(path_input, columns)
+        except ValueError as error:
+            sys.exit(f"{path_input.name}: {error}")
+    if names_number == 0:
+        sys.exit(f"{path_input.name} does not contain any sample names")
 
     # Print some of the sample names
     print(
         f"\n{color.BOLD + color.DARKCYAN}"
-        f"Your file contains {names_number} names:\n"
-        f"{_print_samples(names_list, names_number)}"
+        f"Your {'file' if args.pattern is None else 'pattern'} contains "
+        f"{names_number} names:\n"
+        f"{_print_samples(names_preview, names_number)}"
         f"{color.END}"
     )
 
     # Set name of output file depending on command line arguments
+    # Name output after the input file, or "labels" for generated names
+    if args.pattern is None:
+        file_default, name_default = path_input, "the name of the input file"
+    else:
+        file_default = name_default = "labels"
     if args.output_file is None:
         if args.interactive:
             # Ask user whether they want to continue with the sample names
@@ -159,26 +251,30 @@ def main(args=None) -> None:
             file_output = input(
                 f"\n{color.BOLD + color.DARKCYAN}Type the name of your output "
                 'file without suffix (e.g. "file" instead of "file.txt"). '
-                "Press [ENTER] to use the name of the input file (default): "
+                f"Press [ENTER] to use {name_default} (default): "
                 f"{color.END}"
             )
 
             if not file_output:
-                file_output = path_input
+                file_output = file_default
         else:
-            file_output = path_input
+            file_output = file_default
     else:
         file_output = args.output_file
 
     # Resolve output path
-    path_output = Path(file_output).absolute().resolve().with_suffix(".pdf")
+    with profiling.phase("paths"):
+        path_output = Path(file_output).absolute().resolve().with_suffix(".pdf")
 
     ### Construct sample names using suffixes #############################
 
+    # Collect suffix groups set through command line arguments
+    suffix_groups = _suffix_groups(args)
+
     if args.add_suffixes:
         input_suffix = True
     else:
-        if args.interactive:
+        if args.interactive and not suffix_groups:
             # Ask user whether to add suffixes
             input_suffix = input(
                 f"\n{color.BOLD + color.DARKCYAN}"
@@ -204,10 +300,6 @@ def main(args=None) -> None:
             f"Strain1-TREAT1-Replicate2 ...).{color.END}"
         )
 
-        # Initiate list with names to be modified
-        names_list_new = []
-        names_list_old = names_list
-
         # Keep asking for suffixes until user stops loop.
         while True:
             # Ask for group of suffixes
@@ -220,16 +312,7 @@ def main(args=None) -> None:
                 print(f"\n{color.BOLD + color.RED}No suffix group entered.{color.END}")
             else:
                 # Split input into list of words
-                input_suffixes = input_suffix_group.split()
-
-                names_list_new = []
-
-                # Loop through names and add suffixe
-                for name in names_list_old:
-                    for suffix in input_suffixes:
-                        names_list_new.append(f"{name}-{suffix}")
-
-                names_list_old = names_list_new
+                suffix_groups.append(input_suffix_group.split())
 
             # Ask user whether to add another level of suffixes
             input_suffix_continue = input(
@@ -244,31 +327,68 @@ def main(args=None) -> None:
             else:
                 continue
 
-        # Set path to which txt file with suffixed sample names will be written
-        path_suffix = Path(
-            f"{str(path_output.parent)}/{path_output.stem}_suffix{path_output.suffix}"
-        )
-
-        # Remove old output file if it exists
-        try:
-            path_suffix.unlink()
-        except FileNotFoundError:
-            pass
+        if not suffix_groups:
+            print(
+                f"\n{color.BOLD + color.RED}"
+                "No suffixes entered. Skipping addition of suffixes"
+                f"{color.END}"
+            )
 
-        # Replace original list of sample names with suffixed names
-        try:
-            # Write new sample names to new output file
-            with open(path_suffix, "a+") as file_samples:
-                for item in names_list_new:
-                    file_samples.write(f"{item}\n")
+    if suffix_groups:
+        # Count suffixed names before generating any of them
+        names_suffixed_number = names.count_suffixed(names_number, suffix_groups)
+        print(
+            f"\n{color.BOLD + color.DARKCYAN}"
+            f"Adding {len(suffix_groups)} suffix group(s) to {names_number} names "
+            f"results in {names_suffixed_number} stickers"
+            f"{color.END}"
+        )
 
-            names_list = names_list_new
-        except NameError:
+        if names_suffixed_number > names.SUFFIX_WARNING:
             print(
                 f"\n{color.BOLD + color.RED}"
-                "No suffixes entered. Skipping addition of suffixes"
+                f"Warning: {names_suffixed_number} stickers fill "
+                f"{-(-names_suffixed_number // 189)} pages"
                 f"{color.END}"
             )
+            if args.interactive:
+                input_continue = input(
+                    f"{color.BOLD + color.DARKCYAN}Do you want to continue? "
+                    f'Type "yes" or "no" (default): {color.END}'
+                ).casefold()
+                if input_continue != "yes":
+                    sys.exit()
+
+        # Set path to which txt file with suffixed sample names will be written
+        path_suffix = path_output.with_name(f"{path_output.stem}_suffix.txt")
+
+        # Write new sample names to new output file as they are generated
+        with profiling.phase("suffixing"), open(path_suffix, "w") as file_samples:
+            file_samples.writelines(
+                f"{names.label_name(name)}\n"
+                for name in names.add_suffixes(
+                    names.read_names(path_input, columns), suffix_groups
+                )
+            )
+
+        names_number = names_suffixed_number
+
+    ### Validate sample names #############################################
+
+    # Report problems before spending time on typesetting
+    with profiling.phase("validate"):
+        problems = validate.validate_names(
+            path_input,
+            suffix_groups,
+            check_glyphs=not args.substitute,
+            columns=columns,
+        )
+    _print_problems(path_input, problems, color, args.verbose)
+    if problems and args.strict:
+        sys.exit("Aborting because of problems in the input file (--strict)")
+
+    # Replace characters missing from the font if requested
+    substitute = _substitution(args, color)
 
     ### Customise printable layout ########################################
 
@@ -292,9 +412,8 @@ def main(args=None) -> None:
     else:
         input_skip = args.skip
 
-    # Prepend empty items to list of names for each sticker to skip
-    names_list = ([None] * input_skip) + names_list
-    names_number = len(names_list)
+    # Count empty stickers for each sticker to skip
+    names_number = names_number + input_skip
 
     # Set date depending on combination of args
     if args.date is None:
@@ -316,112 +435,752 @@ def main(args=None) -> None:
         input_date = args.date
 
     # Set str_date variable depending on user's date choice
-    match input_date:
-        case "today":
-            str_date = date.today().isoformat()
-        case "none":
-            str_date = "\\phantom{empty date}"
-        case _:
-            str_date = input_date
+    str_date = formatting.parse_date(input_date)
+
+    # Write where each sticker goes instead of typesetting if requested
+    if args.dry_run is not None:
+        path_layout = (
+            path_output.with_name(f"{path_output.stem}_layout.csv")
+            if args.dry_run == "-"
+            else Path(args.dry_run)
+        )
+        with profiling.phase("layout"):
+            placements_number = layout.write_layout(
+                path_layout,
+                layout.layout_index(
+                    names.sticker_names(
+                        path_input, suffix_groups, input_skip, substitute, columns
+                    ),
+                    str_date,
+                ),
+            )
+        print(
+            f"\n{color.BOLD + color.DARKCYAN}"
+            f"Wrote the placement of {placements_number} stickers on "
+            f"{-(-names_number // 189)} pages to {path_layout}"
+            f"{color.END}"
+        )
+        profiling.stop()
+        return
 
-    ### Typeset TeX file ##################################################
+    overlength = False
+
+    def sticker_names() -> Iterator[str | names.Label | None]:
+        """Set up pipeline of sticker contents, read lazily from the input file"""
+
+        nonlocal overlength
+
+        # Check if any sample names are above the maximum recommended length
+        for name in names.sticker_names(
+            path_input, suffix_groups, input_skip, substitute, columns
+        ):
+            if name is not None and len(names.label_name(name)) > 30:
+                overlength = True
+            yield name
+
+    def warn_overlength() -> None:
+        """Print warning if overly long sample names were found"""
+
+        if overlength:
+            print(
+                f"\n{color.BOLD + color.RED}"
+                "Warning: Some of the sample names are overly long, which might "
+                "disrupt the final layout. Please inspect the resulting PDF "
+                "carefully before printing"
+                f"{color.END}"
+            )
+
+    # Keep track of page hashes from the start when watching for changes
+    incremental = args.incremental or args.watch
+
+    if args.pages_per_file is not None:
+        # Typeset one file after the other so that printing can start early
+        pages_new = pages_total = 0
+        paths_chunk = []
+        time_start = time.perf_counter()
+        for number, (path_chunk, pages_chunk, pages_chunk_total) in enumerate(
+            typeset_chunks(
+                sticker_names(),
+                names_number,
+                str_date,
+                path_output,
+                args.pages_per_file,
+                backend=args.backend,
+                jobs=args.jobs,
+                incremental=incremental,
+                use_cache=not args.no_cache,
+                exec_tex=EXEC_TEX,
+                macros=args.tex_macros,
+                lock=args.lock,
+                mode=args.profile_mode,
+            )
+        ):
+            print(
+                f"\n{color.BOLD + color.DARKCYAN}"
+                f"Finished {path_chunk.name} ({pages_chunk_total} pages)"
+                f"{color.END}"
+            )
+            pages_new += pages_chunk
+            pages_total += pages_chunk_total
+            paths_chunk.append(path_chunk)
+            if number == 0:
+                _open_pdf(path_chunk, args.no_open)
+        warn_overlength()
+        if args.profile_mode is not None and args.backend == "xelatex":
+            _print_compile_report(
+                args.profile_mode, time.perf_counter() - time_start, paths_chunk, color
+            )
+        print(
+            f"\n{color.BOLD + color.DARKCYAN}"
+            f"Names are listed by file in {_manifest_path(path_output).name}"
+            f"{color.END}"
+        )
+        if args.incremental:
+            print(
+                f"\n{color.BOLD + color.DARKCYAN}"
+                f"Typeset {pages_new} of {pages_total} pages"
+                f"{color.END}"
+            )
+        profiling.stop()
+    else:
+        # Typeset stickers and report on the outcome
+        time_start = time.perf_counter()
+        pages_new, pages_total = typeset(
+            sticker_names(),
+            names_number,
+            str_date,
+            path_output,
+            backend=args.backend,
+            jobs=args.jobs,
+            incremental=incremental,
+            use_cache=not args.no_cache,
+            exec_tex=EXEC_TEX,
+            macros=args.tex_macros,
+            lock=args.lock,
+            mode=args.profile_mode,
+        )
+        seconds = time.perf_counter() - time_start
+        warn_overlength()
+
+        if args.profile_mode is not None and args.backend == "xelatex":
+            _print_compile_report(args.profile_mode, seconds, [path_output], color)
+
+        if args.incremental:
+            print(
+                f"\n{color.BOLD + color.DARKCYAN}"
+                f"Typeset {pages_new} of {pages_total} pages"
+                f"{color.END}"
+            )
+
+        # Trace errors back to the sample names causing them
+        if args.backend == "xelatex" and not path_output.exists():
+            stickers = zip(
+                count(),
+                names.sticker_names(
+                    path_input, suffix_groups, input_skip, substitute, columns
+                ),
+                chain(
+                    repeat(None, input_skip),
+                    names.source_lines(path_input, suffix_groups, columns),
+                ),
+            )
+            with profiling.phase("diagnose"):
+                _report_failure(path_output, stickers, str_date, EXEC_TEX, color)
+
+        try:
+            with profiling.phase("open"):
+                _open_pdf(path_output.with_suffix(".pdf"), args.no_open)
+        finally:
+            profiling.stop()
 
-    # set paths to typesetting and output files
-    DIR_RESOURCES = resources.files().joinpath("resources")
-    PATH_PREAMBLE = DIR_RESOURCES.joinpath("preamble.tex")
-    PATH_TEX = path_output.with_suffix(".tex")
+    ### Rebuild whenever the input file changes ###########################
+
+    if not args.watch:
+        return
+
+    def rebuild() -> None:
+        """Typeset changed pages again, reusing what is held in memory"""
+
+        nonlocal overlength
+        overlength = False
+
+        try:
+            names_number = names.scan_names(path_input, columns)[0]
+        except (OSError, ValueError) as error:
+            print(f"\n{color.BOLD + color.RED}{path_input.name}: {error}{color.END}")
+            return
+        names_number = names.count_suffixed(names_number, suffix_groups)
+
+        problems = validate.validate_names(
+            path_input,
+            suffix_groups,
+            check_glyphs=not args.substitute,
+            columns=columns,
+        )
+        _print_problems(path_input, problems, color, args.verbose)
+
+        # Stickers formatted before are taken from the memo of
+        # formatting.return_sticker
+        # and unchanged pages from the previous PDF
+        if args.pages_per_file is not None:
+            pages_new = pages_total = 0
+            for _, pages_chunk, pages_chunk_total in typeset_chunks(
+                sticker_names(),
+                names_number + input_skip,
+                str_date,
+                path_output,
+                args.pages_per_file,
+                backend=args.backend,
+                incremental=True,
+                exec_tex=EXEC_TEX,
+                macros=args.tex_macros,
+                lock=args.lock,
+                mode=args.profile_mode,
+            ):
+                pages_new += pages_chunk
+                pages_total += pages_chunk_total
+        else:
+            pages_new, pages_total = typeset(
+                sticker_names(),
+                names_number + input_skip,
+                str_date,
+                path_output,
+                backend=args.backend,
+                incremental=True,
+                exec_tex=EXEC_TEX,
+                macros=args.tex_macros,
+                lock=args.lock,
+                mode=args.profile_mode,
+            )
+        warn_overlength()
+
+        print(
+            f"\n{color.BOLD + color.DARKCYAN}"
+            f"{time.strftime('%H:%M:%S')} Typeset {pages_new} of {pages_total} "
+            f"pages for {names_number} names"
+            f"{color.END}"
+        )
 
-    # Remove old output file if one already exist
+    print(
+        f"\n{color.BOLD + color.DARKCYAN}"
+        f"Watching {path_input.name} for changes. Press [CTRL+C] to stop"
+        f"{color.END}"
+    )
     try:
-        PATH_TEX.unlink()
-    except FileNotFoundError:
+        watch.watch(path_input, rebuild)
+    except KeyboardInterrupt:
         pass
 
+
+def _run_batch(args: argparse.Namespace, color: type, exec_tex: str) -> None:
+    """
+    Generate labels for multiple input files
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        Parsed command line arguments
+    color: type
+        Console formatting codes
+    exec_tex: str
+        Name of the TeX executable
+    """
+
+    paths_input = names.expand_inputs(args.batch)
+    if not paths_input:
+        sys.exit(f"No input files found matching {' '.join(args.batch)}")
+
+    suffix_groups = _suffix_groups(args)
+    str_date = formatting.parse_date("today" if args.date is None else args.date)
+    input_skip = 0 if args.skip is None else args.skip
+
+    # Read name, date and copy count columns from CSV and TSV files
+    columns_files = {
+        path_input: names.table_columns(
+            path_input, args.name_column, args.date_column, args.copies_column
+        )
+        for path_input in paths_input
+    }
+
+    # Count names of all files up front, also catching unreadable files early
+    names_numbers = []
+    for path_input in paths_input:
+        try:
+            names_number = names.scan_names(path_input, columns_files[path_input])[0]
+        except ValueError as error:
+            sys.exit(f"{path_input.name}: {error}")
+        names_numbers.append(names.count_suffixed(names_number, suffix_groups))
+
+    # Report problems of all files before typesetting any of them
+    problems_any = False
+    for path_input in paths_input:
+        problems = validate.validate_names(
+            path_input,
+            suffix_groups,
+            check_glyphs=not args.substitute,
+            columns=columns_files[path_input],
+        )
+        _print_problems(path_input, problems, color, args.verbose)
+        problems_any = problems_any or bool(problems)
+    if problems_any and args.strict:
+        sys.exit("Aborting because of problems in the input files (--strict)")
+
+    substitute = _substitution(args, color)
+
+    # Build format once instead of in every job
+    if args.backend == "xelatex":
+        tex.build_format(exec_tex)
+
+    summary = []
+    """Rows of file name, number of names, pages, seconds and status"""
+
+    if args.combine:
+        # Start each file on a new page of a single document
+        path_output = Path(args.output_file or "labels.pdf")
+        path_output = path_output.absolute().resolve().with_suffix(".pdf")
+
+        stickers = []
+        names_total = input_skip
+        for number, (path_input, names_number) in enumerate(
+            zip(paths_input, names_numbers)
+        ):
+            skip = input_skip if number == 0 else 0
+            stickers.append(
+                names.pad_page(
+                    names.sticker_names(
+                        path_input,
+                        suffix_groups,
+                        skip,
+                        substitute,
+                        columns_files[path_input],
+                    ),
+                    names_number + skip,
+                )
+            )
+            names_total += names_number + (-(names_number + skip) % 189)
+
+        time_start = time.perf_counter()
+        typeset(
+            chain.from_iterable(stickers),
+            names_total,
+            str_date,
+            path_output,
+            backend=args.backend,
+            use_cache=not args.no_cache,
+            jobs=args.jobs,
+            exec_tex=exec_tex,
+            macros=args.tex_macros,
+            lock=args.lock,
+            mode=args.profile_mode,
+        )
+        seconds = time.perf_counter() - time_start
+        status = "ok" if path_output.exists() else "failed"
+
+        page_start = 1
+        for number, (path_input, names_number) in enumerate(
+            zip(paths_input, names_numbers)
+        ):
+            pages = -(-(names_number + (input_skip if number == 0 else 0)) // 189)
+            summary.append(
+                (
+                    path_input.name,
+                    names_number,
+                    f"{page_start}-{page_start + pages - 1}",
+                    seconds,
+                    status,
+                )
+            )
+            page_start += pages
+    else:
+        # Write PDFs next to the input files or into the output directory
+        dir_output = None
+        if args.output_file is not None:
+            dir_output = Path(args.output_file).absolute().resolve()
+            dir_output.mkdir(parents=True, exist_ok=True)
+
+        def run_file(path_input: Path, names_number: int) -> tuple:
+            """Typeset a single input file and return its summary row"""
+
+            path_output = path_input.with_suffix(".pdf")
+            if dir_output is not None:
+                path_output = dir_output.joinpath(path_output.name)
+
+            time_start = time.perf_counter()
+            try:
+                # Report all pages, also if they were taken from the cache
+                _, pages = typeset(
+                    names.sticker_names(
+                        path_input,
+                        suffix_groups,
+                        input_skip,
+                        substitute,
+                        columns_files[path_input],
+                    ),
+                    names_number + input_skip,
+                    str_date,
+                    path_output,
+                    backend=args.backend,
+                    incremental=args.incremental,
+                    use_cache=not args.no_cache,
+                    exec_tex=exec_tex,
+                    macros=args.tex_macros,
+                    lock=args.lock,
+                    mode=args.profile_mode,
+                )
+                status = "ok" if path_output.exists() else "failed"
+            except (
+                OSError,
+                ValueError,
+                RuntimeError,
+                subprocess.CalledProcessError,
+            ) as error:
+                # Unreadable files and failing tools only fail their own file
+                pages = 0
+                status = f"failed: {error}"
+            seconds = time.perf_counter() - time_start
+
+            return path_input.name, names_number, pages, seconds, status
+
+        # Files are typeset in parallel by a shared pool of workers, except
+        # while profiling, as the peak memory of phases is process-wide
+        workers = 1 if profiling.enabled() else max(args.jobs, 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            summary = list(executor.map(run_file, paths_input, names_numbers))
+
+    # Print per-file summary
+    width = max(len(row[0]) for row in summary)
+    print(
+        f"\n{color.BOLD + color.DARKCYAN}"
+        f"{'File':<{width}}  {'Names':>8}  {'Pages':>9}  {'Seconds':>8}  Status"
+        f"{color.END}"
+    )
+    for file_name, names_number, pages, seconds, status in summary:
+        color_status = color.GREEN if status == "ok" else color.RED
+        print(
+            f"{file_name:<{width}}  {names_number:>8}  {pages!s:>9}  {seconds:>8.2f}  "
+            f"{color_status}{status}{color.END}"
+        )
+
+    if args.combine:
+        _open_pdf(path_output, args.no_open)
+    elif any(row[4] != "ok" for row in summary):
+        sys.exit("Some input files could not be typeset")
+
+
+def typeset(
+    stickers: Iterable[str | names.Label | None],
+    names_number: int,
+    str_date: str | None,
+    path_output: Path,
+    backend: str = "xelatex",
+    jobs: int = 1,
+    incremental: bool = False,
+    use_cache: bool = True,
+    exec_tex: str = "xelatex",
+    macros: bool = False,
+    lock: bool = False,
+    mode: str | None = None,
+) -> tuple[int, int]:
+    """
+    Typeset stickers into a PDF file
+
+    Files are built in a temporary directory of their own and the PDF is
+    then moved into place atomically. If typesetting fails, the TeX file
+    and log are kept next to `path_output` instead
+
+    Parameters
+    ----------
+    stickers: Iterable[str | names.Label | None]
+        Sticker contents, None for stickers to leave empty
+    names_number: int
+        Number of stickers, including empty ones
+    str_date: str | None
+        Date to print on stickers not labelled with their own date, None to
+        leave the date empty
+    path_output: Path
+        Path of the PDF file
+    backend: str
+        "xelatex" (default) or "pdf" to use the built-in PDF writer
+    jobs: int
+        Number of xelatex processes typesetting pages in parallel (default: 1)
+    incremental: bool
+        Only typeset pages that changed since the last run (default: False)
+    use_cache: bool
+        Reuse PDFs typeset from identical TeX files (default: True)
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    macros: bool
+        Define recurring sticker contents as TeX macros once instead of
+        repeating them (default: False)
+    lock: bool
+        Hold an advisory lock on `path_output` while typesetting, so that
+        runs writing the same file take turns (default: False)
+    mode: str | None
+        Compile profile, "draft" for fast proofs without compression or
+        "final" for the smallest PDF typeset in a single run (default:
+        XeTeX's own settings)
+
+    Returns
+    -------
+    tuple[int, int]
+        Number of pages typeset in this run and total number of pages
+    """
+
+    if lock:
+        # Wait for other runs writing the same file to finish
+        with output.lock(path_output):
+            return typeset(
+                stickers,
+                names_number,
+                str_date,
+                path_output,
+                backend,
+                jobs,
+                incremental,
+                use_cache,
+                exec_tex,
+                macros,
+                mode=mode,
+            )
+
+    stickers = iter(stickers)
+
     # Calculate number of pages necessary to fit all stickers (including skipped ones)
     tex_pages = names_number // 189
     # Add page for remaining stickers
     if names_number % 189 > 0:
         tex_pages = tex_pages + 1
 
-    # Check if any sample names are above the maximum recommended length
-    overlength = False
-    for name in names_list:
-        if name is not None:
-            if len(name) > 30:
-                overlength = True
+    ### Typeset PDF file natively #########################################
 
-    if overlength:
-        print(
-            f"\n{color.BOLD + color.RED}"
-            "Warning: Some of the sample names are overly long, which might "
-            "disrupt the final layout. Please inspect the resulting PDF carefully "
-            "before printing"
-            f"{color.END}"
-        )
+    if backend == "pdf":
+        with tempfile.TemporaryDirectory(dir=output.temp_root()) as dir_build:
+            path_built = Path(dir_build, path_output.name)
+            with profiling.phase("pdf"):
+                pdf.write_pdf(path_built, stickers, str_date)
+            output.publish(path_built, path_output)
+        return tex_pages, tex_pages
 
-    # Create TeX file and write to it
-    with open(PATH_TEX, "a+") as file_tex:
-        # Write contents of preamble file to output file
-        with open(PATH_PREAMBLE, "r") as file_preamble:
-            for line in file_preamble:
-                file_tex.write(line)
-            file_tex.write("\n")
-
-        n = 0
-        """Track current position in the list of names"""
-
-        # Loop through pages of final sticker layout
-        for page_number in range(tex_pages):
-            # Start each page with the opening of the table environment
-            file_tex.write(
-                f"% Page {page_number + 1}\n"
-                "\\begin{tabularhtx}{\\textheight}{\\linewidth}{@{}*{7}{Y}@{}}\n"
-            )
+    ### Typeset TeX file ##################################################
+
+    if mode == "final":
+        # Spliced and merged PDFs would carry a font subset for every part
+        jobs, incremental = 1, False
+
+    # set paths to output files
+    PATH_PDF = path_output.with_suffix(".pdf")
+    PATHS_DEBUG = [PATH_PDF.with_suffix(".tex"), PATH_PDF.with_suffix(".log")]
+
+    # Load packages from a precompiled format file if possible
+    with profiling.phase("compile"):
+        tex_format = tex.build_format(exec_tex)
+    # Write preamble, leaving out what the format contains
+    tex_preamble, tex_end = tex.document_parts(tex_format)
+
+    if incremental:
+
+        def pages_tex() -> Iterator[str]:
+            """Render TeX code of one page at a time"""
+
+            for page_number in range(tex_pages):
+                buffer_page = io.StringIO()
+                formatting.write_tex_pages(
+                    buffer_page,
+                    stickers,
+                    str_date,
+                    range(page_number, page_number + 1),
+                    macros,
+                )
+                yield buffer_page.getvalue()
 
-            # Loop through rows
-            for line_number in range(27):
-                # Add tab character at beginning of line to increase readability
-                file_tex.write("\t")
-                # Loop through columns
-                for position in range(7):
-                    # Print unprinted sample names
-                    if position < 6:
-                        file_tex.write(f"{_return_sticker(n, names_list, str_date)} & ")
-                    elif position == 6:
-                        file_tex.write(f"{_return_sticker(n, names_list, str_date)}")
+        # Typeset changed pages only and splice them into the existing PDF
+        return tex.run_incremental(
+            pages_tex(), PATH_PDF, tex_preamble, tex_end, exec_tex, tex_format, mode
+        )
+
+    jobs = min(max(jobs, 1), tex_pages)
+    # Build in a directory of this run only, so that concurrent runs writing
+    # to the same directory do not overwrite each other's files
+    with tempfile.TemporaryDirectory(dir=output.temp_root()) as dir_build:
+        PATH_TEX = Path(dir_build, f"{PATH_PDF.stem}.tex")
+        path_built = PATH_TEX.with_suffix(".pdf")
+
+        if jobs > 1:
+            # Split pages into consecutive chunks to be typeset in parallel
+            chunks = [
+                range(i * tex_pages // jobs, (i + 1) * tex_pages // jobs)
+                for i in range(jobs)
+            ]
+            paths_chunk = []
+            for chunk_number, pages in enumerate(chunks):
+                path_chunk = Path(dir_build, f"chunk{chunk_number}.tex")
+                with open(path_chunk, "w") as file_tex:
+                    with profiling.phase("tex write"):
+                        file_tex.write(tex_preamble)
+                    formatting.write_tex_pages(
+                        file_tex, stickers, str_date, pages, macros
+                    )
+                    with profiling.phase("tex write"):
+                        file_tex.write(tex_end)
+                paths_chunk.append((path_chunk, len(pages)))
+            paths_tex = [path_chunk for path_chunk, _ in paths_chunk]
+        else:
+            # Create TeX file and write to it
+            with open(PATH_TEX, "w") as file_tex:
+                with profiling.phase("tex write"):
+                    file_tex.write(tex_preamble)
+                formatting.write_tex_pages(
+                    file_tex, stickers, str_date, range(tex_pages), macros
+                )
+                with profiling.phase("tex write"):
+                    file_tex.write(tex_end)
+            paths_tex = [PATH_TEX]
+
+        with profiling.phase("compile"):
+            # Reuse PDF typeset from identical TeX files if available
+            key = tex.output_key(paths_tex, exec_tex, mode) if use_cache else None
+            path_cached = None if key is None else cache.cache_get("output", key)
+            if path_cached is not None:
+                output.publish(path_cached, PATH_PDF)
+                for path_debug in PATHS_DEBUG:
+                    path_debug.unlink(missing_ok=True)
+                return 0, tex_pages
+
+            # Reuse XDV file typeset in another compile profile if available
+            key_xdv = None
+            path_xdv = None
+            if key is not None and mode is not None and jobs == 1:
+                key_xdv = tex.output_key(paths_tex, exec_tex)
+                path_xdv = cache.cache_get("xdv", key_xdv, ".xdv")
+
+            # Call TeX executable to typeset .tex file(s)
+            if jobs > 1:
+                tex.run_parallel(
+                    paths_chunk, path_built, exec_tex, tex_format, jobs, mode
+                )
+            elif path_xdv is not None:
+                tex.run_driver(path_xdv, path_built, mode)
+            else:
+                tex.run_tex(PATH_TEX, Path(dir_build), exec_tex, tex_format, mode)
+                if key_xdv is not None and PATH_TEX.with_suffix(".xdv").exists():
+                    cache.cache_put("xdv", key_xdv, PATH_TEX.with_suffix(".xdv"))
+
+            if path_built.exists():
+                output.publish(path_built, PATH_PDF)
+                if key is not None:
+                    cache.cache_put("output", key, path_built)
+                for path_debug in PATHS_DEBUG:
+                    path_debug.unlink(missing_ok=True)
+            else:
+                # Remove old PDF so that a failed run is not mistaken for
+                # success, and keep the TeX file and log for inspection. Of
+                # parallel runs, those of the first chunk that failed are
+                # kept, whose page markers count from the first page as well
+                PATH_PDF.unlink(missing_ok=True)
+                path_failed = next(
+                    (
+                        path
+                        for path in paths_tex
+                        if not path.with_suffix(".pdf").exists()
+                    ),
+                    PATH_TEX,
+                )
+                for path_debug in PATHS_DEBUG:
+                    path_source = path_failed.with_suffix(path_debug.suffix)
+                    if path_source.exists():
+                        output.publish(path_source, path_debug)
                     else:
-                        break
-                    n += 1
-                # Add whitespace between rows
-                if line_number == 26:
-                    file_tex.write(" \\\\ \\interrowspace{-1em}\n")
-                else:
-                    file_tex.write(" \\\\ \\interrowfill\n")
-            # Close table environment at the end of the page
-            file_tex.write("\\end{tabularhtx}\n\n")
-        # Reenable command line output and end document
-        file_tex.write("\\scrollmode\n\\end{document}")
+                        path_debug.unlink(missing_ok=True)
 
-    # Call TeX executable to typeset .tex file
-    subprocess.run(
-        [EXEC_TEX, f"-output-directory={path_output.parent}/", PATH_TEX],
-        stdout=subprocess.DEVNULL,
-    )
+    return tex_pages, tex_pages
 
-    PATH_PDF = PATH_TEX.with_suffix(".pdf")
 
-    if args.no_open:
-        return
-    elif PATH_PDF.exists():
-        # Open resulting PDF in an OS-dependent manner
-        if system() == "Darwin":
-            subprocess.run(["open", PATH_PDF])
-        elif system() == "Windows":
-            os.startfile(PATH_PDF)  # type: ignore
-        else:
-            subprocess.run(["xdg-open", PATH_PDF])
-    else:
-        sys.exit(f"Output PDF not found at {PATH_PDF}")
+def typeset_chunks(
+    stickers: Iterable[str | names.Label | None],
+    names_number: int,
+    str_date: str | None,
+    path_output: Path,
+    pages_per_file: int,
+    **kwargs,
+) -> Iterator[tuple[Path, int, int]]:
+    """
+    Typeset stickers into numbered PDF files of a limited number of pages
+
+    Files are named after `path_output` with a running number, e.g.
+    labels_001.pdf, and typeset one after the other. Each file is yielded as
+    soon as it is finished. A manifest listing the file, page, row and
+    column of every sample name is written next to them.
+
+    Parameters
+    ----------
+    stickers: Iterable[str | names.Label | None]
+        Sticker contents, None for stickers to leave empty
+    names_number: int
+        Number of stickers, including empty ones
+    str_date: str | None
+        Date to print on stickers, None to leave the date empty
+    path_output: Path
+        Path the names of the PDF files are derived from
+    pages_per_file: int
+        Largest number of pages in a file
+    **kwargs
+        Passed on to typeset
+
+    Yields
+    ------
+    tuple[Path, int, int]
+        Path of a finished file, number of pages typeset in this run and
+        number of pages of the file
+    """
+
+    stickers = iter(stickers)
+    stickers_per_file = max(pages_per_file, 1) * 189
+    files_number = max(-(-names_number // stickers_per_file), 1)
+    width = max(len(str(files_number)), 3)
+
+    with open(_manifest_path(path_output), "w", newline="") as file_manifest:
+        writer = csv.writer(file_manifest)
+        writer.writerow(["file", "page", "row", "column", "name"])
+
+        def stickers_chunk(
+            path_chunk: Path, stickers_number: int
+        ) -> Iterator[str | None]:
+            """Pass on the stickers of a file, listing them in the manifest"""
+            for position, name in enumerate(islice(stickers, stickers_number)):
+                if name is not None:
+                    writer.writerow(
+                        [
+                            path_chunk.name,
+                            position // 189 + 1,
+                            position % 189 // 7 + 1,
+                            position % 7 + 1,
+                            names.label_name(name),
+                        ]
+                    )
+                yield name
+
+        for number in range(files_number):
+            path_chunk = path_output.with_name(
+                f"{path_output.stem}_{number + 1:0{width}d}.pdf"
+            )
+            stickers_number = min(
+                names_number - number * stickers_per_file, stickers_per_file
+            )
+
+            pages_new, pages_total = typeset(
+                stickers_chunk(path_chunk, stickers_number),
+                stickers_number,
+                str_date,
+                path_chunk,
+                **kwargs,
+            )
+            file_manifest.flush()
+            yield path_chunk, pages_new, pages_total
+
+
+def _manifest_path(path_output: Path) -> Path:
+    """Return path of the manifest of files written by typeset_chunks"""
+    return path_output.with_name(f"{path_output.stem}_manifest.csv")
 
 
 def parse_args(args=None) -> argparse.ArgumentParser.parse_args:
@@ -453,6 +1212,46 @@ def parse_args(args=None) -> argparse.ArgumentParser.parse_args:
         metavar="FILE",
         help="path to the text file containing one sample name per line",
     )
+    parser.add_argument(
+        "--pattern",
+        metavar="STR",
+        help="generate sample names from a pattern instead of reading them from a "
+        'file, e.g. "Plate{1..50}-{A..H}{01..12}" for ranges of numbers and '
+        'letters or "{CTRL,TREAT}" for lists. The output file defaults to '
+        "labels.pdf",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="PATH",
+        help="process multiple input files, directories of txt, csv and tsv "
+        "files or glob patterns without interaction. Use --output-file to set "
+        "the output directory, or the output file together with --combine",
+    )
+    parser.add_argument(
+        "--combine",
+        help="combine the stickers of all files processed with --batch in a "
+        "single PDF, each file starting on a new page",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--name-column",
+        metavar="COL",
+        help="header or number of the column of sample names in CSV and TSV "
+        "input files (default: 1)",
+    )
+    parser.add_argument(
+        "--date-column",
+        metavar="COL",
+        help="header or number of the column of dates in CSV and TSV input "
+        "files. Rows with an empty date use --date",
+    )
+    parser.add_argument(
+        "--copies-column",
+        metavar="COL",
+        help="header or number of the column of the number of stickers to print "
+        "of each name in CSV and TSV input files (default: one sticker)",
+    )
     parser.add_argument(
         "-o",
         "--output-file",
@@ -465,6 +1264,19 @@ def parse_args(args=None) -> argparse.ArgumentParser.parse_args:
         help="interactively add suffixes to sample names",
         action="store_true",
     )
+    parser.add_argument(
+        "-g",
+        "--suffix-group",
+        action="append",
+        metavar="STR",
+        help='group of suffixes separated by spaces, e.g. "CTRL TREAT1 TREAT2". '
+        "Can be repeated to combine multiple groups",
+    )
+    parser.add_argument(
+        "--suffix-file",
+        metavar="FILE",
+        help="path to a text file containing one group of suffixes per line",
+    )
     parser.add_argument(
         "-s",
         "--skip",
@@ -481,90 +1293,330 @@ def parse_args(args=None) -> argparse.ArgumentParser.parse_args:
     parser.add_argument(
         "-n,", "--no-open", help="do not open resulting PDF", action="store_true"
     )
+    parser.add_argument(
+        "--strict",
+        help="abort before typesetting if problems are found in the input file",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--verbose",
+        help="list every duplicate name found in the input file instead of "
+        "their number and first lines",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--substitute",
+        help="replace characters missing from the font with similar ones, e.g. "
+        '"ñ" with "n", or with "?" instead of reporting them',
+        action="store_true",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="INT",
+        help="number of xelatex processes typesetting pages in parallel, or of "
+        "files typeset at the same time with --batch (default: 1)",
+    )
+    parser.add_argument(
+        "--pages-per-file",
+        type=int,
+        metavar="INT",
+        help="split the stickers into numbered PDF files of at most INT pages, "
+        "each written as soon as it is typeset, and list the names in each file "
+        "in a manifest",
+    )
+    parser.add_argument(
+        "--incremental",
+        help="only typeset pages that changed since the output file was last generated",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--dry-run",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="write the page, row, column, font size and date placement of each "
+        "sample name to a CSV file, or a JSON file if FILE ends in .json, instead "
+        "of typesetting (default: <output>_layout.csv)",
+    )
+    parser.add_argument(
+        "--watch",
+        help="keep running and typeset the pages that changed whenever the input "
+        "file is saved",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--tex-macros",
+        help="define empty stickers, the date and recurring stickers as TeX macros "
+        "once instead of writing them out in every cell, shrinking the TeX file",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="do not reuse PDFs typeset from identical TeX files",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile-mode",
+        help="compile profile: draft for fast proofs without compression, final "
+        "for the smallest PDF typeset in a single run (default: XeTeX's own "
+        "settings)",
+        choices=["draft", "final"],
+    )
+    parser.add_argument(
+        "--lock",
+        help="take an advisory lock on the output file, so that concurrent runs "
+        "writing the same file take turns",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="report time and peak memory of each phase, printed as a table or "
+        "written to a JSON file if FILE is given",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="FILE",
+        help="dump cProfile statistics of the Python code to FILE",
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        choices=["xelatex", "pdf"],
+        default="xelatex",
+        help='typeset with "xelatex" (default) or the built-in "pdf" writer, '
+        "which does not require TeX and embeds OpenType/CFF fonts in full",
+    )
 
-    return parser.parse_args(args)
+    args = parser.parse_args(args)
+    if args.pattern is not None and (
+        args.input_file is not None or args.batch is not None or args.watch
+    ):
+        parser.error(
+            "--pattern can not be combined with --input-file, --batch or --watch"
+        )
+    if args.batch is not None and args.dry_run is not None:
+        parser.error("--dry-run can not be combined with --batch")
+    if args.batch is not None and (args.watch or args.pages_per_file is not None):
+        parser.error("--batch can not be combined with --watch or --pages-per-file")
+    return args
+
+
+def _report_failure(
+    path_output: Path,
+    stickers: Iterable[tuple[int, str | names.Label | None, int | None]],
+    str_date: str | None,
+    exec_tex: str,
+    color: type,
+) -> None:
+    """
+    Print errors of a failed XeLaTeX run and the stickers causing them
 
+    Parameters
+    ----------
+    path_output: Path
+        Path of the PDF that was not written. The TeX file and log are
+        expected next to it
+    stickers: Iterable[tuple[int, str | names.Label | None, int | None]]
+        Position, contents and line in the input file of every sticker
+    str_date: str | None
+        Date printed on stickers not labelled with their own date
+    exec_tex: str
+        Name of the TeX executable
+    color: type
+        Console formatting codes
+    """
+
+    path_log = path_output.with_suffix(".log")
+    path_tex = path_output.with_suffix(".tex")
+    errors = diagnose.parse_log(path_log) if path_log.exists() else []
+
+    print(
+        f"\n{color.BOLD + color.RED}"
+        f"{exec_tex} failed to typeset {path_output.name}"
+        f"{color.END}"
+    )
+    pages = set()
+    for error in errors:
+        page = None
+        if error.line is not None and path_tex.exists():
+            page = diagnose.page_of_line(path_tex, error.line)
+        if page is None:
+            print(error.message)
+        else:
+            pages.add(page)
+            print(
+                f"page {page} (line {error.line} of {path_tex.name}): {error.message}"
+            )
+
+    # Only check the pages errors were reported on, if any
+    candidates = (
+        (position, sticker, line)
+        for position, sticker, line in stickers
+        if sticker is not None and (not pages or position // 189 + 1 in pages)
+    )
+    print(
+        f"\n{color.BOLD + color.DARKCYAN}"
+        f"Typesetting stickers in small groups to find the ones causing errors"
+        f"{color.END}"
+    )
+    offenders = diagnose.find_offenders(
+        candidates,
+        str_date,
+        exec_tex,
+        tex.build_format(exec_tex),
+        os.process_cpu_count() or 2,
+    )
+
+    if not offenders:
+        print(f"No sticker fails on its own. Please check {path_log}")
+        return
+    print(f"\n{color.BOLD + color.RED}{len(offenders)} sticker(s) failed:{color.END}")
+    for offender in offenders:
+        line = "" if offender.line is None else f"line {offender.line}, "
+        print(
+            f"{line}page {offender.page}, row {offender.row}, "
+            f"column {offender.column}: {offender.name}: {offender.error}"
+        )
 
-def _return_sticker(x: int, names_list: list, str_date: str) -> str:
+
+def _print_compile_report(
+    mode: str, seconds: float, paths_pdf: list[Path], color: type
+) -> None:
+    """Print time taken and size of PDFs typeset in a compile profile"""
+
+    size = sum(path.stat().st_size for path in paths_pdf if path.exists())
+    print(
+        f"\n{color.BOLD + color.DARKCYAN}"
+        f"{mode.capitalize()} profile: typeset in {seconds:.2f} s, "
+        f"{size / 1024:,.0f} KiB"
+        f"{color.END}"
+    )
+
+
+def _print_problems(
+    path_input: Path, problems: list, color: type, verbose: bool = False
+) -> None:
     """
-    Return sticker content
+    Print problems found in an input file
+
+    Duplicates are summarized by their number and first few lines unless
+    `verbose` is set, as files repeating names on purpose have many of them.
 
     Parameters
     ----------
-    x: int
-        Index of sticker to print
-    names_list: list
-        List of sticker contents
-    str_dat: str
-        Date to print on sticker
+    path_input: Path
+        Input file
+    problems: list
+        Problems as returned by validate.validate_names
+    color: type
+        Console formatting codes
+    verbose: bool
+        List every duplicate as well (default: False)
+    """
+
+    if not problems:
+        return
+    print(
+        f"\n{color.BOLD + color.RED}"
+        f"Found {len(problems)} problem(s) in {path_input.name}:"
+        f"{color.END}"
+    )
+    duplicates = []
+    for problem in problems:
+        if not verbose and problem.reason.startswith("duplicate of line"):
+            duplicates.append(problem.line)
+            continue
+        print(f"line {problem.line}: {problem.reason}: {problem.name}")
+    if duplicates:
+        lines = ", ".join(map(str, duplicates[:_DUPLICATES_SHOWN]))
+        more = ", ..." if len(duplicates) > _DUPLICATES_SHOWN else ""
+        print(
+            f"{len(duplicates)} duplicate name(s) in line(s) {lines}{more} "
+            "(use --verbose to list them)"
+        )
+
+
+def _substitution(args: argparse.Namespace, color: type):
+    """
+    Return function replacing characters missing from the font
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        Parsed command line arguments
+    color: type
+        Console formatting codes
 
     Returns
     -------
-    str
-        Sticker contents written in TeX
+    Callable[[str], str] | None
+        Substitution function or None if --substitute is not set or the font
+        could not be found
     """
 
-    if x >= len(names_list) or names_list[x] is None:
-        # Return empty sticker
-        sticker = "\\phantom{empty}\\par\\phantom{sticker}"
-    else:
-        sticker = _tex_escape(names_list[x])
-        # Set smaller font size depending on sticker text length
-        width_sticker = _str_width(sticker)
-        if width_sticker >= 139:
-            sticker = f"{{\\tiny {sticker} }}"
-        elif width_sticker >= 104:
-            sticker = f"{{\\ssmall {sticker} }}"
-        elif width_sticker >= 88:
-            sticker = f"{{\\scriptsize {sticker} }}"
-
-        # If sticker is long, let TeX do the word splitting,
-        # otherwise put date on new line
-        if len(sticker) > 30:
-            sticker = f"{sticker} {str_date}"
-        else:
-            sticker = f"{sticker} \\par {str_date}"
-    return sticker
+    if not args.substitute:
+        return None
+    coverage = glyphs.load_coverage()
+    if coverage is None:
+        print(
+            f"\n{color.BOLD + color.RED}"
+            "Warning: The sticker font was not found, characters are not substituted"
+            f"{color.END}"
+        )
+        return None
+    return coverage.substitute
 
 
-def _tex_escape(text: str) -> str:
+def _suffix_groups(args: argparse.Namespace) -> list[list[str]]:
     """
-    Escape characters for TeX output
-
-    https://stackoverflow.com/a/25875504
+    Collect suffix groups set through command line arguments
 
     Parameters
     ----------
-    text: str
-        Text to process for escapable characters
+    args: argparse.Namespace
+        Parsed command line arguments
 
     Returns
     -------
-    str
-        Text escaped to appear correctly in TeX
+    list[list[str]]
+        Non-empty groups of suffixes
     """
 
-    conv = {
-        "&": r"\&",
-        "%": r"\%",
-        "$": r"\$",
-        "#": r"\#",
-        "_": r"\_",
-        "{": r"\{",
-        "}": r"\}",
-        "~": r"\textasciitilde{}",
-        "^": r"\^{}",
-        "\\": r"\textbackslash{}",
-        "<": r"\textless{}",
-        ">": r"\textgreater{}",
-    }
-    regex = re.compile(
-        "|".join(
-            re.escape(str(key))
-            for key in sorted(conv.keys(), key=lambda item: -len(item))
-        )
-    )
-    return regex.sub(lambda match: conv[match.group()], text)
+    suffix_groups = [group.split() for group in args.suffix_group or []]
+    if args.suffix_file is not None:
+        suffix_groups += names.read_suffix_groups(Path(args.suffix_file))
+    return [group for group in suffix_groups if group]
+
+
+def _open_pdf(path_pdf: Path, no_open: bool = False) -> None:
+    """
+    Open PDF in an OS-dependent manner
+
+    Parameters
+    ----------
+    path_pdf: Path
+        Path to the PDF file
+    no_open: bool
+        Do not open the PDF (default: False)
+    """
+
+    if no_open:
+        return
+    elif path_pdf.exists():
+        if system() == "Darwin":
+            subprocess.run(["open", path_pdf])
+        elif system() == "Windows":
+            os.startfile(path_pdf)  # type: ignore
+        else:
+            subprocess.run(["xdg-open", path_pdf])
+    else:
+        sys.exit(f"Output PDF not found at {path_pdf}")
 
 
 def _print_samples(names_list: list, names_number: int) -> str:
@@ -596,47 +1648,5 @@ def _print_samples(names_list: list, names_number: int) -> str:
     return message
 
 
-def _str_width(string: str, size: int = 10) -> float:
-    """
-    Calculate width of string in Computer Modern Unicode Sans Serif Bold
-
-    https://stackoverflow.com/a/77351575
-
-    Parameters
-    ----------
-    string: str
-        String to be measured
-    size: int
-        Font size in pts of string (default: 10)
-
-    Returns
-    -------
-    float
-        Width of string in pts
-    """
-
-    # fmt: off
-    WIDTH_DICT={
-        '0': 55, '1': 55, '2': 55, '3': 55, '4': 55, '5': 55, '6': 55, '7': 55,
-        '8': 55, '9': 55, 'a': 53, 'b': 56, 'c': 49, 'd': 56, 'e': 51, 'f': 39,
-        'g': 55, 'h': 56, 'i': 26, 'j': 36, 'k': 53, 'l': 26, 'm': 87, 'n': 56,
-        'o': 55, 'p': 56, 'q': 56, 'r': 37, 's': 42, 't': 40, 'u': 56, 'v': 50,
-        'w': 74, 'x': 50, 'y': 50, 'z': 48, 'A': 73, 'B': 73, 'C': 70, 'D': 79,
-        'E': 64, 'F': 61, 'G': 73, 'H': 79, 'I': 33, 'J': 52, 'K': 76, 'L': 58,
-        'M': 98, 'N': 79, 'O': 79, 'P': 70, 'Q': 79, 'R': 70, 'S': 61, 'T': 73,
-        'U': 76, 'V': 73, 'W': 104, 'X': 73, 'Y': 73, 'Z': 67, '!': 37, '"': 55,
-        '#': 92, '$': 55, '%': 103, '&': 83, "'": 31, '(': 43, ')': 43, '*': 55,
-        '+': 86, ',': 31, '-': 37, '.': 31, '/': 55, ':': 31, ';': 31, '<': 86,
-        '=': 86, '>': 86, '?': 52, '@': 73, '[': 34, '\\': 55, ']': 34, '^': 67,
-        '_': 86, '`': 55, '{': 55, '|': 31, '}': 55, '~': 67, ' ': 37
-    }
-
-    AVERAGE_WIDTH = 58.810526315789474
-
-    width = sum(WIDTH_DICT.get(s, AVERAGE_WIDTH) for s in string) * (size / 100)
-
-    return round(width)
-
-
 if __name__ == "__main__":
     main()
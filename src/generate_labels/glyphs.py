@@ -0,0 +1,131 @@
+"""Look up which characters the sticker font can display
+
+XeTeX silently leaves out characters missing from the font. The code
+points covered by the `cmap` table of cmunsx.otf are stored as sorted
+ranges in the user cache directory, named after a hash of the font file.
+Characters of the Basic Multilingual Plane are looked up in a bitmap, all
+others by binary search over the ranges.
+"""
+
+import os
+import tempfile
+import unicodedata
+from array import array
+from bisect import bisect_right
+from functools import cache
+from pathlib import Path
+
+from .cache import cache_dir
+from .fonts import Font, find_font, font_digest
+
+REPLACEMENT = "?"
+"""Character replacing characters that have no similar supported one"""
+
+
+class GlyphCoverage:
+    """
+    Set of characters supported by a font
+
+    Parameters
+    ----------
+    ranges: list[tuple[int, int]]
+        Sorted, non-overlapping ranges of supported code points, both ends
+        included
+    """
+
+    def __init__(self, ranges: list[tuple[int, int]]):
+        self.starts = array("I", (start for start, _ in ranges))
+        self.ends = array("I", (end for _, end in ranges))
+
+        # One bit per code point of the Basic Multilingual Plane
+        self.bitmap = bytearray(0x10000 // 8)
+        for start, end in ranges:
+            for code in range(start, min(end, 0xFFFF) + 1):
+                self.bitmap[code >> 3] |= 1 << (code & 7)
+
+        self.ascii = all(chr(code) in self for code in range(32, 127))
+        """Whether all printable ASCII characters are supported"""
+
+    def __contains__(self, char: str) -> bool:
+        code = ord(char)
+        if code <= 0xFFFF:
+            return bool(self.bitmap[code >> 3] >> (code & 7) & 1)
+        index = bisect_right(self.starts, code) - 1
+        return index >= 0 and code <= self.ends[index]
+
+    def missing(self, text: str) -> list[str]:
+        """Return characters of `text` the font lacks, each once"""
+        if self.ascii and text.isascii():
+            return []
+        return [char for char in dict.fromkeys(text) if char not in self]
+
+    def substitute(self, text: str, replacement: str = REPLACEMENT) -> str:
+        """
+        Replace characters the font lacks
+
+        Characters are replaced by their compatibility decomposition without
+        accents if the font supports it (e.g. "ǹ" by "n" or "㎏" by "kg"),
+        otherwise by `replacement`.
+        """
+
+        missing = self.missing(text)
+        for char in missing:
+            similar = "".join(
+                part
+                for part in unicodedata.normalize("NFKD", char)
+                if part in self and not unicodedata.combining(part)
+            )
+            text = text.replace(char, similar or replacement)
+        return text
+
+
+@cache
+def load_coverage(path_font: Path | None = None) -> GlyphCoverage | None:
+    """
+    Return coverage of a font, reading it from the cache if possible
+
+    Parameters
+    ----------
+    path_font: Path | None
+        Font to index (default: cmunsx.otf from the TeX distribution)
+
+    Returns
+    -------
+    GlyphCoverage | None
+        Coverage of the font or None if it could not be found
+    """
+
+    if path_font is None:
+        path_font = find_font()
+        if path_font is None:
+            return None
+
+    dir_coverage = cache_dir("coverage")
+    path_coverage = dir_coverage.joinpath(f"{font_digest(path_font)}.bin")
+
+    if path_coverage.exists():
+        values = array("I", path_coverage.read_bytes())
+        half = len(values) // 2
+        return GlyphCoverage(list(zip(values[:half], values[half:])))
+
+    ranges = _ranges(sorted(Font(path_font).cmap))
+
+    # Write to a temporary file first so that readers never see partial data
+    with tempfile.NamedTemporaryFile(dir=dir_coverage, delete=False) as file_temp:
+        array("I", [start for start, _ in ranges]).tofile(file_temp)
+        array("I", [end for _, end in ranges]).tofile(file_temp)
+    os.replace(file_temp.name, path_coverage)
+
+    return GlyphCoverage(ranges)
+
+
+def _ranges(codes: list[int]) -> list[tuple[int, int]]:
+    """Return sorted code points merged into ranges of consecutive ones"""
+
+    ranges = []
+    for code in codes:
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1] = (ranges[-1][0], code)
+        else:
+            ranges.append((code, code))
+    return ranges
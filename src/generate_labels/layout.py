@@ -0,0 +1,130 @@
+"""Work out where each sample name is placed without typesetting
+
+The layout index lists the page, row and column of every sticker along
+with the font size and date placement chosen for it, using the same
+decisions as the TeX file. It is written as CSV or JSON, e.g. to map
+samples to positions in a freezer box or to resume after a printer jam.
+"""
+
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from itertools import count
+from pathlib import Path
+from typing import NamedTuple
+
+from .formatting import sticker_format
+from .names import Label
+
+COLUMNS = 7
+ROWS = 27
+
+FONT_TIERS = {
+    None: "footnotesize",
+    "\\scriptsize": "scriptsize",
+    "\\ssmall": "ssmall",
+    "\\tiny": "tiny",
+}
+"""Name of each TeX font size command"""
+
+
+class Placement(NamedTuple):
+    """Position and formatting of a sticker"""
+
+    name: str
+    """Sample name"""
+    page: int
+    """Page number, starting at 1"""
+    row: int
+    """Row on the page, starting at 1"""
+    column: int
+    """Column on the page, starting at 1"""
+    font_tier: str
+    """Name of the font size, e.g. footnotesize or tiny"""
+    date: str
+    """Date printed on the sticker, empty if none"""
+    date_placement: str
+    """Whether the date follows the name (inline) or is set below it (newline)"""
+
+
+def layout_index(
+    stickers: Iterable[str | Label | None], str_date: str | None
+) -> Iterator[Placement]:
+    """
+    Place stickers on pages like the TeX file does
+
+    Parameters
+    ----------
+    stickers: Iterable[str | Label | None]
+        Sticker contents, None for stickers left empty
+    str_date: str | None
+        Date printed on stickers not labelled with their own date, None to
+        leave the date empty
+
+    Yields
+    ------
+    Placement
+        Placement of every sticker that is not empty
+    """
+
+    str_date = str_date or ""
+    positions = (
+        (page, row, column)
+        for page in count(1)
+        for row in range(1, ROWS + 1)
+        for column in range(1, COLUMNS + 1)
+    )
+    for (page, row, column), sticker in zip(positions, stickers):
+        if sticker is None:
+            continue
+        if type(sticker) is Label:
+            name, date = sticker
+        else:
+            name, date = sticker, str_date
+        _, size, inline_date = sticker_format(name)
+        yield Placement(
+            name,
+            page,
+            row,
+            column,
+            FONT_TIERS[size],
+            date,
+            "inline" if inline_date else "newline",
+        )
+
+
+def write_layout(path_layout: Path, placements: Iterable[Placement]) -> int:
+    """
+    Write layout index to a CSV or JSON file
+
+    Parameters
+    ----------
+    path_layout: Path
+        File to write, as JSON if its suffix is .json and as CSV otherwise
+    placements: Iterable[Placement]
+        Placements as returned by layout_index
+
+    Returns
+    -------
+    int
+        Number of placements written
+    """
+
+    # Count placements as they pass instead of keeping them
+    counter = count()
+    placements = (placement for placement, _ in zip(placements, counter))
+
+    with open(path_layout, "w", newline="") as file_layout:
+        if path_layout.suffix.casefold() == ".json":
+            # Write one object per line instead of building the list in memory
+            file_layout.write("[")
+            file_layout.writelines(
+                f"{',' if number else ''}\n {json.dumps(placement._asdict())}"
+                for number, placement in enumerate(placements)
+            )
+            file_layout.write("\n]\n")
+        else:
+            writer = csv.writer(file_layout)
+            writer.writerow(Placement._fields)
+            writer.writerows(placements)
+    return next(counter)
@@ -0,0 +1,338 @@
+"""Measure sticker text with the metrics of the sticker font
+
+Advance widths and kerning pairs are read from the `hmtx`, `kern` and `GPOS`
+tables of cmunsx.otf once. They are stored in the user cache directory as
+compact arrays named after a hash of the font file, which later runs load
+instead of parsing the font again. Measuring text then only takes one
+dictionary lookup per character and per pair of adjacent characters.
+"""
+
+import os
+import struct
+import tempfile
+from array import array
+from functools import cache
+from itertools import repeat
+from operator import add
+from pathlib import Path
+
+from .cache import cache_dir
+from .fonts import Font, find_font, font_digest
+
+CACHE_VERSION = 1
+"""Version of the cached array layout, part of the file name"""
+
+
+class Metrics:
+    """
+    Advance widths and kerning of the characters of a font
+
+    Parameters
+    ----------
+    widths: dict[str, float]
+        Advance width of each character in thousandths of an em
+    kerning: dict[str, float]
+        Adjustment of the distance between two characters in thousandths of
+        an em, indexed by both characters joined into one string
+    default: float
+        Width of characters the font does not contain
+    """
+
+    def __init__(
+        self, widths: dict[str, float], kerning: dict[str, float], default: float
+    ):
+        self.widths = widths
+        self.kerning = kerning
+        self.default = default
+
+    def width(self, text: str, size: float = 10) -> float:
+        """Return width of `text` set at `size` in the same unit as `size`"""
+        width = sum(map(self.widths.get, text, repeat(self.default)))
+        if self.kerning and len(text) > 1:
+            pairs = map(add, text, text[1:])
+            width += sum(map(self.kerning.get, pairs, repeat(0)))
+        return width * size / 1000
+
+
+@cache
+def load_metrics(path_font: Path | None = None) -> Metrics | None:
+    """
+    Return metrics of a font, reading them from the cache if possible
+
+    Parameters
+    ----------
+    path_font: Path | None
+        Font to measure (default: cmunsx.otf from the TeX distribution)
+
+    Returns
+    -------
+    Metrics | None
+        Metrics of the font or None if it could not be found
+    """
+
+    if path_font is None:
+        path_font = find_font()
+        if path_font is None:
+            return None
+
+    dir_metrics = cache_dir("metrics")
+    path_metrics = dir_metrics.joinpath(
+        f"{font_digest(path_font)}-v{CACHE_VERSION}.bin"
+    )
+
+    if path_metrics.exists():
+        return _read_arrays(path_metrics)
+
+    font_metrics = read_metrics(Font(path_font))
+
+    # Write to a temporary file first so that readers never see partial data
+    with tempfile.NamedTemporaryFile(dir=dir_metrics, delete=False) as file_temp:
+        _write_arrays(file_temp, font_metrics)
+    os.replace(file_temp.name, path_metrics)
+
+    return font_metrics
+
+
+def read_metrics(font: Font) -> Metrics:
+    """
+    Parse advance widths and kerning pairs of all characters of a font
+
+    Kerning is taken from the `kern` feature of the `GPOS` table, or from
+    the `kern` table if the font has no such feature.
+
+    Parameters
+    ----------
+    font: Font
+        Font to measure
+
+    Returns
+    -------
+    Metrics
+        Metrics of the characters mapped by the font's `cmap` table
+    """
+
+    chars = {}
+    """Characters mapped to each glyph ID"""
+    for code, glyph in font.cmap.items():
+        chars.setdefault(glyph, []).append(chr(code))
+
+    widths = {chr(code): font.advance(glyph) for code, glyph in font.cmap.items()}
+
+    pairs = {}
+    if "GPOS" in font.tables:
+        pairs = _read_gpos_kerning(font.table("GPOS"), set(chars))
+    if not pairs and "kern" in font.tables:
+        pairs = _read_kern_table(font.table("kern"))
+    kerning = {
+        char_left + char_right: font.scale(value)
+        for (left, right), value in pairs.items()
+        if value and left in chars and right in chars
+        for char_left in chars[left]
+        for char_right in chars[right]
+    }
+
+    # Unknown characters are as wide as an average printable ASCII character
+    ascii_widths = [widths[chr(code)] for code in range(33, 127) if chr(code) in widths]
+    default = sum(ascii_widths) / len(ascii_widths) if ascii_widths else 500
+
+    return Metrics(widths, kerning, default)
+
+
+def _write_arrays(file, font_metrics: Metrics) -> None:
+    """Write metrics to a binary file as arrays of numbers"""
+
+    kerning = font_metrics.kerning
+    array("I", [len(font_metrics.widths), len(kerning)]).tofile(file)
+    array("d", [font_metrics.default]).tofile(file)
+    array("I", map(ord, font_metrics.widths)).tofile(file)
+    array("d", font_metrics.widths.values()).tofile(file)
+    array("I", (ord(pair[0]) for pair in kerning)).tofile(file)
+    array("I", (ord(pair[1]) for pair in kerning)).tofile(file)
+    array("d", kerning.values()).tofile(file)
+
+
+def _read_arrays(path_metrics: Path) -> Metrics:
+    """Read metrics written by _write_arrays"""
+
+    def read(typecode: str, count: int) -> array:
+        values = array(typecode)
+        values.fromfile(file, count)
+        return values
+
+    with open(path_metrics, "rb") as file:
+        number_of_chars, number_of_pairs = read("I", 2)
+        (default,) = read("d", 1)
+        codes = read("I", number_of_chars)
+        widths = dict(zip(map(chr, codes), read("d", number_of_chars)))
+        lefts = read("I", number_of_pairs)
+        rights = read("I", number_of_pairs)
+        kerning = dict(
+            zip(map(add, map(chr, lefts), map(chr, rights)), read("d", number_of_pairs))
+        )
+    return Metrics(widths, kerning, default)
+
+
+def _read_kern_table(kern: bytes) -> dict[tuple[int, int], int]:
+    """Return horizontal kerning pairs from format 0 subtables of a `kern` table"""
+
+    pairs = {}
+    version, number_of_subtables = struct.unpack_from(">HH", kern, 0)
+    # Only the OpenType version is supported, not Apple's
+    if version != 0:
+        return pairs
+
+    offset = 4
+    for _ in range(number_of_subtables):
+        length, coverage = struct.unpack_from(">2xHH", kern, offset)
+        # Horizontal kerning values (not minimum values or cross-stream)
+        if coverage >> 8 == 0 and coverage & 0b111 == 0b001:
+            number_of_pairs = struct.unpack_from(">H", kern, offset + 6)[0]
+            for i in range(number_of_pairs):
+                left, right, value = struct.unpack_from(
+                    ">HHh", kern, offset + 14 + 6 * i
+                )
+                pairs.setdefault((left, right), value)
+        offset += length
+    return pairs
+
+
+def _read_gpos_kerning(gpos: bytes, glyphs: set[int]) -> dict[tuple[int, int], int]:
+    """Return pairs of `glyphs` adjusted by the `kern` feature of a `GPOS` table"""
+
+    offset_features, offset_lookups = struct.unpack_from(">6xHH", gpos, 0)
+
+    # Collect lookups referenced by any kern feature
+    lookup_indices = set()
+    number_of_features = struct.unpack_from(">H", gpos, offset_features)[0]
+    for i in range(number_of_features):
+        tag, offset = struct.unpack_from(">4sH", gpos, offset_features + 2 + 6 * i)
+        if tag == b"kern":
+            offset += offset_features
+            count = struct.unpack_from(">H", gpos, offset + 2)[0]
+            lookup_indices.update(struct.unpack_from(f">{count}H", gpos, offset + 4))
+
+    pairs = {}
+    for index in sorted(lookup_indices):
+        offset = (
+            offset_lookups
+            + struct.unpack_from(">H", gpos, offset_lookups + 2 + 2 * index)[0]
+        )
+        lookup_type, _, count = struct.unpack_from(">HHH", gpos, offset)
+        offsets = [
+            offset + suboffset
+            for suboffset in struct.unpack_from(f">{count}H", gpos, offset + 6)
+        ]
+
+        # Subtables of extension lookups point to the actual subtables
+        if lookup_type == 9:
+            resolved = []
+            for offset_subtable in offsets:
+                lookup_type, offset_extension = struct.unpack_from(
+                    ">2xHI", gpos, offset_subtable
+                )
+                resolved.append(offset_subtable + offset_extension)
+            offsets = resolved
+        if lookup_type != 2:
+            continue
+
+        # Adjustments of different lookups add up, but within a lookup the
+        # first subtable containing a pair takes precedence
+        pairs_lookup = {}
+        for offset_subtable in offsets:
+            for pair, value in _read_pair_adjustment(gpos, offset_subtable, glyphs):
+                pairs_lookup.setdefault(pair, value)
+        for pair, value in pairs_lookup.items():
+            pairs[pair] = pairs.get(pair, 0) + value
+    return pairs
+
+
+def _read_pair_adjustment(gpos: bytes, offset: int, glyphs: set[int]):
+    """Yield pairs of glyphs and the advance adjustment of the first glyph"""
+
+    subtable_format, offset_coverage, format_first, format_second = struct.unpack_from(
+        ">4H", gpos, offset
+    )
+    coverage = _read_coverage(gpos, offset + offset_coverage)
+
+    # Only the advance width of the first glyph changes the width of text
+    size_first = 2 * (format_first & 0xFF).bit_count()
+    size_second = 2 * (format_second & 0xFF).bit_count()
+    position_advance = 2 * (format_first & 0b11).bit_count()
+    if not format_first & 0b100:
+        return
+
+    if subtable_format == 1:
+        count = struct.unpack_from(">H", gpos, offset + 8)[0]
+        offsets = struct.unpack_from(f">{count}H", gpos, offset + 10)
+        for first, offset_set in zip(coverage, offsets):
+            if first not in glyphs:
+                continue
+            offset_set += offset
+            number_of_records = struct.unpack_from(">H", gpos, offset_set)[0]
+            size_record = 2 + size_first + size_second
+            for i in range(number_of_records):
+                position = offset_set + 2 + size_record * i
+                second = struct.unpack_from(">H", gpos, position)[0]
+                value = struct.unpack_from(">h", gpos, position + 2 + position_advance)
+                if second in glyphs:
+                    yield (first, second), value[0]
+    elif subtable_format == 2:
+        offset_first, offset_second, count_first, count_second = struct.unpack_from(
+            ">4H", gpos, offset + 8
+        )
+        classes_first = _read_class_definition(gpos, offset + offset_first)
+        classes_second = _read_class_definition(gpos, offset + offset_second)
+
+        # Glyphs without class definition belong to class 0
+        members_first = {}
+        for glyph in coverage:
+            if glyph in glyphs:
+                members_first.setdefault(classes_first.get(glyph, 0), []).append(glyph)
+        members_second = {}
+        for glyph in glyphs:
+            members_second.setdefault(classes_second.get(glyph, 0), []).append(glyph)
+
+        size_record = size_first + size_second
+        for class_first, firsts in members_first.items():
+            for class_second, seconds in members_second.items():
+                if class_first >= count_first or class_second >= count_second:
+                    continue
+                position = (
+                    offset
+                    + 16
+                    + size_record * (class_first * count_second + class_second)
+                )
+                value = struct.unpack_from(">h", gpos, position + position_advance)[0]
+                if value:
+                    for first in firsts:
+                        for second in seconds:
+                            yield (first, second), value
+
+
+def _read_coverage(gpos: bytes, offset: int) -> list[int]:
+    """Return glyph IDs of a coverage table in coverage index order"""
+
+    coverage_format, count = struct.unpack_from(">HH", gpos, offset)
+    if coverage_format == 1:
+        return list(struct.unpack_from(f">{count}H", gpos, offset + 4))
+    glyphs = []
+    for i in range(count):
+        start, end, _ = struct.unpack_from(">3H", gpos, offset + 4 + 6 * i)
+        glyphs += range(start, end + 1)
+    return glyphs
+
+
+def _read_class_definition(gpos: bytes, offset: int) -> dict[int, int]:
+    """Return class of each glyph listed in a class definition table"""
+
+    class_format = struct.unpack_from(">H", gpos, offset)[0]
+    if class_format == 1:
+        start, count = struct.unpack_from(">HH", gpos, offset + 2)
+        classes = struct.unpack_from(f">{count}H", gpos, offset + 6)
+        return dict(zip(range(start, start + count), classes))
+    classes = {}
+    count = struct.unpack_from(">H", gpos, offset + 2)[0]
+    for i in range(count):
+        start, end, value = struct.unpack_from(">3H", gpos, offset + 4 + 6 * i)
+        classes.update(dict.fromkeys(range(start, end + 1), value))
+    return classes
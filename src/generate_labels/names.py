@@ -0,0 +1,455 @@
+"""Stream sample names from the input file to the stickers
+
+Each stage is a generator, so names are processed one at a time and memory
+use does not grow with the length of the input file.
+
+Input files are either text files with one sample name per line, or CSV
+and TSV files with a header row. Rows of the latter can set their own date
+and number of copies, in which case the sample name is passed on as a
+Label carrying its date. Names can also be generated from a NamePattern
+instead of being read from a file.
+"""
+
+import csv
+import glob
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain, product, repeat
+from math import prod
+from pathlib import Path
+from typing import NamedTuple
+
+from .patterns import NamePattern
+
+SUFFIX_WARNING = 100_000
+"""Number of suffixed names above which the user is warned"""
+
+TABLE_DELIMITERS = {".csv": ",", ".tsv": "\t"}
+"""Column delimiters of tabular input files by file suffix"""
+
+INPUT_SUFFIXES = (".txt", *TABLE_DELIMITERS)
+"""Suffixes of input files, collected from directories given to --batch"""
+
+
+class Label(NamedTuple):
+    """Sample name printed with its own date instead of the common one"""
+
+    name: str
+    """Sample name"""
+    date: str
+    """Date printed on the sticker"""
+
+
+class Columns(NamedTuple):
+    """Columns of a CSV or TSV input file to read"""
+
+    name: str = "1"
+    """Header or number (starting at 1) of the column of sample names"""
+    date: str | None = None
+    """Header or number of the column of dates, None for the common date"""
+    copies: str | None = None
+    """Header or number of the column of copy counts, None for one copy"""
+    delimiter: str = ","
+    """Character separating columns"""
+
+
+def table_columns(
+    path_input: Path,
+    name: str | None = None,
+    date: str | None = None,
+    copies: str | None = None,
+) -> Columns | None:
+    """
+    Return columns to read from an input file if it is tabular
+
+    Parameters
+    ----------
+    path_input: Path
+        Input file, tabular if its suffix is .csv or .tsv
+    name: str | None
+        Header or number of the column of sample names (default: first)
+    date: str | None
+        Header or number of the column of dates (default: none)
+    copies: str | None
+        Header or number of the column of copy counts (default: none)
+
+    Returns
+    -------
+    Columns | None
+        Columns to read or None for text files with one name per line
+    """
+
+    delimiter = TABLE_DELIMITERS.get(path_input.suffix.casefold())
+    if delimiter is None:
+        return None
+    return Columns(name or "1", date, copies, delimiter)
+
+
+def read_rows(
+    path_input: Path, columns: Columns
+) -> Iterator[tuple[int, str, str | None, int]]:
+    """
+    Read sample names, dates and copy counts from a CSV or TSV file
+
+    Parameters
+    ----------
+    path_input: Path
+        CSV or TSV file with a header row
+    columns: Columns
+        Columns to read
+
+    Yields
+    ------
+    tuple[int, str, str | None, int]
+        Line number, sample name, date (None if not set) and number of
+        copies of rows with a sample name
+
+    Raises
+    ------
+    ValueError
+        If a column does not exist or a copy count is not a non-negative
+        integer
+    """
+
+    with open(path_input, "r", newline="") as file:
+        reader = csv.reader(file, delimiter=columns.delimiter)
+        header = [cell.strip() for cell in next(reader, [])]
+        index_name, index_date, index_copies = (
+            None if column is None else _column_index(header, column)
+            for column in (columns.name, columns.date, columns.copies)
+        )
+
+        for row in reader:
+            if len(row) <= index_name:
+                continue
+            name = row[index_name].strip()
+            if not name:
+                continue
+
+            date = None
+            if index_date is not None and len(row) > index_date:
+                date = row[index_date].strip() or None
+
+            copies = 1
+            if index_copies is not None and len(row) > index_copies:
+                value = row[index_copies].strip()
+                if value:
+                    if not value.isdigit():
+                        raise ValueError(
+                            f"line {reader.line_num}: number of copies must be "
+                            f"a non-negative integer, not {value!r}"
+                        )
+                    copies = int(value)
+
+            yield reader.line_num, name, date, copies
+
+
+def _column_index(header: list[str], column: str) -> int:
+    """Return index of a column given by its header or number"""
+
+    if column in header:
+        return header.index(column)
+    if column.isdigit() and int(column) >= 1:
+        return int(column) - 1
+    raise ValueError(f"column {column!r} not found in header {header}")
+
+
+def label_name(label: str | Label) -> str:
+    """Return sample name of a name or Label"""
+    return label.name if type(label) is Label else label
+
+
+def expand_inputs(patterns: Iterable[str]) -> list[Path]:
+    """
+    Resolve input files from paths, directories and glob patterns
+
+    Parameters
+    ----------
+    patterns: Iterable[str]
+        Paths to input files, directories containing text, CSV or TSV
+        files or glob patterns matching input files
+
+    Returns
+    -------
+    list[Path]
+        Absolute paths to input files in the order given, without duplicates
+    """
+
+    paths_input = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(
+                match
+                for match in path.iterdir()
+                if match.suffix.casefold() in INPUT_SUFFIXES
+            )
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(Path(match) for match in glob.glob(pattern))
+        for match in matches:
+            if match.is_file():
+                paths_input.setdefault(match.absolute().resolve(), None)
+    return list(paths_input)
+
+
+def read_names(
+    path_input: Path | NamePattern, columns: Columns | None = None
+) -> Iterator[str | Label]:
+    """
+    Read sample names from file, skipping empty lines
+
+    Parameters
+    ----------
+    path_input: Path | NamePattern
+        Text file containing one sample name per line, CSV or TSV file, or
+        pattern generating the names
+    columns: Columns | None
+        Columns to read from a CSV or TSV file (default: read a text file)
+
+    Yields
+    ------
+    str | Label
+        Sample names, repeated by their number of copies and as Label if
+        their row sets a date
+    """
+
+    if type(path_input) is NamePattern:
+        yield from path_input
+        return
+
+    if columns is not None:
+        for _, name, date, copies in read_rows(path_input, columns):
+            yield from repeat(name if date is None else Label(name, date), copies)
+        return
+
+    with open(path_input, "r") as file:
+        for line in file:
+            name = line.rstrip()
+            if name:
+                yield name
+
+
+def scan_names(
+    path_input: Path | NamePattern, columns: Columns | None = None
+) -> tuple[int, list[str]]:
+    """
+    Count sample names without keeping them in memory
+
+    Names generated from a pattern are counted without generating them.
+
+    Parameters
+    ----------
+    path_input: Path | NamePattern
+        Text file containing one sample name per line, CSV or TSV file, or
+        pattern generating the names
+    columns: Columns | None
+        Columns to read from a CSV or TSV file (default: read a text file)
+
+    Returns
+    -------
+    tuple[int, list[str]]
+        Number of sample names and a preview consisting of the first two and
+        the last name
+    """
+
+    if type(path_input) is NamePattern:
+        names_number = path_input.count
+        indices = range(names_number) if names_number <= 3 else (0, 1, -1)
+        return names_number, [path_input[index] for index in indices]
+
+    names_number = 0
+    preview = []
+    for names_number, name in enumerate(read_names(path_input, columns), start=1):
+        name = label_name(name)
+        if names_number <= 3:
+            preview.append(name)
+        else:
+            preview[2] = name
+    return names_number, preview
+
+
+def read_suffix_groups(path_suffixes: Path) -> list[list[str]]:
+    """
+    Read groups of suffixes from file
+
+    Parameters
+    ----------
+    path_suffixes: Path
+        Text file containing one group of suffixes per line, separated by
+        spaces. Empty lines and lines starting with "#" are ignored
+
+    Returns
+    -------
+    list[list[str]]
+        Groups of suffixes
+    """
+
+    with open(path_suffixes, "r") as file:
+        return [
+            line.split() for line in file if line.strip() and not line.startswith("#")
+        ]
+
+
+def add_suffixes(
+    names: Iterable[str | Label], suffix_groups: list[list[str]]
+) -> Iterator[str | Label]:
+    """
+    Combine each sample name with every combination of suffixes
+
+    Parameters
+    ----------
+    names: Iterable[str | Label]
+        Sample names
+    suffix_groups: list[list[str]]
+        Groups of suffixes, applied in order
+
+    Yields
+    ------
+    str | Label
+        Sample names joined with suffixes by hyphens, keeping their dates
+    """
+
+    for name in names:
+        if type(name) is Label:
+            for suffixes in product(*suffix_groups):
+                yield Label("-".join((name.name, *suffixes)), name.date)
+        else:
+            for suffixes in product(*suffix_groups):
+                yield "-".join((name, *suffixes))
+
+
+def count_suffixed(names_number: int, suffix_groups: list[list[str]]) -> int:
+    """Return number of names produced by add_suffixes"""
+    return names_number * prod(len(group) for group in suffix_groups)
+
+
+def skip_stickers(
+    names: Iterable[str | Label], skip: int
+) -> Iterator[str | Label | None]:
+    """
+    Precede sample names with empty stickers
+
+    Parameters
+    ----------
+    names: Iterable[str | Label]
+        Sample names
+    skip: int
+        Number of stickers to leave empty
+
+    Returns
+    -------
+    Iterator[str | Label | None]
+        None for each skipped sticker followed by the sample names
+    """
+
+    return chain(repeat(None, skip), names)
+
+
+def sticker_names(
+    path_input: Path | NamePattern,
+    suffix_groups: list[list[str]],
+    skip: int,
+    substitute: Callable[[str], str] | None = None,
+    columns: Columns | None = None,
+) -> Iterator[str | Label | None]:
+    """
+    Read sticker contents from file, adding suffixes and empty stickers
+
+    Parameters
+    ----------
+    path_input: Path | NamePattern
+        Text file containing one sample name per line, CSV or TSV file, or
+        pattern generating the names
+    suffix_groups: list[list[str]]
+        Groups of suffixes, applied in order
+    skip: int
+        Number of stickers to leave empty
+    substitute: Callable[[str], str] | None
+        Function replacing unsupported characters of names (default: None)
+    columns: Columns | None
+        Columns to read from a CSV or TSV file (default: read a text file)
+
+    Returns
+    -------
+    Iterator[str | Label | None]
+        Sticker contents, None for empty stickers
+    """
+
+    names = read_names(path_input, columns)
+    if substitute is not None:
+        names = (
+            Label(substitute(name.name), name.date)
+            if type(name) is Label
+            else substitute(name)
+            for name in names
+        )
+    if suffix_groups:
+        names = add_suffixes(names, suffix_groups)
+    return skip_stickers(names, skip)
+
+
+def source_lines(
+    path_input: Path | NamePattern,
+    suffix_groups: list[list[str]],
+    columns: Columns | None = None,
+) -> Iterator[int]:
+    """
+    Yield the line of the input file each sticker of sticker_names comes from
+
+    Names generated from a pattern are numbered in the order they are
+    generated instead.
+
+    Parameters
+    ----------
+    path_input: Path | NamePattern
+        Text file containing one sample name per line, CSV or TSV file, or
+        pattern generating the names
+    suffix_groups: list[list[str]]
+        Groups of suffixes, applied in order
+    columns: Columns | None
+        Columns to read from a CSV or TSV file (default: read a text file)
+
+    Yields
+    ------
+    int
+        Line numbers, starting at 1, not including skipped stickers
+    """
+
+    stickers_per_line = count_suffixed(1, suffix_groups)
+    if type(path_input) is NamePattern:
+        for line_number in range(1, path_input.count + 1):
+            yield from repeat(line_number, stickers_per_line)
+        return
+
+    if columns is not None:
+        for line_number, _, _, copies in read_rows(path_input, columns):
+            yield from repeat(line_number, copies * stickers_per_line)
+        return
+
+    with open(path_input, "r") as file:
+        for line_number, line in enumerate(file, start=1):
+            if line.rstrip():
+                yield from repeat(line_number, stickers_per_line)
+
+
+def pad_page(
+    stickers: Iterable[str | Label | None], number: int
+) -> Iterator[str | Label | None]:
+    """
+    Follow stickers with empty ones up to the end of the page
+
+    Parameters
+    ----------
+    stickers: Iterable[str | Label | None]
+        Sticker contents
+    number: int
+        Number of stickers
+
+    Returns
+    -------
+    Iterator[str | Label | None]
+        Sticker contents followed by None for each empty sticker
+    """
+
+    return chain(stickers, repeat(None, -number % 189))
@@ -0,0 +1,118 @@
+"""Build output files privately and publish them atomically
+
+Every run typesets in a temporary directory of its own, in memory where
+a tmpfs is available, so that runs writing to the same directory do not
+overwrite each other's auxiliary files. Finished files are copied next to
+their destination under a temporary name and then renamed, so readers
+never see a partially written PDF. Runs writing the same output file can
+additionally be serialised by an advisory lock.
+"""
+
+import os
+import secrets
+import shutil
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PATH_TMPFS = Path("/dev/shm")
+"""Memory-backed file system used for temporary files if available"""
+
+LOCK_RETRY = 0.5
+"""Seconds between attempts to take a lock held by another run on Windows"""
+
+
+def temp_root() -> Path | None:
+    """Return tmpfs mount point if writable, None for the default location"""
+    if PATH_TMPFS.is_dir() and os.access(PATH_TMPFS, os.W_OK | os.X_OK):
+        return PATH_TMPFS
+    return None
+
+
+def publish(path_source: Path, path_target: Path) -> None:
+    """
+    Copy file to its destination atomically
+
+    The file is copied into the directory of `path_target` under a hidden
+    temporary name first and then renamed, which replaces an existing file
+    in a single step even on network drives.
+
+    Parameters
+    ----------
+    path_source: Path
+        File to publish, e.g. in a temporary build directory
+    path_target: Path
+        Destination of the file
+    """
+
+    # Unlike mkstemp, copyfile creates the file with the permissions set by
+    # the umask, as if it had been written in place
+    path_temp = path_target.with_name(f".{path_target.name}.{secrets.token_hex(8)}.tmp")
+    try:
+        shutil.copyfile(path_source, path_temp)
+        os.replace(path_temp, path_target)
+    except BaseException:
+        Path(path_temp).unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def lock(
+    path_output: Path, on_wait: Callable[[], None] | None = None
+) -> Iterator[None]:
+    """
+    Hold an advisory lock on an output file
+
+    The lock is taken on a hidden file next to the output, so it is shared
+    by all runs that can see the directory, including runs on other hosts
+    if the network file system supports locking (e.g. NFS on Linux). It
+    only excludes runs taking the lock as well.
+
+    Parameters
+    ----------
+    path_output: Path
+        Output file to lock
+    on_wait: Callable[[], None] | None
+        Function called once if the lock is held by another run, before
+        waiting for it (default: wait silently)
+    """
+
+    path_lock = path_output.with_name(f".{path_output.name}.lock")
+    with open(path_lock, "a+b") as file_lock:
+        if not _try_lock(file_lock):
+            if on_wait is not None:
+                on_wait()
+            while not _try_lock(file_lock, blocking=True):
+                time.sleep(LOCK_RETRY)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file_lock, fcntl.LOCK_UN)
+            else:
+                file_lock.seek(0)
+                msvcrt.locking(file_lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _try_lock(file_lock, blocking: bool = False) -> bool:
+    """Lock an open file exclusively, return whether the lock was taken"""
+
+    try:
+        if fcntl is not None:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            fcntl.flock(file_lock, flags)
+        else:
+            # LK_LOCK gives up after ten attempts within ten seconds
+            file_lock.seek(0)
+            mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+            msvcrt.locking(file_lock.fileno(), mode, 1)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,310 @@
+"""Generate sample names from brace patterns instead of an input file
+
+Patterns are expanded like brace expressions in Bash:
+
+- `{1..12}` counts from 1 to 12, `{01..12}` pads the numbers with zeros
+  to the same width and `{1..12..3}` counts in steps of three
+- `{A..H}` runs through letters
+- `{CTRL,TREAT}` lists alternatives, which may contain braces themselves
+
+For example, `Plate{1..2}-{A..B}{01..03}` produces Plate1-A01, Plate1-A02,
+Plate1-A03, Plate1-B01 and so on up to Plate2-B03. Braces that do not
+contain a range or a comma are kept as they are, and a backslash makes the
+next character literal. Empty names, e.g. the first of `{,A}`, are left out
+like empty lines of input files.
+
+Names are generated one at a time in order. Their number and the name at
+any position are worked out from the parsed pattern without generating
+the preceding names.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from itertools import repeat
+from math import prod
+
+_RANGE = re.compile(
+    r"(?:(?P<start>-?\d+)\.\.(?P<end>-?\d+)|(?P<first>[A-Za-z])\.\.(?P<last>[A-Za-z]))"
+    r"(?:\.\.(?P<step>-?\d+))?"
+)
+"""Contents of braces expanding to a range of numbers or letters"""
+
+TAIL_SIZE = 4096
+"""Largest number of endings of names kept in memory while generating them"""
+
+
+class NamePattern:
+    """
+    Sequence of sample names described by a brace pattern
+
+    Parameters
+    ----------
+    pattern: str
+        Pattern, e.g. "Plate{1..50}-{A..H}{01..12}"
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.parts = _parse(pattern)
+        self.empty = _empty_indices(self.parts)
+        """Positions of the empty combinations of parts, which are left out"""
+        self.count = _count(self.parts) - len(self.empty)
+        """Number of names generated"""
+
+    @property
+    def name(self) -> str:
+        """Pattern, shown in messages where file names are shown otherwise"""
+        return self.pattern
+
+    def __iter__(self) -> Iterator[str]:
+        combinations = self._combinations()
+        return filter(None, combinations) if self.empty else combinations
+
+    def _combinations(self) -> Iterator[str]:
+        # Generate the combinations of the last parts once and append them to
+        # each combination of the other parts, as long as they are few
+        split = len(self.parts)
+        tail_count = 1
+        while split > 0 and tail_count * self.parts[split - 1].count <= TAIL_SIZE:
+            split -= 1
+            tail_count *= self.parts[split].count
+        if split == len(self.parts):
+            yield from _expand(self.parts, "")
+            return
+        tail = list(_expand(self.parts[split:], ""))
+        for head in _expand(self.parts[:split], ""):
+            yield from map(head.__add__, tail)
+
+    def __getitem__(self, index: int) -> str:
+        """Return name at a position without generating the names before it"""
+
+        if not -self.count <= index < self.count:
+            raise IndexError("pattern index out of range")
+        index %= self.count
+        for index_empty in self.empty:
+            if index_empty > index:
+                break
+            index += 1
+        return _name_at(self.parts, index)
+
+    def __repr__(self) -> str:
+        return f"NamePattern({self.pattern!r})"
+
+
+class _Literal:
+    """Text copied into every name"""
+
+    count = 1
+    empty = ()
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __iter__(self) -> Iterator[str]:
+        yield self.text
+
+    def __getitem__(self, index: int) -> str:
+        return self.text
+
+
+class _Range:
+    """Range of numbers, optionally padded with zeros, or of letters"""
+
+    empty = ()
+
+    def __init__(self, start: int, end: int, step: int, width: int, letters: bool):
+        self.step = max(abs(step), 1) * (1 if end >= start else -1)
+        self.start = start
+        self.count = abs(end - start) // abs(self.step) + 1
+        self.width = width
+        self.letters = letters
+
+    def __iter__(self) -> Iterator[str]:
+        numbers = range(self.start, self.start + self.count * self.step, self.step)
+        if self.letters:
+            return map(chr, numbers)
+        return map(str.zfill, map(str, numbers), repeat(self.width))
+
+    def __getitem__(self, index: int) -> str:
+        number = self.start + index * self.step
+        return chr(number) if self.letters else str(number).zfill(self.width)
+
+
+class _Choice:
+    """Alternatives listed between braces, each a pattern of its own"""
+
+    def __init__(self, alternatives: list[list]):
+        self.alternatives = alternatives
+        self.counts = [_count(parts) for parts in alternatives]
+        self.count = sum(self.counts)
+
+        # Empty alternatives still count, e.g. for "S" of "S{,-rep}"
+        self.empty = []
+        offset = 0
+        for parts, count in zip(alternatives, self.counts):
+            self.empty += [offset + index for index in _empty_indices(parts)]
+            offset += count
+
+    def __iter__(self) -> Iterator[str]:
+        for parts in self.alternatives:
+            yield from _expand(parts, "")
+
+    def __getitem__(self, index: int) -> str:
+        for parts, count in zip(self.alternatives, self.counts):
+            if index < count:
+                return _name_at(parts, index)
+            index -= count
+        raise IndexError("pattern index out of range")
+
+
+def _count(parts: Iterable) -> int:
+    """Return number of combinations of the texts of `parts`"""
+    return prod(part.count for part in parts)
+
+
+def _name_at(parts: list, index: int) -> str:
+    """Return combination of the texts of `parts` at position `index`"""
+
+    texts = []
+    for part in reversed(parts):
+        index, index_part = divmod(index, part.count)
+        texts.append(part[index_part])
+    return "".join(reversed(texts))
+
+
+def _empty_indices(parts: list) -> list[int]:
+    """Return sorted positions of the empty combinations of `parts`"""
+
+    # A combination is empty if the text of every part is
+    indices = [0]
+    for part in parts:
+        indices = [
+            index * part.count + index_part
+            for index in indices
+            for index_part in part.empty
+        ]
+    return indices
+
+
+def _expand(parts: list, prefix: str) -> Iterator[str]:
+    """Yield `prefix` followed by every combination of the texts of `parts`"""
+
+    if not parts:
+        yield prefix
+    elif len(parts) == 1:
+        yield from map(prefix.__add__, parts[0]) if prefix else parts[0]
+    else:
+        for text in parts[0]:
+            yield from _expand(parts[1:], prefix + text)
+
+
+def _parse(pattern: str) -> list:
+    """Split pattern into literal text, ranges and lists of alternatives"""
+
+    parts = []
+    literal = []
+
+    def flush() -> None:
+        if literal:
+            parts.append(_Literal("".join(literal)))
+            literal.clear()
+
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            literal.append(pattern[i + 1])
+            i += 2
+            continue
+        end = _closing_brace(pattern, i) if char == "{" else None
+        if end is None:
+            literal.append(char)
+            i += 1
+            continue
+
+        content = pattern[i + 1 : end]
+        alternatives = _split_alternatives(content)
+        if match := _RANGE.fullmatch(content):
+            flush()
+            parts.append(_range(match))
+        elif len(alternatives) > 1:
+            flush()
+            parts.append(_Choice([_parse(text) for text in alternatives]))
+        else:
+            # Keep braces without range or comma, but expand their contents
+            literal.append("{")
+            flush()
+            parts += _parse(content)
+            literal.append("}")
+        i = end + 1
+    flush()
+
+    # Join neighbouring literals, e.g. around expanded plain braces
+    merged = []
+    for part in parts:
+        if merged and type(part) is _Literal and type(merged[-1]) is _Literal:
+            merged[-1] = _Literal(merged[-1].text + part.text)
+        else:
+            merged.append(part)
+    return merged
+
+
+def _range(match: re.Match) -> _Range:
+    """Create range from the match of _RANGE"""
+
+    step = int(match["step"] or 1)
+    if match["first"] is not None:
+        return _Range(ord(match["first"]), ord(match["last"]), step, 0, True)
+
+    # Numbers are padded if either end is written with a leading zero
+    start, end = match["start"], match["end"]
+    padded = any(
+        len(text.lstrip("-")) > 1 and text.lstrip("-")[0] == "0"
+        for text in (start, end)
+    )
+    width = max(len(start), len(end)) if padded else 0
+    return _Range(int(start), int(end), step, width, False)
+
+
+def _closing_brace(pattern: str, start: int) -> int | None:
+    """Return position of the brace closing the one at `start`, if any"""
+
+    depth = 0
+    i = start
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return None
+
+
+def _split_alternatives(content: str) -> list[str]:
+    """Split contents of braces at commas outside of nested braces"""
+
+    alternatives = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(content):
+        char = content[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+        elif char == "," and depth == 0:
+            alternatives.append(content[start:i])
+            start = i + 1
+        i += 1
+    alternatives.append(content[start:])
+    return alternatives
@@ -0,0 +1,343 @@
+"""Typeset sticker sheets as PDF without TeX
+
+The layout mirrors the table written to the TeX file: seven columns and 27
+rows per A4 page inside the margins set by preamble.tex, with font sizes
+chosen by the same rules as the TeX backend. Computer Modern Unicode Sans
+Serif Bold is embedded if it can be found, otherwise the standard
+Helvetica Bold font is used. TrueType fonts are subset to the glyphs used,
+OpenType fonts with CFF outlines such as cmunsx.otf are embedded in full.
+"""
+
+import zlib
+from collections.abc import Iterable
+from itertools import islice
+from pathlib import Path
+
+from .fonts import Font, find_font, subset_truetype
+from .formatting import sticker_format, str_width
+from .names import Label
+
+CM = 72 / 2.54
+"""PDF units (big points) per centimetre"""
+
+PT = 72 / 72.27
+"""PDF units per TeX point"""
+
+PAGE_WIDTH = 21 * CM
+PAGE_HEIGHT = 29.7 * CM
+MARGIN_X = 0.5 * CM
+MARGIN_Y = 1.2 * CM
+
+COLUMNS = 7
+ROWS = 27
+COLUMN_SEP = 2 * 6 * PT
+COLUMN_WIDTH = (PAGE_WIDTH - 2 * MARGIN_X - (COLUMNS - 1) * COLUMN_SEP) / COLUMNS
+ROW_HEIGHT = (PAGE_HEIGHT - 2 * MARGIN_Y) / ROWS
+
+STRETCH = 0.95
+"""Line spacing set by \\setstretch in preamble.tex"""
+
+FONT_SIZES = {
+    None: (8, 9.5),
+    "\\scriptsize": (7, 8),
+    "\\ssmall": (6, 7),
+    "\\tiny": (5, 6),
+}
+"""Font size and baseline skip in TeX points for each TeX size command"""
+
+
+def write_pdf(
+    path_output: Path,
+    stickers: Iterable[str | Label | None],
+    str_date: str | None,
+    path_font: Path | None = None,
+) -> None:
+    """
+    Write sticker sheets to a PDF file
+
+    Parameters
+    ----------
+    path_output: Path
+        Path of the PDF file to create
+    stickers: Iterable[str | Label | None]
+        Sticker contents, None for stickers to leave empty
+    str_date: str | None
+        Date to print on stickers not labelled with their own date, None to
+        leave the date empty
+    path_font: Path | None
+        Font to embed (default: cmunsx.otf from the TeX distribution)
+    """
+
+    if path_font is None:
+        path_font = find_font()
+    typeface = _StandardFont() if path_font is None else _EmbeddedFont(Font(path_font))
+
+    writer = _Writer()
+    ref_pages = writer.reserve()
+    ref_font = writer.reserve()
+
+    # Write pages as stickers arrive, but at least one page
+    stickers = iter(stickers)
+    refs_page = []
+    while True:
+        names_page = list(islice(stickers, ROWS * COLUMNS))
+        if not names_page and refs_page:
+            break
+        content = _page_content(names_page, str_date, typeface)
+        ref_content = writer.stream(content)
+        refs_page.append(
+            writer.add(
+                f"<< /Type /Page /Parent {ref_pages} 0 R "
+                f"/MediaBox [0 0 {PAGE_WIDTH:.3f} {PAGE_HEIGHT:.3f}] "
+                f"/Resources << /Font << /F1 {ref_font} 0 R >> >> "
+                f"/Contents {ref_content} 0 R >>"
+            )
+        )
+
+    kids = " ".join(f"{ref} 0 R" for ref in refs_page)
+    writer.add(f"<< /Type /Pages /Kids [{kids}] /Count {len(refs_page)} >>", ref_pages)
+    typeface.write(writer, ref_font)
+    ref_catalog = writer.add(f"<< /Type /Catalog /Pages {ref_pages} 0 R >>")
+
+    path_output.write_bytes(writer.output(ref_catalog))
+
+
+def _page_content(names_page: list, str_date: str | None, typeface) -> bytes:
+    """Return content stream drawing one page of stickers"""
+
+    content = [b"BT"]
+    for index, name in enumerate(names_page):
+        if name is None:
+            continue
+        row, column = divmod(index, COLUMNS)
+        if type(name) is Label:
+            lines = _sticker_lines(name.name, name.date, typeface)
+        else:
+            lines = _sticker_lines(name, str_date, typeface)
+
+        x_cell = MARGIN_X + column * (COLUMN_WIDTH + COLUMN_SEP)
+        height = sum(leading for _, leading in lines)
+        y = PAGE_HEIGHT - MARGIN_Y - row * ROW_HEIGHT - (ROW_HEIGHT - height) / 2
+
+        for words, leading in lines:
+            y -= leading
+            width = _line_width(words, typeface)
+            x = x_cell + (COLUMN_WIDTH - width) / 2
+            for text, size in words:
+                position = f"/F1 {size:.2f} Tf 1 0 0 1 {x:.2f} {y + leading / 4:.2f} Tm"
+                content.append(f"{position} ".encode() + typeface.encode(text) + b" Tj")
+                x += typeface.width(f"{text} ", size)
+    content.append(b"ET")
+    return b"\n".join(content)
+
+
+def _sticker_lines(name: str, str_date: str | None, typeface) -> list:
+    """
+    Break sticker text into lines fitting the column width
+
+    Returns
+    -------
+    list
+        Lines as tuples of words (pairs of text and font size) and leading
+    """
+
+    _, size, inline_date = sticker_format(name)
+    size_name, skip_name = FONT_SIZES[size]
+    size_date, skip_date = FONT_SIZES[None]
+
+    words_name = [
+        (word, size_name * PT, skip_name * PT * STRETCH) for word in name.split()
+    ]
+    words_date = [
+        (word, size_date * PT, skip_date * PT * STRETCH)
+        for word in (str_date or "").split()
+    ]
+
+    # Reserve a line for the date even if it is left empty
+    if inline_date:
+        return _wrap(words_name + words_date, typeface)
+    return _wrap(words_name, typeface) + (
+        _wrap(words_date, typeface) or [([], skip_date * PT * STRETCH)]
+    )
+
+
+def _wrap(words: list, typeface) -> list:
+    """Break words into lines greedily"""
+
+    lines = []
+    line = []
+    leading = 0
+    for text, size, skip in words:
+        if line and _line_width([*line, (text, size)], typeface) > COLUMN_WIDTH:
+            lines.append((line, leading))
+            line = []
+            leading = 0
+        line.append((text, size))
+        leading = max(leading, skip)
+    if line:
+        lines.append((line, leading))
+    return lines
+
+
+def _line_width(words: list, typeface) -> float:
+    """Return width of words separated by spaces"""
+
+    width = sum(typeface.width(text, size) for text, size in words)
+    width += sum(typeface.width(" ", size) for _, size in words[1:])
+    return width
+
+
+class _EmbeddedFont:
+    """OpenType font embedded as a composite PDF font"""
+
+    def __init__(self, font: Font):
+        self.font = font
+        self.used = {}
+        """Characters written with this font indexed by glyph ID"""
+
+    def width(self, text: str, size: float) -> float:
+        return self.font.width(text, size)
+
+    def encode(self, text: str) -> bytes:
+        glyphs = [self.font.glyph(char) for char in text]
+        # Missing characters are drawn with the .notdef glyph 0
+        self.used.update((glyph, char) for glyph, char in zip(glyphs, text) if glyph)
+        return b"<" + "".join(f"{glyph:04X}" for glyph in glyphs).encode() + b">"
+
+    def write(self, writer, ref_font: int) -> None:
+        font = self.font
+        if font.is_cff:
+            # Subsetting CFF outlines would require a CFF writer, so the
+            # whole font file is embedded
+            name = font.name
+            ref_file = writer.stream(font.data, "/Subtype /OpenType")
+            file_key = "FontFile3"
+            subtype = "CIDFontType0"
+        else:
+            # Subset fonts are tagged with a prefix of six capital letters
+            name = f"{_subset_tag(self.used)}+{font.name}"
+            data = subset_truetype(font, set(self.used))
+            ref_file = writer.stream(data, f"/Length1 {len(data)}")
+            file_key = "FontFile2"
+            subtype = "CIDFontType2 /CIDToGIDMap /Identity"
+
+        bbox = " ".join(f"{font.scale(value):.0f}" for value in font.bbox)
+        ref_descriptor = writer.add(
+            f"<< /Type /FontDescriptor /FontName /{name} /Flags 4 "
+            f"/FontBBox [{bbox}] /ItalicAngle {font.italic_angle:.1f} "
+            f"/Ascent {font.scale(font.ascent):.0f} "
+            f"/Descent {font.scale(font.descent):.0f} "
+            f"/CapHeight {font.scale(font.cap_height):.0f} /StemV 80 "
+            f"/{file_key} {ref_file} 0 R >>"
+        )
+        widths = " ".join(
+            f"{glyph} [{font.advance(glyph):.0f}]" for glyph in sorted(self.used)
+        )
+        ref_cid = writer.add(
+            f"<< /Type /Font /Subtype /{subtype} /BaseFont /{name} "
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            f"/FontDescriptor {ref_descriptor} 0 R /W [{widths}] >>"
+        )
+        ref_unicode = writer.stream(_to_unicode(self.used))
+        writer.add(
+            f"<< /Type /Font /Subtype /Type0 /BaseFont /{name} "
+            f"/Encoding /Identity-H /DescendantFonts [{ref_cid} 0 R] "
+            f"/ToUnicode {ref_unicode} 0 R >>",
+            ref_font,
+        )
+
+
+class _StandardFont:
+    """Helvetica Bold, which PDF viewers provide without embedding"""
+
+    def width(self, text: str, size: float) -> float:
+        # Helvetica Bold is close enough to the metrics of the TeX font
+        return str_width(text, 1000) * size / 1000
+
+    def encode(self, text: str) -> bytes:
+        raw = text.encode("cp1252", errors="replace")
+        for char in (b"\\", b"(", b")"):
+            raw = raw.replace(char, b"\\" + char)
+        return b"(" + raw + b")"
+
+    def write(self, writer, ref_font: int) -> None:
+        writer.add(
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold "
+            "/Encoding /WinAnsiEncoding >>",
+            ref_font,
+        )
+
+
+class _Writer:
+    """Collect numbered PDF objects and serialise them"""
+
+    def __init__(self):
+        self.objects = {}
+        self.count = 0
+
+    def reserve(self) -> int:
+        """Return number for an object that is added later"""
+        self.count += 1
+        return self.count
+
+    def add(self, body: str | bytes, ref: int | None = None) -> int:
+        """Add object and return its number"""
+        if ref is None:
+            ref = self.reserve()
+        self.objects[ref] = body.encode() if isinstance(body, str) else body
+        return ref
+
+    def stream(self, data: bytes, entries: str = "") -> int:
+        """Add compressed stream and return its number"""
+        data = zlib.compress(data)
+        header = f"<< /Length {len(data)} /Filter /FlateDecode {entries}>>"
+        return self.add(f"{header}\nstream\n".encode() + data + b"\nendstream")
+
+    def output(self, ref_root: int) -> bytes:
+        """Return PDF file with the object `ref_root` as document catalog"""
+        output = bytearray(b"%PDF-1.6\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for ref in range(1, self.count + 1):
+            offsets.append(len(output))
+            output += f"{ref} 0 obj\n".encode() + self.objects[ref] + b"\nendobj\n"
+        xref = len(output)
+        output += f"xref\n0 {self.count + 1}\n0000000000 65535 f \n".encode()
+        for offset in offsets:
+            output += f"{offset:010d} 00000 n \n".encode()
+        output += (
+            f"trailer\n<< /Size {self.count + 1} /Root {ref_root} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n"
+        ).encode()
+        return bytes(output)
+
+
+def _to_unicode(used: dict[int, str]) -> bytes:
+    """Return CMap mapping glyph IDs back to text for copy and paste"""
+
+    lines = [
+        "/CIDInit /ProcSet findresource begin 12 dict begin begincmap",
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        "/CMapName /Adobe-Identity-UCS def /CMapType 2 def",
+        "1 begincodespacerange <0000> <FFFF> endcodespacerange",
+    ]
+    glyphs = sorted(used)
+    for start in range(0, len(glyphs), 100):
+        chunk = glyphs[start : start + 100]
+        lines.append(f"{len(chunk)} beginbfchar")
+        for glyph in chunk:
+            utf16 = used[glyph].encode("utf-16-be").hex().upper()
+            lines.append(f"<{glyph:04X}> <{utf16}>")
+        lines.append("endbfchar")
+    lines.append("endcmap CMapName currentdict /CMap defineresource pop end end")
+    return "\n".join(lines).encode()
+
+
+def _subset_tag(used: dict[int, str]) -> str:
+    """Return six capital letters derived from the glyphs of a subset font"""
+
+    checksum = zlib.crc32(" ".join(map(str, sorted(used))).encode())
+    tag = ""
+    for _ in range(6):
+        checksum, letter = divmod(checksum, 26)
+        tag += chr(ord("A") + letter)
+    return tag
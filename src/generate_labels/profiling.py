@@ -0,0 +1,174 @@
+"""Measure time and memory spent in each phase of a run
+
+Profiling is switched on by --profile. Code marks its phases with
+`with profiling.phase("name"):`, which does nothing unless a profiler has
+been started. Phases entered repeatedly, e.g. once per page, add up. Peak
+memory is the largest amount of memory allocated by Python during any
+part of a phase, as traced by tracemalloc. As tracemalloc keeps a single
+peak for the whole process, phases must not run in several threads at the
+same time; batch mode typesets one file at a time while profiling.
+"""
+
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+_profiler = None
+"""Profiler of the current run, None if profiling is off"""
+
+
+class Profiler:
+    """
+    Collect measurements of a run
+
+    Parameters
+    ----------
+    path_report: str | None
+        JSON file to write the report to, None to print a table
+    path_cprofile: str | None
+        File to dump cProfile statistics of the Python code to
+    """
+
+    def __init__(self, path_report: str | None, path_cprofile: str | None):
+        self.path_report = path_report
+        self.path_cprofile = path_cprofile
+        self.phases = {}
+        """Seconds, peak memory in bytes and number of calls for each phase"""
+        self.tex_runs = []
+        """Purpose, seconds and log size in bytes of each TeX run"""
+        self.cprofile = None if path_cprofile is None else cProfile.Profile()
+        self.time_start = time.perf_counter()
+
+
+def start(path_report: str | None = None, path_cprofile: str | None = None) -> None:
+    """
+    Start profiling the current run
+
+    Parameters
+    ----------
+    path_report: str | None
+        JSON file to write the report to (default: print a table)
+    path_cprofile: str | None
+        File to dump cProfile statistics to (default: no cProfile)
+    """
+
+    global _profiler
+    _profiler = Profiler(path_report, path_cprofile)
+    tracemalloc.start()
+    if _profiler.cprofile is not None:
+        _profiler.cprofile.enable()
+
+
+def enabled() -> bool:
+    """Return whether a profiler has been started"""
+    return _profiler is not None
+
+
+def phase(name: str):
+    """
+    Return context manager measuring the code run inside it as phase `name`
+
+    Parameters
+    ----------
+    name: str
+        Name of the phase, e.g. "read" or "compile"
+    """
+
+    if _profiler is None:
+        return nullcontext()
+    return _measure(_profiler, name)
+
+
+@contextmanager
+def _measure(profiler: Profiler, name: str):
+    """Add time and peak memory of the enclosed code to a phase"""
+
+    tracemalloc.reset_peak()
+    time_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - time_start
+        peak = tracemalloc.get_traced_memory()[1]
+        phase_seconds, phase_peak, calls = profiler.phases.get(name, (0, 0, 0))
+        profiler.phases[name] = (
+            phase_seconds + seconds,
+            max(phase_peak, peak),
+            calls + 1,
+        )
+
+
+def record_tex(purpose: str, seconds: float, path_log: Path | None) -> None:
+    """
+    Record runtime and log size of a TeX run if profiling is on
+
+    Parameters
+    ----------
+    purpose: str
+        What TeX was run for, e.g. "typeset" or "merge"
+    seconds: float
+        Wall time of the TeX process
+    path_log: Path | None
+        Log file written by TeX, None if the program writes no log
+    """
+
+    if _profiler is None:
+        return
+    size_log = path_log.stat().st_size if path_log and path_log.exists() else 0
+    _profiler.tex_runs.append((purpose, seconds, size_log))
+
+
+def stop() -> None:
+    """Stop profiling and print or write the report"""
+
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return
+
+    if profiler.cprofile is not None:
+        profiler.cprofile.disable()
+        profiler.cprofile.dump_stats(profiler.path_cprofile)
+    tracemalloc.stop()
+
+    report = {
+        "seconds": time.perf_counter() - profiler.time_start,
+        "phases": [
+            {"phase": name, "seconds": seconds, "peak_memory": peak, "calls": calls}
+            for name, (seconds, peak, calls) in profiler.phases.items()
+        ],
+        "tex_runs": [
+            {"purpose": purpose, "seconds": seconds, "log_size": size_log}
+            for purpose, seconds, size_log in profiler.tex_runs
+        ],
+    }
+
+    if profiler.path_report is not None:
+        Path(profiler.path_report).write_text(json.dumps(report, indent=2))
+        return
+
+    print(f"\n{'Phase':<12}  {'Seconds':>8}  {'Peak memory':>12}  Calls")
+    for row in report["phases"]:
+        print(
+            f"{row['phase']:<12}  {row['seconds']:>8.3f}  "
+            f"{_format_bytes(row['peak_memory']):>12}  {row['calls']}"
+        )
+    for row in report["tex_runs"]:
+        print(
+            f"{'xelatex':<12}  {row['seconds']:>8.3f}  "
+            f"{'':>12}  {row['purpose']}, log {_format_bytes(row['log_size'])}"
+        )
+    print(f"{'total':<12}  {report['seconds']:>8.3f}")
+
+
+def _format_bytes(size: int) -> str:
+    """Return size in bytes in human readable form"""
+
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
@@ -0,0 +1,389 @@
+"""Serve sticker sheets over HTTP
+
+`generate-labels serve` starts a local HTTP server that typesets sample
+names posted as JSON and responds with the PDF. Starting Python and
+loading the TeX format for every sheet is avoided: the format is built
+once at startup and each job runs in a pool of worker threads, every job
+in its own temporary directory. Identical jobs submitted while one of them
+is still waiting or running share its result.
+
+```
+curl -X POST localhost:8000/render \
+  -d '{"names": ["A1", "A2"], "skip": 3, "date": "none"}' -o labels.pdf
+```
+
+Endpoints
+---------
+POST /render
+    Typeset a job, responds with the PDF
+GET /metrics
+    Queue depth, job counts and latency percentiles as JSON
+GET /health
+    Responds with "ok"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import tex
+from .api import render_labels
+from .formatting import parse_date
+
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+"""Largest accepted request body in bytes"""
+
+LATENCY_SAMPLES = 1000
+"""Number of recent jobs latency percentiles are computed from"""
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is full"""
+
+
+class Renderer:
+    """
+    Typeset jobs in a bounded pool of worker threads
+
+    Parameters
+    ----------
+    workers: int
+        Number of jobs typeset at the same time
+    max_queue: int
+        Number of jobs that may wait for a worker before new ones are rejected
+    backend: str
+        "xelatex" or "pdf"
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    """
+
+    def __init__(
+        self, workers: int, max_queue: int, backend: str, exec_tex: str = "xelatex"
+    ):
+        self.max_queue = max_queue
+        self.backend = backend
+        self.exec_tex = exec_tex
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.jobs = {}
+        """Futures of waiting and running jobs indexed by job key"""
+        self.queued = 0
+        self.running = 0
+        self.counts = {"completed": 0, "failed": 0, "coalesced": 0, "rejected": 0}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        """Seconds from submission to completion of recent jobs"""
+
+    def warm_up(self) -> None:
+        """Build the TeX format so that no job has to wait for it"""
+        if self.backend == "xelatex":
+            tex.build_format(self.exec_tex)
+
+    def submit(self, job: dict) -> Future:
+        """
+        Queue a job unless an identical one is waiting or running
+
+        Parameters
+        ----------
+        job: dict
+            Validated job as returned by parse_job
+
+        Returns
+        -------
+        Future
+            Future resolving to the bytes of the PDF
+        """
+
+        key = hashlib.sha256(json.dumps(job, sort_keys=True).encode()).hexdigest()
+        with self.lock:
+            future = self.jobs.get(key)
+            if future is not None:
+                self.counts["coalesced"] += 1
+                return future
+            if self.queued >= self.max_queue:
+                self.counts["rejected"] += 1
+                raise QueueFullError
+            self.queued += 1
+            future = self.executor.submit(self._run, key, job, time.perf_counter())
+            self.jobs[key] = future
+        return future
+
+    def _run(self, key: str, job: dict, time_submit: float) -> bytes:
+        """Typeset a job and keep count of its outcome"""
+
+        with self.lock:
+            self.queued -= 1
+            self.running += 1
+        success = False
+        try:
+            data = render(job, self.backend)
+            success = True
+            return data
+        finally:
+            with self.lock:
+                self.running -= 1
+                del self.jobs[key]
+                self.counts["completed" if success else "failed"] += 1
+                self.latencies.append(time.perf_counter() - time_submit)
+
+    def metrics(self) -> dict:
+        """Return queue depth, job counts and latency percentiles"""
+
+        with self.lock:
+            latencies = sorted(self.latencies)
+            metrics = {"queue_depth": self.queued, "running": self.running}
+            metrics |= self.counts
+        metrics["latency_seconds"] = {
+            f"p{percentile}": _percentile(latencies, percentile)
+            for percentile in (50, 90, 99)
+        }
+        return metrics
+
+    def shutdown(self) -> None:
+        """Wait for running jobs and stop the workers"""
+        self.executor.shutdown(cancel_futures=True)
+
+
+def parse_job(body: bytes) -> dict:
+    """
+    Validate a job posted as JSON
+
+    Parameters
+    ----------
+    body: bytes
+        JSON object with the keys "names" (list of sample names), and
+        optionally "skip" (number of stickers to skip), "date" ("today",
+        "none" or a custom date) and "suffix_groups" (list of lists of
+        suffixes)
+
+    Returns
+    -------
+    dict
+        Job with defaults filled in and the date resolved
+
+    Raises
+    ------
+    ValueError
+        If the job is malformed
+    """
+
+    job = json.loads(body)
+    if not isinstance(job, dict):
+        raise ValueError("Job must be a JSON object")
+    unknown = set(job) - {"names", "skip", "date", "suffix_groups"}
+    if unknown:
+        raise ValueError(f"Unknown keys: {', '.join(sorted(unknown))}")
+
+    names_list = job.get("names")
+    if not isinstance(names_list, list) or not all(
+        isinstance(name, str) for name in names_list
+    ):
+        raise ValueError('"names" must be a list of strings')
+    names_list = [name.rstrip() for name in names_list if name.rstrip()]
+    if not names_list:
+        raise ValueError('"names" must contain at least one name')
+
+    skip = job.get("skip", 0)
+    if not isinstance(skip, int) or isinstance(skip, bool) or skip < 0:
+        raise ValueError('"skip" must be a non-negative integer')
+
+    input_date = job.get("date", "today")
+    if not isinstance(input_date, str):
+        raise ValueError('"date" must be a string')
+
+    suffix_groups = job.get("suffix_groups", [])
+    if not isinstance(suffix_groups, list) or not all(
+        isinstance(group, list) and all(isinstance(suffix, str) for suffix in group)
+        for group in suffix_groups
+    ):
+        raise ValueError('"suffix_groups" must be a list of lists of strings')
+
+    return {
+        "names": names_list,
+        "skip": skip,
+        "date": parse_date(input_date),
+        "suffix_groups": [group for group in suffix_groups if group],
+    }
+
+
+def render(job: dict, backend: str = "xelatex") -> bytes:
+    """
+    Typeset a job
+
+    Parameters
+    ----------
+    job: dict
+        Validated job as returned by parse_job
+    backend: str
+        "xelatex" (default) or "pdf"
+
+    Returns
+    -------
+    bytes
+        Contents of the PDF
+
+    Raises
+    ------
+    RuntimeError
+        If no PDF was produced
+    """
+
+    return render_labels(
+        job["names"],
+        skip=job["skip"],
+        date=job["date"],
+        suffix_groups=job["suffix_groups"],
+        backend=backend,
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Dispatch HTTP requests to the renderer of the server"""
+
+    server_version = "generate-labels"
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._respond(HTTPStatus.OK, b"ok\n", "text/plain")
+        elif self.path == "/metrics":
+            self._respond_json(HTTPStatus.OK, self.server.renderer.metrics())
+        else:
+            self._respond_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        if self.path != "/render":
+            self._respond_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+
+        length = self.headers.get("Content-Length", "0")
+        if not length.isdecimal():
+            # A negative length would make the read block until disconnect
+            self._respond_json(
+                HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+            )
+            return
+        length = int(length)
+        if length > MAX_REQUEST_SIZE:
+            self._respond_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request too large"}
+            )
+            return
+
+        try:
+            job = parse_job(self.rfile.read(length))
+        except ValueError as error:
+            self._respond_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+            return
+
+        try:
+            data = self.server.renderer.submit(job).result()
+        except QueueFullError:
+            self._respond_json(
+                HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many queued jobs"}
+            )
+        except (RuntimeError, OSError) as error:
+            self._respond_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)})
+        else:
+            self._respond(HTTPStatus.OK, data, "application/pdf")
+
+    def _respond(self, status: HTTPStatus, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _respond_json(self, status: HTTPStatus, content: dict) -> None:
+        self._respond(status, json.dumps(content).encode(), "application/json")
+
+
+def make_server(host: str, port: int, renderer: Renderer) -> ThreadingHTTPServer:
+    """
+    Create HTTP server dispatching jobs to `renderer`
+
+    Parameters
+    ----------
+    host: str
+        Address to listen on
+    port: int
+        Port to listen on, 0 to pick a free one
+    renderer: Renderer
+        Renderer typesetting the jobs
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        Server, not yet serving
+    """
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.renderer = renderer
+    return server
+
+
+def main(args=None) -> None:
+    """Run the label rendering server until interrupted"""
+
+    parser = argparse.ArgumentParser(prog="generate-labels serve")
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="address to listen on (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=8000, help="port to listen on (default: 8000)"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="INT",
+        help="number of jobs typeset at the same time (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=100,
+        metavar="INT",
+        help="number of waiting jobs above which requests are rejected (default: 100)",
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        choices=["xelatex", "pdf"],
+        default="xelatex",
+        help='typeset with "xelatex" (default) or the built-in "pdf" writer',
+    )
+    args = parser.parse_args(args)
+
+    exec_tex = "xelatex"
+    if args.backend == "xelatex" and shutil.which(exec_tex) is None:
+        sys.exit(f"{exec_tex} was not found. Please install TeX or use --backend pdf")
+
+    renderer = Renderer(max(args.workers, 1), args.max_queue, args.backend, exec_tex)
+    renderer.warm_up()
+    server = make_server(args.host, args.port, renderer)
+    print(f"Serving labels on http://{args.host}:{server.server_port}/render")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        renderer.shutdown()
+
+
+def _percentile(values: list[float], percentile: int) -> float | None:
+    """Return percentile of sorted values using the nearest rank"""
+    if not values:
+        return None
+    return values[max(-(-len(values) * percentile // 100) - 1, 0)]
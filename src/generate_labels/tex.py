@@ -0,0 +1,525 @@
+"""Run XeLaTeX on generated TeX files
+
+Loading the packages of preamble.tex takes up most of a short XeLaTeX run.
+The part of the preamble above the `%%% end of format` line is therefore
+dumped into a format file once and reused by later runs, which then only
+read the remaining part of the preamble and the sticker tables.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from importlib import resources
+from pathlib import Path
+
+from . import profiling
+from .cache import cache_dir
+from .output import publish, temp_root
+
+FORMAT_MARKER = "%%% end of format"
+"""Line separating the precompiled part of preamble.tex from the rest"""
+
+PATH_PREAMBLE = resources.files().joinpath("resources", "preamble.tex")
+
+EXEC_DRIVER = "xdvipdfmx"
+"""Program converting the XDV files written by XeTeX to PDF"""
+
+COMPILE_PROFILES = {
+    "draft": ["-z", "0"],
+    "final": ["-z", "9"],
+}
+"""Options passed to xdvipdfmx by each compile profile: no compression for
+fast proofs, the strongest compression for archiving"""
+
+
+def preamble_parts() -> tuple[str, str]:
+    """
+    Split preamble.tex into the part stored in the format and the rest
+
+    Returns
+    -------
+    tuple[str, str]
+        Lines above and below the format marker
+    """
+
+    preamble = PATH_PREAMBLE.read_text()
+    part_format, _, part_document = preamble.partition(f"{FORMAT_MARKER}\n")
+    return part_format, part_document
+
+
+def document_parts(fmt: str | None) -> tuple[str, str]:
+    """
+    Return TeX code surrounding the sticker tables
+
+    Parameters
+    ----------
+    fmt: str | None
+        Name of a format built by build_format, None for the standard format
+
+    Returns
+    -------
+    tuple[str, str]
+        Preamble, leaving out what the format contains, and end of document
+    """
+
+    part_format, part_document = preamble_parts()
+    if fmt is None:
+        tex_preamble = f"{part_format}{FORMAT_MARKER}\n{part_document}\n"
+    else:
+        tex_preamble = f"{part_document}\n"
+    # Reenable command line output and end document
+    return tex_preamble, "\\scrollmode\n\\end{document}"
+
+
+@cache
+def tex_version(exec_tex: str = "xelatex") -> str:
+    """
+    Identify the installed TeX engine and its base format
+
+    Parameters
+    ----------
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+
+    Returns
+    -------
+    str
+        Version string of the engine followed by path and modification time
+        of its format file, which change whenever TeX Live is updated
+    """
+
+    result = subprocess.run([exec_tex, "--version"], capture_output=True, text=True)
+    version = result.stdout.partition("\n")[0]
+
+    if shutil.which("kpsewhich") is not None:
+        result = subprocess.run(
+            ["kpsewhich", "-engine=xetex", f"{exec_tex}.fmt"],
+            capture_output=True,
+            text=True,
+        )
+        path_format = Path(result.stdout.strip())
+        if result.returncode == 0 and path_format.is_file():
+            version = f"{version}\n{path_format}\n{path_format.stat().st_mtime_ns}"
+    return version
+
+
+def build_format(exec_tex: str = "xelatex") -> str | None:
+    """
+    Return name of a format file containing the preamble, building it if needed
+
+    Formats are stored in the user cache directory, named after a hash of
+    the preamble and the TeX version.
+
+    Parameters
+    ----------
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+
+    Returns
+    -------
+    str | None
+        Name of the format or None if it could not be built
+    """
+
+    part_format, _ = preamble_parts()
+    digest = hashlib.sha256(f"{tex_version(exec_tex)}\n{part_format}".encode())
+    name_format = f"labels-{digest.hexdigest()[:16]}"
+    dir_formats = cache_dir("formats")
+    path_format = dir_formats.joinpath(f"{name_format}.fmt")
+
+    if path_format.exists():
+        return name_format
+
+    # Build in a private directory and move the format into place atomically
+    with tempfile.TemporaryDirectory(dir=dir_formats) as dir_build:
+        path_ini = Path(dir_build, f"{name_format}.tex")
+        # \dump is disabled by LaTeX, the primitive is kept as \@@dump
+        path_ini.write_text(
+            f"{part_format}\n"
+            "\\makeatletter\n"
+            "\\ifx\\@@dump\\@undefined\\expandafter\\dump"
+            "\\else\\expandafter\\@@dump\\fi\n"
+        )
+        time_start = time.perf_counter()
+        subprocess.run(
+            [
+                exec_tex,
+                "-ini",
+                f"-jobname={name_format}",
+                f"-output-directory={dir_build}",
+                f"&{exec_tex}",
+                path_ini,
+            ],
+            stdout=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            cwd=dir_build,
+        )
+        profiling.record_tex(
+            "format",
+            time.perf_counter() - time_start,
+            Path(dir_build, f"{name_format}.log"),
+        )
+        path_built = Path(dir_build, f"{name_format}.fmt")
+        if not path_built.exists():
+            return None
+        os.replace(path_built, path_format)
+
+    return name_format
+
+
+def output_key(
+    paths_tex: list[Path], exec_tex: str = "xelatex", mode: str | None = None
+) -> str:
+    """
+    Return hash identifying the PDF typeset from TeX files
+
+    Parameters
+    ----------
+    paths_tex: list[Path]
+        TeX files in the order they are typeset
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    mode: str | None
+        Compile profile, a key of COMPILE_PROFILES (default: none)
+
+    Returns
+    -------
+    str
+        Hash of the TeX files, the full preamble, the TeX version and the
+        compile profile
+    """
+
+    digest = hashlib.sha256(tex_version(exec_tex).encode())
+    digest.update(PATH_PREAMBLE.read_bytes())
+    if mode is not None:
+        digest.update(mode.encode())
+    for path_tex in paths_tex:
+        with open(path_tex, "rb") as file_tex:
+            digest.update(hashlib.file_digest(file_tex, "sha256").digest())
+    return digest.hexdigest()
+
+
+def run_tex(
+    path_tex: Path,
+    dir_output: Path,
+    exec_tex: str = "xelatex",
+    fmt: str | None = None,
+    mode: str | None = None,
+) -> subprocess.CompletedProcess:
+    """
+    Typeset TeX file
+
+    With a compile profile, XeTeX only writes the XDV file, which is then
+    converted by run_driver. The XDV file is left in `dir_output` so that
+    it can be converted again in another profile.
+
+    Parameters
+    ----------
+    path_tex: Path
+        TeX file to typeset
+    dir_output: Path
+        Directory for the PDF and auxiliary files
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    fmt: str | None
+        Name of a format built by build_format (default: the standard format)
+    mode: str | None
+        Compile profile, a key of COMPILE_PROFILES (default: let XeTeX
+        convert to PDF with the default options)
+
+    Returns
+    -------
+    subprocess.CompletedProcess
+        Result of the last process run
+    """
+
+    command = [exec_tex, f"-output-directory={dir_output}/"]
+    if mode is not None:
+        command.append("-no-pdf")
+    env = None
+    if fmt is not None:
+        command.append(f"-fmt={fmt}")
+        # An empty path element makes kpathsea also search the default path
+        env = os.environ | {"TEXFORMATS": f"{cache_dir('formats')}{os.pathsep}"}
+    command.append(str(path_tex))
+
+    time_start = time.perf_counter()
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, env=env)
+    profiling.record_tex(
+        "typeset",
+        time.perf_counter() - time_start,
+        Path(dir_output, f"{Path(path_tex).stem}.log"),
+    )
+
+    path_xdv = Path(dir_output, f"{Path(path_tex).stem}.xdv")
+    if mode is not None and path_xdv.exists():
+        result = run_driver(path_xdv, path_xdv.with_suffix(".pdf"), mode)
+    return result
+
+
+def run_driver(
+    path_xdv: Path, path_pdf: Path, mode: str
+) -> subprocess.CompletedProcess:
+    """
+    Convert XDV file to PDF with the options of a compile profile
+
+    Parameters
+    ----------
+    path_xdv: Path
+        XDV file written by XeTeX
+    path_pdf: Path
+        Path of the PDF
+    mode: str
+        Compile profile, a key of COMPILE_PROFILES
+
+    Returns
+    -------
+    subprocess.CompletedProcess
+        Result of the xdvipdfmx run
+    """
+
+    # -E embeds fonts regardless of their licensing flags like XeTeX does
+    command = [EXEC_DRIVER, "-q", "-E", *COMPILE_PROFILES[mode]]
+    command += ["-o", str(path_pdf), str(path_xdv)]
+
+    time_start = time.perf_counter()
+    result = subprocess.run(command, stdout=subprocess.DEVNULL)
+    profiling.record_tex("driver", time.perf_counter() - time_start, None)
+    return result
+
+
+def run_parallel(
+    paths_chunk: list[tuple[Path, int]],
+    path_pdf: Path,
+    exec_tex: str = "xelatex",
+    fmt: str | None = None,
+    jobs: int = 2,
+    mode: str | None = None,
+) -> None:
+    """
+    Typeset TeX files in parallel and merge their PDFs in order
+
+    Parameters
+    ----------
+    paths_chunk: list[tuple[Path, int]]
+        TeX files to typeset and their number of pages
+    path_pdf: Path
+        Path of the merged PDF
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    fmt: str | None
+        Name of a format built by build_format (default: the standard format)
+    jobs: int
+        Number of TeX processes to run at the same time (default: 2)
+    mode: str | None
+        Compile profile, a key of COMPILE_PROFILES (default: none)
+    """
+
+    # Each thread only waits for its own TeX process
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        list(
+            executor.map(
+                lambda path_tex: run_tex(
+                    path_tex, path_tex.parent, exec_tex, fmt, mode
+                ),
+                [path_tex for path_tex, _ in paths_chunk],
+            )
+        )
+
+    paths_pdf = [path_tex.with_suffix(".pdf") for path_tex, _ in paths_chunk]
+    if all(path.exists() for path in paths_pdf):
+        pages_pdf = [
+            (path, page)
+            for path, (_, pages) in zip(paths_pdf, paths_chunk)
+            for page in range(1, pages + 1)
+        ]
+        merge_pdfs(pages_pdf, path_pdf, exec_tex, mode)
+
+
+def merge_pdfs(
+    pages_pdf: list[tuple[Path, int]],
+    path_pdf: Path,
+    exec_tex: str = "xelatex",
+    mode: str | None = None,
+) -> None:
+    """
+    Assemble PDF from pages of other PDF files using XeTeX
+
+    The pages are included with the \\XeTeXpdffile primitive in an initex
+    run, so neither a format nor any package has to be loaded.
+
+    Parameters
+    ----------
+    pages_pdf: list[tuple[Path, int]]
+        PDF files and the number of the page to take from each, starting at 1
+    path_pdf: Path
+        Path of the merged PDF, which may also be one of the input files
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    mode: str | None
+        Compile profile, a key of COMPILE_PROFILES (default: none)
+    """
+
+    lines = [
+        "\\catcode`\\{=1 \\catcode`\\}=2",
+        "\\pdfpagewidth=210mm \\pdfpageheight=297mm",
+        "\\hoffset=-1in \\voffset=-1in",
+    ]
+    for path, page in pages_pdf:
+        include = f'\\XeTeXpdffile "{path.as_posix()}" page {page}\\relax'
+        lines.append(f"\\shipout\\hbox{{{include}}}")
+    lines.append("\\end")
+
+    with tempfile.TemporaryDirectory(dir=temp_root()) as dir_build:
+        path_merge = Path(dir_build, "merge.tex")
+        path_merge.write_text("\n".join(lines))
+        command = [
+            exec_tex,
+            "-ini",
+            "-interaction=batchmode",
+            f"-output-directory={dir_build}",
+        ]
+        if mode is not None:
+            command.append("-no-pdf")
+        time_start = time.perf_counter()
+        subprocess.run(
+            [*command, path_merge],
+            stdout=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+        )
+        profiling.record_tex(
+            "merge", time.perf_counter() - time_start, path_merge.with_suffix(".log")
+        )
+        if mode is not None and path_merge.with_suffix(".xdv").exists():
+            run_driver(
+                path_merge.with_suffix(".xdv"), path_merge.with_suffix(".pdf"), mode
+            )
+        if path_merge.with_suffix(".pdf").exists():
+            shutil.move(path_merge.with_suffix(".pdf"), path_pdf)
+
+
+def run_incremental(
+    pages_tex: Iterable[str],
+    path_pdf: Path,
+    tex_preamble: str,
+    tex_end: str,
+    exec_tex: str = "xelatex",
+    fmt: str | None = None,
+    mode: str | None = None,
+) -> tuple[int, int]:
+    """
+    Typeset only pages that changed since the last build of a PDF
+
+    The hash of each page is stored for every output path. Pages whose
+    hash is unchanged are taken from the existing PDF, the other pages are
+    typeset in a single TeX run and spliced in. If that run fails, its TeX
+    file and log are kept next to the PDF.
+
+    Parameters
+    ----------
+    pages_tex: Iterable[str]
+        TeX code of each page
+    path_pdf: Path
+        PDF to update
+    tex_preamble: str
+        TeX code preceding the pages
+    tex_end: str
+        TeX code following the pages
+    exec_tex: str
+        Name of the TeX executable (default: xelatex)
+    fmt: str | None
+        Name of a format built by build_format (default: the standard format)
+    mode: str | None
+        Compile profile, a key of COMPILE_PROFILES (default: none)
+
+    Returns
+    -------
+    tuple[int, int]
+        Number of pages typeset and total number of pages
+    """
+
+    # Hashes of pages depend on everything that affects their appearance
+    digest_base = hashlib.sha256(tex_version(exec_tex).encode())
+    digest_base.update(PATH_PREAMBLE.read_bytes())
+    if mode is not None:
+        digest_base.update(mode.encode())
+
+    # Only trust the previous hashes if the PDF has not been touched since.
+    # A missing, truncated or otherwise unreadable manifest is a cache miss
+    path_manifest = cache_dir("incremental").joinpath(
+        f"{hashlib.sha256(str(path_pdf).encode()).hexdigest()}.json"
+    )
+    hashes_old = []
+    if path_manifest.exists() and path_pdf.exists():
+        try:
+            manifest = json.loads(path_manifest.read_text())
+            stat = path_pdf.stat()
+            if manifest["pdf"] == [stat.st_mtime_ns, stat.st_size]:
+                hashes_old = list(manifest["pages"])
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            hashes_old = []
+    pages_old = {page_hash: i + 1 for i, page_hash in enumerate(hashes_old)}
+
+    with tempfile.TemporaryDirectory(dir=temp_root()) as dir_build:
+        path_tex = Path(dir_build, "pages.tex")
+        path_old = Path(dir_build, "old.pdf")
+        path_new = path_tex.with_suffix(".pdf")
+
+        hashes = []
+        pages_pdf = []
+        pages_new = 0
+        with open(path_tex, "w") as file_tex:
+            file_tex.write(tex_preamble)
+            for page_tex in pages_tex:
+                digest = digest_base.copy()
+                digest.update(page_tex.encode())
+                hashes.append(digest.hexdigest())
+                if hashes[-1] in pages_old:
+                    pages_pdf.append((path_old, pages_old[hashes[-1]]))
+                else:
+                    file_tex.write(page_tex)
+                    pages_new += 1
+                    pages_pdf.append((path_new, pages_new))
+            file_tex.write(tex_end)
+
+        # Leave PDF untouched if no page changed
+        if hashes == hashes_old:
+            return 0, len(hashes)
+
+        if pages_old:
+            shutil.copyfile(path_pdf, path_old)
+        if pages_new > 0:
+            run_tex(path_tex, Path(dir_build), exec_tex, fmt, mode)
+        path_built = path_new
+        if pages_new < len(pages_pdf) and (pages_new == 0 or path_new.exists()):
+            path_built = Path(dir_build, "merged.pdf")
+            merge_pdfs(pages_pdf, path_built, exec_tex, mode)
+
+        # Replace the PDF in one step, or remove it if typesetting failed
+        if path_built.exists():
+            publish(path_built, path_pdf)
+        else:
+            path_pdf.unlink(missing_ok=True)
+
+        # Keep the TeX file and log of changed pages that failed to typeset
+        failed = pages_new > 0 and not path_new.exists()
+        for suffix in (".tex", ".log"):
+            path_debug = path_pdf.with_suffix(suffix)
+            if failed and path_tex.with_suffix(suffix).exists():
+                publish(path_tex.with_suffix(suffix), path_debug)
+            else:
+                path_debug.unlink(missing_ok=True)
+
+    if path_pdf.exists():
+        stat = path_pdf.stat()
+        path_manifest.write_text(
+            json.dumps({"pdf": [stat.st_mtime_ns, stat.st_size], "pages": hashes})
+        )
+    return pages_new, len(pages_pdf)
@@ -0,0 +1,231 @@
+"""Find problems in sample names before typesetting them
+
+Every non-empty line of the input file is checked for control characters,
+characters the sticker font lacks and names too wide to fit on a sticker
+even in the smallest font size. Duplicate names are reported as well, for
+tables only if their dates match too, but not for names generated from a
+pattern, which only repeat if its alternatives do. Large files are checked in chunks by
+multiple processes, a few chunks ahead of the duplicate scan at most.
+"""
+
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from pathlib import Path
+from typing import NamedTuple
+
+from . import glyphs, names, pdf
+from .formatting import str_width
+
+CHUNK_SIZE = 50_000
+"""Number of lines checked by a process at once"""
+
+COLUMN_WIDTH = pdf.COLUMN_WIDTH / pdf.PT
+"""Width of a sticker column in TeX points, as laid out by the PDF backend"""
+
+TINY_SIZE = pdf.FONT_SIZES["\\tiny"][0]
+"""Font size of \\tiny in TeX points"""
+
+TINY_LINES = 3
+"""Number of lines in \\tiny fitting on a sticker above the date"""
+
+_CONTROL_CHARACTERS = re.compile("[\x00-\x1f\x7f-\x9f]")
+
+
+class Problem(NamedTuple):
+    """Problem found in a line of the input file"""
+
+    line: int
+    """Line number, starting at 1"""
+    name: str
+    """Sample name as read from the line"""
+    reason: str
+    """Description of the problem"""
+
+
+def validate_names(
+    path_input: Path | names.NamePattern,
+    suffix_groups: list[list[str]] | None = None,
+    jobs: int | None = None,
+    check_glyphs: bool = True,
+    columns: names.Columns | None = None,
+) -> list[Problem]:
+    """
+    Check all sample names in a file
+
+    Parameters
+    ----------
+    path_input: Path | names.NamePattern
+        Text file containing one sample name per line, CSV or TSV file, or
+        pattern generating the names, which are numbered like lines
+    suffix_groups: list[list[str]] | None
+        Groups of suffixes added to each name. The widest suffix of each
+        group is taken into account when checking the width of names
+    jobs: int | None
+        Number of processes checking chunks of the file (default: number of
+        CPUs available)
+    check_glyphs: bool
+        Report characters missing from the font, e.g. unless they are
+        substituted (default: True)
+    columns: names.Columns | None
+        Columns to read from a CSV or TSV file (default: read a text file)
+
+    Returns
+    -------
+    list[Problem]
+        Problems in the order of the lines they were found in
+    """
+
+    # Widest combination of suffixes, joined to names by hyphens
+    suffix = "".join(
+        "-" + max(group, key=str_width) for group in suffix_groups or [] if group
+    )
+
+    problems = []
+    lines_seen = {}
+    chunks = _read_chunks(path_input, columns)
+    chunk_first = next(chunks, [])
+
+    # Find duplicates while chunks are checked in the background. Labels of
+    # tables are compared with their dates, so that a sample may be listed
+    # once per date. Generated names are not kept in memory to compare them
+    def check_duplicates(chunk: list[tuple[int, str | names.Label]]) -> None:
+        if type(path_input) is names.NamePattern:
+            return
+        # Line of the first occurrence of each label in the chunk
+        lines_first = dict(map(reversed, reversed(chunk)))
+        if len(lines_first) == len(chunk) and lines_seen.keys().isdisjoint(lines_first):
+            lines_seen.update(lines_first)
+            return
+        for line_number, label in chunk:
+            line_first = lines_seen.setdefault(label, line_number)
+            if line_first != line_number:
+                problems.append(
+                    Problem(
+                        line_number,
+                        names.label_name(label),
+                        f"duplicate of line {line_first}",
+                    )
+                )
+
+    jobs = jobs or os.process_cpu_count() or 1
+    if len(chunk_first) < CHUNK_SIZE or jobs == 1:
+        # Not worth starting processes for a single chunk or CPU
+        for chunk in chain([chunk_first], chunks):
+            problems += check_chunk(chunk, suffix, check_glyphs)
+            check_duplicates(chunk)
+    else:
+        # Keep at most two chunks per process in flight, so that the file is
+        # not read into memory faster than it is checked
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = deque()
+            for chunk in chain([chunk_first], chunks):
+                if len(futures) >= 2 * jobs:
+                    problems += futures.popleft().result()
+                futures.append(
+                    executor.submit(check_chunk, chunk, suffix, check_glyphs)
+                )
+                check_duplicates(chunk)
+            for future in futures:
+                problems += future.result()
+
+    problems.sort(key=lambda problem: problem.line)
+    return problems
+
+
+def check_chunk(
+    chunk: list[tuple[int, str | names.Label]],
+    suffix: str = "",
+    check_glyphs: bool = True,
+) -> list[Problem]:
+    """
+    Check sample names for problems that do not depend on other names
+
+    Parameters
+    ----------
+    chunk: list[tuple[int, str | names.Label]]
+        Line numbers and sample names, as Label if they carry a date
+    suffix: str
+        Text appended to names when checking their width (default: none)
+    check_glyphs: bool
+        Report characters missing from the font (default: True)
+
+    Returns
+    -------
+    list[Problem]
+        Problems found in the chunk
+    """
+
+    coverage = glyphs.load_coverage() if check_glyphs else None
+
+    problems = []
+    for line_number, label in chunk:
+        name = names.label_name(label)
+        for reason in _check_name(name, suffix, coverage):
+            problems.append(Problem(line_number, name, reason))
+    return problems
+
+
+def _check_name(name: str, suffix: str, coverage: glyphs.GlyphCoverage | None):
+    """Yield reasons why `name` would not be typeset correctly"""
+
+    control = [] if name.isprintable() else _CONTROL_CHARACTERS.findall(name)
+    if control:
+        codes = ", ".join(f"U+{ord(char):04X}" for char in dict.fromkeys(control))
+        yield f"contains control characters {codes}"
+
+    if coverage is not None:
+        missing = [char for char in coverage.missing(name) if char not in control]
+        if missing:
+            chars = ", ".join(f"'{char}' (U+{ord(char):04X})" for char in missing)
+            yield f"contains characters missing from the font: {chars}"
+
+    width = str_width(name + suffix, TINY_SIZE)
+    if width > TINY_LINES * COLUMN_WIDTH:
+        yield (
+            f"too wide even in \\tiny ({width} pt, at most "
+            f"{TINY_LINES * COLUMN_WIDTH:.0f} pt fit)"
+        )
+    elif width > COLUMN_WIDTH:
+        # Words of names fitting on a single line fit as well
+        for word in (name + suffix).split():
+            width = str_width(word, TINY_SIZE)
+            if width > COLUMN_WIDTH:
+                yield (
+                    f'word "{word}" too wide for a line even in \\tiny '
+                    f"({width} pt, at most {COLUMN_WIDTH:.0f} pt fit)"
+                )
+                break
+
+
+def _read_chunks(
+    path_input: Path | names.NamePattern, columns: names.Columns | None = None
+):
+    """Yield lists of line numbers and non-empty lines or labels of a file"""
+
+    if type(path_input) is names.NamePattern:
+        lines = enumerate(path_input, start=1)
+        while chunk := list(islice(lines, CHUNK_SIZE)):
+            yield chunk
+        return
+
+    if columns is not None:
+        rows = names.read_rows(path_input, columns)
+        lines = (
+            (line_number, name if date is None else names.Label(name, date))
+            for line_number, name, date, _ in rows
+        )
+        while chunk := list(islice(lines, CHUNK_SIZE)):
+            yield chunk
+        return
+
+    with open(path_input, "r") as file:
+        lines = (
+            (line_number, line.rstrip())
+            for line_number, line in enumerate(file, start=1)
+        )
+        lines = ((line_number, name) for line_number, name in lines if name)
+        while chunk := list(islice(lines, CHUNK_SIZE)):
+            yield chunk
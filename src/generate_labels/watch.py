@@ -0,0 +1,152 @@
+"""Wait for changes to the input file
+
+On Linux, changes are reported by inotify through the C library. Other
+systems, and Linux systems where inotify is unavailable, poll the
+modification time and size of the file instead. The directory containing
+the file is watched rather than the file itself, since many editors save
+by replacing the file.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+DEBOUNCE = 0.3
+"""Seconds without further changes to wait for before rebuilding"""
+
+POLL_INTERVAL = 0.5
+"""Seconds between checks of the file if inotify is unavailable"""
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+
+_EVENT = struct.Struct("iIII")
+"""Watch descriptor, mask, cookie and name length of an inotify event"""
+
+
+def watch(
+    path_input: Path,
+    callback: Callable[[], None],
+    debounce: float = DEBOUNCE,
+    stop: threading.Event | None = None,
+) -> None:
+    """
+    Call a function every time a file changes
+
+    Rapid successive changes, e.g. an editor writing a file in several
+    steps, are debounced into a single call.
+
+    Parameters
+    ----------
+    path_input: Path
+        File to watch
+    callback: Callable[[], None]
+        Function called after each change
+    debounce: float
+        Seconds without further changes to wait for before calling
+        `callback` (default: DEBOUNCE)
+    stop: threading.Event | None
+        Event ending the watch when set (default: watch until interrupted)
+    """
+
+    try:
+        watcher = _InotifyWatcher(path_input)
+    except (OSError, AttributeError):
+        watcher = _PollingWatcher(path_input)
+
+    try:
+        while stop is None or not stop.is_set():
+            if not watcher.wait(POLL_INTERVAL):
+                continue
+            # Wait for the file to settle before rebuilding
+            while watcher.wait(debounce):
+                pass
+            callback()
+    finally:
+        watcher.close()
+
+
+class _InotifyWatcher:
+    """Wait for changes reported by inotify"""
+
+    def __init__(self, path_input: Path):
+        if sys.platform != "linux":
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(path_input.parent), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+        self.name = os.fsencode(path_input.name)
+
+    def wait(self, timeout: float) -> bool:
+        """Return whether the file changed within `timeout` seconds"""
+
+        deadline = time.monotonic() + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not select.select([self.fd], [], [], remaining)[0]:
+                return False
+            if self.name in self._read_names():
+                return True
+        return False
+
+    def _read_names(self) -> list[bytes]:
+        """Read pending events and return the names of the files affected"""
+
+        data = os.read(self.fd, 64 * 1024)
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            names.append(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+        return names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _PollingWatcher:
+    """Wait for changes of modification time or size of the file"""
+
+    def __init__(self, path_input: Path):
+        self.path_input = path_input
+        self.signature = self._signature()
+
+    def _signature(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path_input.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def wait(self, timeout: float) -> bool:
+        """Return whether the file changed within `timeout` seconds"""
+
+        deadline = time.monotonic() + timeout
+        while True:
+            signature = self._signature()
+            if signature != self.signature:
+                self.signature = signature
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(POLL_INTERVAL, remaining))
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,19 @@
+import io
+
+from generate_labels import render_labels
+
+
+def test_render_labels(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pdf = render_labels(["A1", "", "A2"], skip=3, date="none", backend="pdf")
+    assert pdf.startswith(b"%PDF-")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_render_labels_file():
+    file = io.BytesIO()
+    result = render_labels(
+        ["A1"], file, suffix_groups=[["CTRL", "TREAT"]], backend="pdf"
+    )
+    assert result is None
+    assert file.getvalue().startswith(b"%PDF-")
@@ -0,0 +1,35 @@
+import os
+
+from generate_labels import cache
+
+
+def test_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("GENERATE_LABELS_CACHE", str(tmp_path))
+    assert cache.cache_dir("output") == tmp_path.joinpath("output")
+    assert tmp_path.joinpath("output").is_dir()
+
+
+def test_cache_put_get(tmp_path, monkeypatch):
+    monkeypatch.setenv("GENERATE_LABELS_CACHE", str(tmp_path))
+    file_pdf = tmp_path.joinpath("file.pdf")
+    file_pdf.write_bytes(b"%PDF" * 100)
+
+    assert cache.cache_get("output", "a") is None
+    cache.cache_put("output", "a", file_pdf)
+    assert cache.cache_get("output", "a").read_bytes() == file_pdf.read_bytes()
+
+
+def test_cache_evict(tmp_path, monkeypatch):
+    monkeypatch.setenv("GENERATE_LABELS_CACHE", str(tmp_path))
+    file_pdf = tmp_path.joinpath("file.pdf")
+    file_pdf.write_bytes(b"%PDF" * 100)
+
+    cache.cache_put("output", "old", file_pdf, max_size=1000)
+    cache.cache_put("output", "used", file_pdf, max_size=1000)
+    os.utime(cache.cache_get("output", "old"), (0, 0))
+    cache.cache_get("output", "used")
+    cache.cache_put("output", "new", file_pdf, max_size=1000)
+
+    assert cache.cache_get("output", "old") is None
+    assert cache.cache_get("output", "used") is not None
+    assert cache.cache_get("output", "new") is not None
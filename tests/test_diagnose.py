@@ -0,0 +1,52 @@
+from generate_labels import diagnose
+
+
+def test_parse_log(tmp_path):
+    path_log = tmp_path.joinpath("labels.log")
+    path_log.write_text(
+        "This is XeTeX\n"
+        "! Undefined control sequence.\n"
+        "<argument> \\foo\n"
+        "l.42 \\end{tabularhtx}\n"
+        "! Emergency stop.\n"
+    )
+    assert diagnose.parse_log(path_log) == [
+        diagnose.TexError("Undefined control sequence.", 42),
+        diagnose.TexError("Emergency stop.", None),
+    ]
+
+
+def test_page_of_line(tmp_path):
+    path_tex = tmp_path.joinpath("labels.tex")
+    path_tex.write_text("\\begin{document}\n% Page 1\na\n% Page 2\nb\n")
+    assert diagnose.page_of_line(path_tex, 1) is None
+    assert diagnose.page_of_line(path_tex, 3) == 1
+    assert diagnose.page_of_line(path_tex, 5) == 2
+
+
+def test_bisect_failures():
+    items = list(range(100))
+    tested = []
+
+    def fails(group):
+        tested.append(group)
+        return 17 in group or 80 in group or {50, 51} <= set(group)
+
+    groups = diagnose.bisect_failures(items, fails, jobs=4)
+    assert groups == [[17], [50, 51], [80]]
+    assert len(tested) < len(items)
+    assert diagnose.bisect_failures(items, lambda group: False) == []
+
+
+def test_find_offenders(monkeypatch):
+    def compile_errors(stickers, str_date, exec_tex, fmt):
+        if "b&d" in stickers:
+            return [diagnose.TexError("Misplaced alignment tab character &.", 9)]
+        return []
+
+    monkeypatch.setattr(diagnose, "compile_errors", compile_errors)
+    stickers = [(position, f"s{position}", position + 1) for position in range(400)]
+    stickers[200] = (200, "b&d", 201)
+    assert diagnose.find_offenders(stickers, "2020") == [
+        diagnose.Offender("b&d", 201, 2, 2, 5, "Misplaced alignment tab character &.")
+    ]
@@ -0,0 +1,36 @@
+import io
+
+from generate_labels import formatting, names
+
+
+def test_write_tex_pages():
+    buffer = io.StringIO()
+    stickers = iter(["a_b", "a_b", None])
+    formatting.write_tex_pages(buffer, stickers, "2020", range(2))
+    lines = buffer.getvalue().splitlines()
+    assert lines.count("\\end{tabularhtx}") == 2
+    assert lines[2].startswith("\ta\\_b \\par 2020 & a\\_b \\par 2020 & \\phantom")
+    assert lines[2].endswith(" \\\\ \\interrowfill")
+    assert lines[28].endswith(" \\\\ \\interrowspace{-1em}")
+
+
+def test_write_tex_pages_macros():
+    buffer = io.StringIO()
+    stickers = iter([None, "a", "b", "a"])
+    formatting.write_tex_pages(buffer, stickers, "2020", range(1), macros=True)
+    lines = buffer.getvalue().splitlines()
+    assert lines[:2] == [
+        "\\def\\LE{\\phantom{empty}\\par\\phantom{sticker}}",
+        "\\def\\LD{2020}",
+    ]
+    assert "\\def\\LSa{a \\par \\LD}" in lines
+    row = "\t\\LE & \\LSa & b \\par \\LD & \\LSa & \\LE & \\LE & \\LE"
+    assert row + " \\\\ \\interrowfill" in lines
+
+
+def test_write_tex_pages_label():
+    buffer = io.StringIO()
+    stickers = iter([names.Label("a", "1_2"), "b"])
+    formatting.write_tex_pages(buffer, stickers, "2020", range(1))
+    lines = buffer.getvalue().splitlines()
+    assert lines[2].startswith("\ta \\par 1\\_2 & b \\par 2020 & ")
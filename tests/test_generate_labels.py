@@ -1,5 +1,7 @@
+import json
+import io
 import pytest
-from generate_labels import generate_labels
+from generate_labels import formatting, generate_labels
 from importlib import resources
 from pathlib import Path
 
@@ -47,3 +49,226 @@ def test_generate_labels_skip(tmp_path, skip: str):
     file_input = str(create_testfile(tmp_path=tmp_path))
     test_args = ["-f", file_input, "-s", skip, "-n"]
     generate_labels.main(test_args)
+
+
+@pytest.mark.parametrize("jobs", ["2", "3"])
+def test_generate_labels_jobs(tmp_path, jobs: str):
+    file_input = str(create_testfile(tmp_path=tmp_path, file="test_full.txt"))
+    test_args = ["-f", file_input, "-s", "300", "-j", jobs, "-n"]
+    generate_labels.main(test_args)
+    assert tmp_path.joinpath("test_full.pdf").exists()
+
+
+def test_generate_labels_incremental(tmp_path):
+    file_input = create_testfile(tmp_path=tmp_path, file="test_full.txt")
+    test_args = ["-f", str(file_input), "--incremental", "-n"]
+    generate_labels.main(test_args)
+    file_input.write_text(file_input.read_text().replace("nine-char", "nine-chars"))
+    generate_labels.main(test_args)
+    assert tmp_path.joinpath("test_full.pdf").exists()
+
+
+def test_generate_labels_suffix_group(tmp_path):
+    file_input = str(create_testfile(tmp_path=tmp_path))
+    test_args = ["-f", file_input, "-g", "CTRL TREAT", "-g", "1 2 3", "-b", "pdf", "-n"]
+    generate_labels.main(test_args)
+    file_suffix = tmp_path.joinpath("test_small_suffix.txt")
+    assert file_suffix.read_text().splitlines()[:2] == [
+        "test sticker-CTRL-1",
+        "test sticker-CTRL-2",
+    ]
+
+
+def test_generate_labels_backend_pdf(tmp_path):
+    file_input = str(create_testfile(tmp_path=tmp_path, file="test_full.txt"))
+    test_args = ["-f", file_input, "-s", "42", "-b", "pdf", "-n"]
+    generate_labels.main(test_args)
+    file_pdf = tmp_path.joinpath("test_full.pdf")
+    assert file_pdf.read_bytes().startswith(b"%PDF-")
+    assert not file_pdf.with_suffix(".tex").exists()
+
+
+@pytest.mark.parametrize("combine", [False, True])
+def test_generate_labels_batch(tmp_path, combine: bool):
+    create_testfile(tmp_path=tmp_path)
+    create_testfile(tmp_path=tmp_path, file="test_full.txt")
+    test_args = ["--batch", str(tmp_path), "-b", "pdf", "-n"]
+    if combine:
+        test_args += ["--combine", "-o", str(tmp_path.joinpath("labels.pdf"))]
+    generate_labels.main(test_args)
+    if combine:
+        assert tmp_path.joinpath("labels.pdf").exists()
+    else:
+        assert tmp_path.joinpath("test_small.pdf").exists()
+        assert tmp_path.joinpath("test_full.pdf").exists()
+
+
+def test_generate_labels_batch_table(tmp_path):
+    create_testfile(tmp_path=tmp_path)
+    tmp_path.joinpath("names.csv").write_text("name,date\nA,2020\nB,2021\n")
+    test_args = ["--batch", str(tmp_path), "-b", "pdf", "-n", "--date-column", "date"]
+    generate_labels.main(test_args)
+    assert tmp_path.joinpath("test_small.pdf").exists()
+    assert tmp_path.joinpath("names.pdf").exists()
+
+
+def test_generate_labels_batch_pages(tmp_path, monkeypatch, capsys):
+    create_testfile(tmp_path=tmp_path, file="test_full.txt")
+    test_args = ["--batch", str(tmp_path), "-b", "pdf", "-n"]
+    generate_labels.main(test_args)
+
+    # Typeset again as if the PDF had been taken from the cache
+    typeset = generate_labels.typeset
+
+    def typeset_cached(*args, **kwargs):
+        return 0, typeset(*args, **kwargs)[1]
+
+    monkeypatch.setattr(generate_labels, "typeset", typeset_cached)
+    capsys.readouterr()
+    generate_labels.main(test_args)
+    lines = capsys.readouterr().out.splitlines()
+    row = next(line for line in lines if line.startswith("test_full.txt "))
+    assert row.split()[2] == "3"
+
+
+def test_generate_labels_profile(tmp_path):
+    file_input = str(create_testfile(tmp_path=tmp_path))
+    file_report = tmp_path.joinpath("profile.json")
+    test_args = ["-f", file_input, "-b", "pdf", "-n", "--profile", str(file_report)]
+    generate_labels.main(test_args)
+    report = json.loads(file_report.read_text())
+    phases = [phase["phase"] for phase in report["phases"]]
+    assert phases == ["paths", "read", "validate", "pdf", "open"]
+
+
+def test_generate_labels_profile_strict(tmp_path):
+    file_input = str(create_testfile(tmp_path=tmp_path, file="test_full.txt"))
+    file_report = tmp_path.joinpath("profile.json")
+    test_args = ["-f", file_input, "-b", "pdf", "-n", "--profile", str(file_report)]
+    with pytest.raises(SystemExit):
+        generate_labels.main(test_args + ["--strict"])
+    phases = [phase["phase"] for phase in json.loads(file_report.read_text())["phases"]]
+    assert phases == ["paths", "read", "validate"]
+
+
+def test_generate_labels_profile_mode_final(tmp_path, monkeypatch, capsys):
+    file_input = str(create_testfile(tmp_path=tmp_path))
+    which = generate_labels.shutil.which
+    monkeypatch.setattr(
+        generate_labels.shutil,
+        "which",
+        lambda name: name if name == "xelatex" else which(name),
+    )
+
+    def typeset(stickers, names_number, str_date, path_output, **kwargs):
+        path_output.write_bytes(b"%PDF")
+        return 1, 1
+
+    monkeypatch.setattr(generate_labels, "typeset", typeset)
+    test_args = ["-f", file_input, "-n", "--profile-mode", "final", "-j", "2"]
+    generate_labels.main(test_args + ["--incremental"])
+    assert "ignoring --jobs and --incremental" in capsys.readouterr().out
+    generate_labels.main(test_args[:-2])
+    assert "ignoring" not in capsys.readouterr().out
+
+
+def test_generate_labels_pages_per_file(tmp_path):
+    file_input = str(create_testfile(tmp_path=tmp_path, file="test_full.txt"))
+    test_args = ["-f", file_input, "-s", "42", "-b", "pdf", "-n"]
+    generate_labels.main(test_args + ["--pages-per-file", "2"])
+    assert tmp_path.joinpath("test_full_001.pdf").exists()
+    assert tmp_path.joinpath("test_full_002.pdf").exists()
+    assert not tmp_path.joinpath("test_full_003.pdf").exists()
+    rows = tmp_path.joinpath("test_full_manifest.csv").read_text().splitlines()
+    assert len(rows) == 1 + 420
+    assert rows[1].startswith("test_full_001.pdf,1,7,1,")
+    assert rows[-1].startswith("test_full_002.pdf,1,12,")
+
+
+def test_generate_labels_table(tmp_path, monkeypatch):
+    file_input = tmp_path.joinpath("names.csv")
+    file_input.write_text("name,date,copies\nA1,2020-01-01,3\nA2,,1\n")
+    test_args = ["-f", str(file_input), "--date-column", "date", "-b", "pdf", "-n"]
+    generate_labels.main(test_args + ["--copies-column", "copies", "-d", "none"])
+    assert tmp_path.joinpath("names.pdf").exists()
+
+    # Dates of rows reach the TeX file, the date of the others is escaped
+    buffer = io.StringIO()
+
+    def typeset(stickers, names_number, str_date, path_output, **kwargs):
+        formatting.write_tex_pages(buffer, iter(stickers), str_date, range(1))
+        return 1, 1
+
+    monkeypatch.setattr(generate_labels, "typeset", typeset)
+    generate_labels.main(test_args + ["--copies-column", "copies", "-d", "week_1"])
+    stickers = buffer.getvalue().splitlines()[2].split(" & ")
+    assert stickers[:4] == [
+        "\tA1 \\par 2020-01-01",
+        "A1 \\par 2020-01-01",
+        "A1 \\par 2020-01-01",
+        "A2 \\par week\\_1",
+    ]
+
+
+def test_generate_labels_dry_run(tmp_path):
+    file_input = str(create_testfile(tmp_path=tmp_path, file="test_full.txt"))
+    generate_labels.main(["-f", file_input, "-s", "5", "--dry-run"])
+    rows = tmp_path.joinpath("test_full_layout.csv").read_text().splitlines()
+    assert len(rows) == 1 + 420
+    assert rows[1].startswith("nine-char,1,1,6,footnotesize,")
+    assert not tmp_path.joinpath("test_full.pdf").exists()
+    assert not tmp_path.joinpath("test_full.tex").exists()
+
+
+@pytest.mark.parametrize("verbose", [False, True])
+def test_generate_labels_duplicates(tmp_path, capsys, verbose: bool):
+    file_input = str(create_testfile(tmp_path=tmp_path, file="test_full.txt"))
+    test_args = ["-f", file_input, "--dry-run"] + ["--verbose"] * verbose
+    generate_labels.main(test_args)
+    lines = capsys.readouterr().out.splitlines()
+    duplicates = [line for line in lines if ": duplicate of line " in line]
+    assert len(duplicates) == (275 if verbose else 0)
+    assert any(line.startswith("275 duplicate name(s)") for line in lines) != verbose
+
+
+def test_generate_labels_pattern(tmp_path):
+    file_output = tmp_path.joinpath("plates.pdf")
+    test_args = ["--pattern", "Plate{1..2}-{A..H}{01..12}", "-o", str(file_output)]
+    generate_labels.main(test_args + ["--dry-run", "-s", "2"])
+    rows = tmp_path.joinpath("plates_layout.csv").read_text().splitlines()
+    assert len(rows) == 1 + 192
+    assert rows[1].startswith("Plate1-A01,1,1,3,")
+    assert rows[-1].startswith("Plate2-H12,2,1,5,")
+
+
+@pytest.mark.parametrize(
+    "option", [["--dry-run"], ["--watch"], ["--pages-per-file", "1"]]
+)
+def test_generate_labels_batch_unsupported(tmp_path, option: list[str]):
+    create_testfile(tmp_path=tmp_path)
+    with pytest.raises(SystemExit):
+        generate_labels.main(["--batch", str(tmp_path), "-b", "pdf"] + option)
+    assert not tmp_path.joinpath("test_small.pdf").exists()
+
+
+def test_generate_labels_pattern_batch(tmp_path):
+    with pytest.raises(SystemExit):
+        generate_labels.main(["--pattern", "A{1..2}", "--batch", str(tmp_path)])
+
+
+def test_generate_labels_batch_profile(tmp_path, monkeypatch):
+    create_testfile(tmp_path=tmp_path)
+    create_testfile(tmp_path=tmp_path, file="test_full.txt")
+    workers = []
+    executor = generate_labels.ThreadPoolExecutor
+
+    def thread_pool(max_workers: int):
+        workers.append(max_workers)
+        return executor(max_workers=max_workers)
+
+    monkeypatch.setattr(generate_labels, "ThreadPoolExecutor", thread_pool)
+    file_report = tmp_path.joinpath("profile.json")
+    test_args = ["--batch", str(tmp_path), "-b", "pdf", "-n", "-j", "2"]
+    generate_labels.main(test_args + ["--profile", str(file_report)])
+    assert workers == [1]
+    assert file_report.exists()
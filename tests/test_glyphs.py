@@ -0,0 +1,19 @@
+from generate_labels import glyphs
+
+
+def test_ranges():
+    assert glyphs._ranges([65, 66, 67, 70, 0x1F600]) == [
+        (65, 67),
+        (70, 70),
+        (0x1F600, 0x1F600),
+    ]
+
+
+def test_coverage():
+    coverage = glyphs.GlyphCoverage([(32, 126), (0x1F600, 0x1F600)])
+    assert "A" in coverage
+    assert "ñ" not in coverage
+    assert "\U0001f600" in coverage
+    assert "\U0001f601" not in coverage
+    assert coverage.missing("Añoñ") == ["ñ"]
+    assert coverage.substitute("Año ㎏ α") == "Ano kg ?"
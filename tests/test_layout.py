@@ -0,0 +1,24 @@
+import csv
+import json
+
+from generate_labels import layout, names
+
+
+def test_layout_index():
+    stickers = [None] * 188 + ["A1", names.Label("A2", "2021"), "long " * 10]
+    placements = list(layout.layout_index(stickers, None))
+    assert placements[0] == ("A1", 1, 27, 7, "footnotesize", "", "newline")
+    assert placements[1] == ("A2", 2, 1, 1, "footnotesize", "2021", "newline")
+    assert placements[2][4:] == ("tiny", "", "inline")
+
+
+def test_write_layout(tmp_path):
+    placements = list(layout.layout_index(["A1", "A2"], "2020"))
+    path_csv = tmp_path.joinpath("layout.csv")
+    path_json = tmp_path.joinpath("layout.json")
+    assert layout.write_layout(path_csv, iter(placements)) == 2
+    assert layout.write_layout(path_json, iter(placements)) == 2
+    with open(path_csv, newline="") as file_csv:
+        rows = list(csv.DictReader(file_csv))
+    assert rows[1]["column"] == "2"
+    assert json.loads(path_json.read_text())[1] == placements[1]._asdict()
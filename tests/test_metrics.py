@@ -0,0 +1,27 @@
+import pytest
+
+from generate_labels import metrics
+
+
+@pytest.fixture
+def font_metrics():
+    widths = {"A": 700, "V": 650, "ä": 520}
+    kerning = {"AV": -80, "VA": -70}
+    return metrics.Metrics(widths, kerning, default=600)
+
+
+def test_width(font_metrics):
+    assert font_metrics.width("A", 10) == 7
+    assert font_metrics.width("AV", 1000) == 700 + 650 - 80
+    assert font_metrics.width("ä?", 1000) == 520 + 600
+    assert font_metrics.width("", 10) == 0
+
+
+def test_arrays(tmp_path, font_metrics):
+    path_metrics = tmp_path.joinpath("metrics.bin")
+    with open(path_metrics, "wb") as file:
+        metrics._write_arrays(file, font_metrics)
+    loaded = metrics._read_arrays(path_metrics)
+    assert loaded.widths == font_metrics.widths
+    assert loaded.kerning == font_metrics.kerning
+    assert loaded.default == font_metrics.default
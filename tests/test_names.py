@@ -0,0 +1,61 @@
+import pytest
+
+from generate_labels import names
+
+
+def test_scan_names(tmp_path):
+    file_input = tmp_path.joinpath("names.txt")
+    file_input.write_text("one\n\ntwo  \nthree\nfour\n")
+    assert names.scan_names(file_input) == (4, ["one", "two", "four"])
+    assert list(names.read_names(file_input)) == ["one", "two", "three", "four"]
+
+
+def test_scan_names_pattern():
+    name_pattern = names.NamePattern("S{1..4}")
+    assert names.scan_names(name_pattern) == (4, ["S1", "S2", "S4"])
+    stickers = names.sticker_names(name_pattern, [["a", "b"]], 1)
+    assert list(stickers)[:3] == [None, "S1-a", "S1-b"]
+    assert list(names.source_lines(name_pattern, [["a", "b"]]))[:3] == [1, 1, 2]
+
+
+def test_add_suffixes():
+    suffix_groups = [["CTRL", "TREAT"], ["1", "2"]]
+    names_suffixed = list(names.add_suffixes(iter(["S1", "S2"]), suffix_groups))
+    assert names_suffixed[:3] == ["S1-CTRL-1", "S1-CTRL-2", "S1-TREAT-1"]
+    assert len(names_suffixed) == names.count_suffixed(2, suffix_groups)
+
+
+def test_read_suffix_groups(tmp_path):
+    file_suffixes = tmp_path.joinpath("suffixes.txt")
+    file_suffixes.write_text("# treatments\nCTRL TREAT\n\n1 2 3\n")
+    assert names.read_suffix_groups(file_suffixes) == [
+        ["CTRL", "TREAT"],
+        ["1", "2", "3"],
+    ]
+
+
+def test_skip_stickers():
+    assert list(names.skip_stickers(["a"], 2)) == [None, None, "a"]
+
+
+def test_read_names_table(tmp_path):
+    file_input = tmp_path.joinpath("names.tsv")
+    file_input.write_text("sample\tdate\tn\nA1\t2020-01-01\t2\n\t\t\nA2\t\t0\nA3\t\t\n")
+    columns = names.table_columns(file_input, "sample", "date", "3")
+    assert columns.delimiter == "\t"
+    assert list(names.read_names(file_input, columns)) == [
+        names.Label("A1", "2020-01-01"),
+        names.Label("A1", "2020-01-01"),
+        "A3",
+    ]
+    assert names.scan_names(file_input, columns) == (3, ["A1", "A1", "A3"])
+    assert names.table_columns(tmp_path.joinpath("names.txt")) is None
+
+
+def test_read_rows_errors(tmp_path):
+    file_input = tmp_path.joinpath("names.csv")
+    file_input.write_text("sample,copies\nA1,many\n")
+    with pytest.raises(ValueError, match="line 2"):
+        list(names.read_rows(file_input, names.Columns(copies="copies")))
+    with pytest.raises(ValueError, match="column 'date' not found"):
+        list(names.read_rows(file_input, names.Columns(date="date")))
@@ -0,0 +1,32 @@
+import threading
+
+from generate_labels import output
+
+
+def test_publish(tmp_path):
+    path_source = tmp_path.joinpath("build.pdf")
+    path_source.write_bytes(b"%PDF-new")
+    path_target = tmp_path.joinpath("out", "labels.pdf")
+    path_target.parent.mkdir()
+    path_target.write_bytes(b"%PDF-old")
+    output.publish(path_source, path_target)
+    assert path_target.read_bytes() == b"%PDF-new"
+    assert [path.name for path in path_target.parent.iterdir()] == ["labels.pdf"]
+
+
+def test_lock(tmp_path):
+    path_output = tmp_path.joinpath("labels.pdf")
+    events = []
+    waiting = threading.Event()
+
+    def second_run():
+        with output.lock(path_output, on_wait=waiting.set):
+            events.append("second")
+
+    with output.lock(path_output):
+        thread = threading.Thread(target=second_run)
+        thread.start()
+        assert waiting.wait(5)
+        events.append("first")
+    thread.join(5)
+    assert events == ["first", "second"]
@@ -0,0 +1,47 @@
+import pytest
+
+from generate_labels import patterns
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        (
+            "Plate{1..2}-{A..B}{01..02}",
+            [
+                "Plate1-A01",
+                "Plate1-A02",
+                "Plate1-B01",
+                "Plate1-B02",
+                "Plate2-A01",
+                "Plate2-A02",
+                "Plate2-B01",
+                "Plate2-B02",
+            ],
+        ),
+        ("x{1..10..4}", ["x1", "x5", "x9"]),
+        ("{3..1}", ["3", "2", "1"]),
+        ("{CTRL,TREAT{1..2}}-1", ["CTRL-1", "TREAT1-1", "TREAT2-1"]),
+        ("S{,-rep}", ["S", "S-rep"]),
+        ("{a}b\\{1,2}", ["{a}b{1,2}"]),
+        ("open{1,2", ["open{1,2"]),
+        ("{,A}{,B}", ["B", "A", "AB"]),
+        ("{,}", []),
+        ("", []),
+    ],
+)
+def test_name_pattern(pattern, expected):
+    name_pattern = patterns.NamePattern(pattern)
+    assert list(name_pattern) == expected
+    assert name_pattern.count == len(expected)
+    assert [name_pattern[i] for i in range(-len(expected), 0)] == expected
+
+
+def test_name_pattern_large():
+    # Counting and indexing must not generate the names
+    name_pattern = patterns.NamePattern("S{1..1000000000}-{A..Z}{0001..9999}")
+    assert name_pattern.count == 1_000_000_000 * 26 * 9999
+    assert name_pattern[-1] == "S1000000000-Z9999"
+    assert next(iter(name_pattern)) == "S1-A0001"
+    with pytest.raises(IndexError):
+        name_pattern[name_pattern.count]
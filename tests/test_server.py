@@ -0,0 +1,67 @@
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from generate_labels import server
+
+
+@pytest.fixture
+def url():
+    renderer = server.Renderer(workers=2, max_queue=10, backend="pdf")
+    http_server = server.make_server("127.0.0.1", 0, renderer)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{http_server.server_port}"
+    http_server.shutdown()
+    http_server.server_close()
+    renderer.shutdown()
+
+
+def post(url: str, job: dict) -> bytes:
+    request = urllib.request.Request(f"{url}/render", json.dumps(job).encode())
+    with urllib.request.urlopen(request) as response:
+        return response.read()
+
+
+def test_render(url):
+    job = {"names": ["A1", "A2"], "skip": 3, "date": "none", "suffix_groups": [["x"]]}
+    assert post(url, job).startswith(b"%PDF-")
+    with urllib.request.urlopen(f"{url}/metrics") as response:
+        metrics = json.loads(response.read())
+    assert metrics["completed"] == 1
+    assert metrics["queue_depth"] == 0
+    assert metrics["latency_seconds"]["p50"] > 0
+
+
+def test_render_invalid(url):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        post(url, {"names": "A1"})
+    assert error.value.code == 400
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_render_invalid_length(url, length: str):
+    connection = http.client.HTTPConnection(url.removeprefix("http://"), timeout=5)
+    connection.putrequest("POST", "/render")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+    assert connection.getresponse().status == 400
+    connection.close()
+
+
+def test_parse_job():
+    job = server.parse_job(b'{"names": ["A1", " ", "A2 "], "date": "2020"}')
+    assert job == {
+        "names": ["A1", "A2"],
+        "skip": 0,
+        "date": "2020",
+        "suffix_groups": [],
+    }
+    with pytest.raises(ValueError):
+        server.parse_job(b'{"names": ["A1"], "copies": 2}')
+    with pytest.raises(ValueError):
+        server.parse_job(b'{"names": ["A1"], "skip": true}')
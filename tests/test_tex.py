@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from generate_labels import tex
+
+
+def test_preamble_parts():
+    part_format, part_document = tex.preamble_parts()
+    assert "\\documentclass" in part_format
+    assert "\\setmainfont" not in part_format
+    assert "\\begin{document}" in part_document
+
+
+def test_build_format(tmp_path, monkeypatch):
+    monkeypatch.setenv("GENERATE_LABELS_CACHE", str(tmp_path))
+    name_format = tex.build_format()
+    assert tmp_path.joinpath("formats", f"{name_format}.fmt").exists()
+    assert tex.build_format() == name_format
+
+
+def test_run_tex_profile(tmp_path, monkeypatch):
+    commands = []
+
+    def run(command, **kwargs):
+        commands.append([str(arg) for arg in command])
+        if "-no-pdf" in command:
+            tmp_path.joinpath("labels.xdv").write_bytes(b"xdv")
+
+    monkeypatch.setattr(tex.subprocess, "run", run)
+    tex.run_tex(tmp_path.joinpath("labels.tex"), tmp_path, mode="draft")
+    assert "-no-pdf" in commands[0]
+    assert commands[1][:4] == ["xdvipdfmx", "-q", "-E", "-z"]
+    assert commands[1][4:] == [
+        "0",
+        "-o",
+        str(tmp_path.joinpath("labels.pdf")),
+        str(tmp_path.joinpath("labels.xdv")),
+    ]
+
+
+def test_output_key_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(tex, "tex_version", lambda exec_tex: "XeTeX 3.14")
+    path_tex = tmp_path.joinpath("labels.tex")
+    path_tex.write_text("\\end{document}")
+    keys = {tex.output_key([path_tex], mode=mode) for mode in (None, "draft", "final")}
+    assert len(keys) == 3
+
+
+def test_run_incremental_failure(tmp_path, monkeypatch):
+    monkeypatch.setenv("GENERATE_LABELS_CACHE", str(tmp_path.joinpath("cache")))
+    monkeypatch.setattr(tex, "tex_version", lambda exec_tex: "XeTeX 3.14")
+
+    def run_tex(path_tex, dir_output, *args):
+        path_tex.with_suffix(".log").write_text("! Undefined control sequence.")
+
+    monkeypatch.setattr(tex, "run_tex", run_tex)
+    path_pdf = tmp_path.joinpath("labels.pdf")
+    pages = ["% Page 1\n", "% Page 2\n"]
+    assert tex.run_incremental(pages, path_pdf, "", "") == (2, 2)
+    assert not path_pdf.exists()
+    assert path_pdf.with_suffix(".tex").read_text() == "% Page 1\n% Page 2\n"
+    assert path_pdf.with_suffix(".log").exists()
+
+
+@pytest.mark.parametrize("manifest", ["", '{"pdf": [1, 2', "[]", '{"pages": []}'])
+def test_run_incremental_manifest_corrupt(tmp_path, monkeypatch, manifest):
+    monkeypatch.setenv("GENERATE_LABELS_CACHE", str(tmp_path.joinpath("cache")))
+    monkeypatch.setattr(tex, "tex_version", lambda exec_tex: "XeTeX 3.14")
+
+    def run_tex(path_tex, dir_output, *args):
+        path_tex.with_suffix(".pdf").write_bytes(b"%PDF")
+
+    monkeypatch.setattr(tex, "run_tex", run_tex)
+    path_pdf = tmp_path.joinpath("labels.pdf")
+    pages = ["% Page 1\n", "% Page 2\n"]
+    assert tex.run_incremental(pages, path_pdf, "", "") == (2, 2)
+    (path_manifest,) = tmp_path.joinpath("cache", "incremental").iterdir()
+    path_manifest.write_text(manifest)
+    assert tex.run_incremental(pages, path_pdf, "", "") == (2, 2)
+    assert json.loads(path_manifest.read_text())["pdf"][1] == 4
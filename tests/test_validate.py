@@ -0,0 +1,40 @@
+import pytest
+
+from generate_labels import names, validate
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_validate_names(tmp_path, monkeypatch, jobs: int):
+    monkeypatch.setattr(validate, "CHUNK_SIZE", 2)
+    file_input = tmp_path.joinpath("names.txt")
+    file_input.write_text(
+        "A1\nA\x07B\n\nA1\n" + "long " * 60 + "\n" + "W" * 40 + "\nA2\n"
+    )
+    problems = validate.validate_names(file_input, jobs=jobs)
+    assert [(problem.line, problem.reason.split()[0]) for problem in problems] == [
+        (2, "contains"),
+        (4, "duplicate"),
+        (5, "too"),
+        (6, "word"),
+    ]
+
+
+def test_validate_names_suffix(tmp_path):
+    file_input = tmp_path.joinpath("names.txt")
+    file_input.write_text("A" * 10 + "\n")
+    assert validate.validate_names(file_input) == []
+    assert validate.validate_names(file_input, [["B" * 20]]) != []
+
+
+def test_validate_names_table_dates(tmp_path):
+    file_input = tmp_path.joinpath("names.csv")
+    file_input.write_text("name,date\nA,2020\nA,2021\nA,2020\n")
+    columns = names.table_columns(file_input, date="date")
+    problems = validate.validate_names(file_input, columns=columns)
+    assert problems == [validate.Problem(4, "A", "duplicate of line 2")]
+
+
+def test_validate_names_pattern():
+    name_pattern = names.NamePattern("{A,A,B\x07}")
+    problems = validate.validate_names(name_pattern)
+    assert [problem.line for problem in problems] == [3]
@@ -0,0 +1,32 @@
+import threading
+
+import pytest
+
+from generate_labels import watch
+
+
+@pytest.mark.parametrize("polling", [False, True])
+def test_watch(tmp_path, monkeypatch, polling: bool):
+    if polling:
+        monkeypatch.setattr(watch, "_InotifyWatcher", watch._PollingWatcher)
+    monkeypatch.setattr(watch, "POLL_INTERVAL", 0.05)
+    file_input = tmp_path.joinpath("names.txt")
+    file_input.write_text("A1\n")
+
+    stop = threading.Event()
+    calls = []
+
+    def callback():
+        calls.append(file_input.read_text())
+        stop.set()
+
+    thread = threading.Thread(
+        target=watch.watch, args=(file_input, callback, 0.2, stop)
+    )
+    thread.start()
+    threading.Event().wait(0.2)
+    # Rapid saves are debounced into a single rebuild
+    for number in range(3):
+        file_input.write_text(f"A1\nA{number + 2}\n")
+    thread.join(timeout=5)
+    assert calls == ["A1\nA4\n"]